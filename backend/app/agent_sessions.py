@@ -0,0 +1,148 @@
+"""Per-agent OpenClaw session affinity.
+
+Instead of spawning a fresh child session for every War Room, each agent keeps
+one session (recorded as an `AgentSession` row) and later runs talk to it with
+`sessions_send`. A new session is spawned when there is none, when it has
+expired (age or idle time), when the agent's `openclaw_agent_id` changed, or
+when sending to it fails.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from .entity_cache import CachedAgent
+from .models import AgentSession
+from .openclaw import OpenClawClient
+from .resilience import BulkheadFullError, CircuitOpenError
+from .settings import settings
+
+
+@dataclass
+class AgentReply:
+    session_key: str
+    text: str | None  # None: timed out waiting for the reply
+    reused: bool
+    # Set after a spawn: pass to `upserts.upsert_agent_session` once the run
+    # is done awaiting the gateway (a write there would hold the lock).
+    spawned: dict | None = None
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(dt: datetime | None) -> datetime | None:
+    # SQLite hands back naive datetimes; they are stored as UTC.
+    if dt is not None and dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _usable(sess: AgentSession | None, agent: CachedAgent, now: datetime) -> bool:
+    if sess is None or sess.openclaw_agent_id != agent.openclaw_agent_id:
+        return False
+    created = _aware(sess.created_at)
+    if created and now - created > timedelta(hours=settings.agent_session_max_age_hours):
+        return False
+    last_used = _aware(sess.last_used_at) or created
+    if last_used and now - last_used > timedelta(minutes=settings.agent_session_idle_minutes):
+        return False
+    return True
+
+
+def _messages(hist) -> list:
+    if isinstance(hist, list):
+        return hist
+    if isinstance(hist, dict):
+        return hist.get("messages") or []
+    return []
+
+
+def _reply_after(msgs: list, marker: str | None) -> str | None:
+    """The assistant reply to the message carrying `marker` (or the latest one)."""
+
+    start = 0
+    if marker:
+        hits = [
+            i
+            for i, m in enumerate(msgs)
+            if isinstance(m, dict) and m.get("role") == "user" and marker in str(m.get("content"))
+        ]
+        if not hits:
+            return None
+        start = hits[-1] + 1
+
+    for m in reversed(msgs[start:]):
+        if isinstance(m, dict) and m.get("role") == "assistant" and m.get("content"):
+            return str(m.get("content"))
+    return None
+
+
+async def _wait_for_reply(oc: OpenClawClient, session_key: str, marker: str | None) -> str | None:
+    for _ in range(settings.agent_reply_poll_attempts):
+        hist = await oc.sessions_history(session_key, limit=30, include_tools=False)
+        reply = _reply_after(_messages(hist), marker)
+        if reply:
+            return reply
+        await asyncio.sleep(settings.agent_reply_poll_seconds)
+    return None
+
+
+async def ask_agent(
+    db: Session,
+    oc: OpenClawClient,
+    agent: CachedAgent,
+    prompt: str,
+    *,
+    label: str,
+    marker: str,
+) -> AgentReply:
+    """Send `prompt` to the agent's session, spawning one if needed (caller commits).
+
+    `marker` must be a string unique to this request that appears in `prompt`;
+    it is used to find the reply in a reused session's history. Raises when
+    spawning fails. Never writes to `db`: a reused session's counters are
+    changed in memory, and a new session comes back as `AgentReply.spawned`
+    for the caller to record.
+    """
+
+    now = _now()
+    sess = db.get(AgentSession, agent.id)
+
+    if _usable(sess, agent, now):
+        try:
+            await oc.sessions_send(sess.session_key, prompt)
+            text = await _wait_for_reply(oc, sess.session_key, marker)
+        except (CircuitOpenError, BulkheadFullError):
+            raise  # the gateway is struggling; a respawn would only add load
+        except Exception as e:
+            sess.last_error = str(e)  # fall through and respawn
+        else:
+            sess.uses += 1
+            sess.last_used_at = now
+            sess.last_error = None if text else "timed out waiting for reply"
+            return AgentReply(sess.session_key, text, reused=True)
+
+    spawn_res = await oc.sessions_spawn(task=prompt, label=label, agent_id=agent.openclaw_agent_id)
+    child_key = spawn_res.get("childSessionKey")
+    if not child_key:
+        raise RuntimeError(f"Spawn returned no childSessionKey: {spawn_res}")
+
+    if sess is not None:
+        # Drop pending edits (last_error) so they are not flushed over the upsert.
+        db.expire(sess)
+    spawned = {
+        "agent_id": agent.id,
+        "session_key": child_key,
+        "openclaw_agent_id": agent.openclaw_agent_id,
+        "now": now,
+    }
+
+    # The spawn task may be wrapped by the gateway, so take its latest reply.
+    text = await _wait_for_reply(oc, child_key, None)
+    return AgentReply(child_key, text, reused=False, spawned=spawned)
@@ -0,0 +1,354 @@
+"""Retention and archival for turns, audit events and War Room runs.
+
+Rows older than a workspace's retention window are moved, in batches, into
+gzip-compressed JSONL segment files under `ARCHIVE_DIR`; each file is
+recorded as an `ArchiveSegment`. Read helpers let the transcript, audit and
+War Room endpoints serve archived rows alongside the (now small) live tables.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Any, Iterator
+from uuid import uuid4
+
+import orjson
+from sqlalchemy import delete, func, or_, select, true, update
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal, engine
+from .jobs import job_handler
+from .models import (
+    ArchiveSegment,
+    AuditEvent,
+    Conversation,
+    OutboundMessage,
+    RetentionPolicy,
+    Turn,
+    WarRoomRun,
+)
+from .settings import settings
+from .transcripts import TURN_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+AUDIT_COLUMNS = (
+    AuditEvent.id,
+    AuditEvent.workspace_id,
+    AuditEvent.actor,
+    AuditEvent.role,
+    AuditEvent.action,
+    AuditEvent.entity_type,
+    AuditEvent.entity_id,
+    AuditEvent.payload,
+    AuditEvent.created_at,
+)
+
+WAR_ROOM_RUN_COLUMNS = tuple(WarRoomRun.__table__.columns)
+
+
+# --- Segment files ---
+
+
+def _write_segment(
+    db: Session,
+    *,
+    kind: str,
+    workspace_id: str | None,
+    rows: list[dict],
+    conversation_id: str | None = None,
+) -> ArchiveSegment:
+    seg_id = str(uuid4())
+    directory = os.path.join(settings.archive_dir, workspace_id or "_global", kind)
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    path = os.path.join(directory, f"{stamp}-{seg_id}.jsonl.gz")
+
+    # Write to a temp name and rename, so a crash never leaves a partial segment.
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wb") as f:
+        for row in rows:
+            f.write(orjson.dumps(row) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    seg = ArchiveSegment(
+        id=seg_id,
+        workspace_id=workspace_id,
+        kind=kind,
+        conversation_id=conversation_id,
+        path=path,
+        row_count=len(rows),
+        first_created_at=rows[0].get("created_at"),
+        last_created_at=rows[-1].get("created_at"),
+    )
+    db.add(seg)
+    return seg
+
+
+def iter_segment_lines(path: str) -> Iterator[bytes]:
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield line if line.endswith(b"\n") else line + b"\n"
+
+
+def read_segment(seg: ArchiveSegment) -> Iterator[dict]:
+    for line in iter_segment_lines(seg.path):
+        yield orjson.loads(line)
+
+
+# --- Policies ---
+
+
+def _cutoff(days: int | None) -> datetime | None:
+    if days is None:
+        return None
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+def _policies(db: Session) -> list[tuple[Any, RetentionPolicy | None]]:
+    """(workspace filter, policy) pairs; policy None means the settings defaults."""
+
+    explicit = db.query(RetentionPolicy).all()
+    out: list[tuple[Any, RetentionPolicy | None]] = [(p.workspace_id, p) for p in explicit]
+    # Everything without an explicit policy (including unscoped rows) uses the defaults.
+    out.append(([p.workspace_id for p in explicit], None))
+    return out
+
+
+def _ws_filter(col, scope):
+    if not isinstance(scope, list):
+        return col == scope
+    if not scope:
+        return true()
+    return or_(col.is_(None), col.notin_(scope))
+
+
+def _days(policy: RetentionPolicy | None, field: str) -> int | None:
+    if policy is not None:
+        return getattr(policy, field)
+    return getattr(settings, f"retention_{field}")
+
+
+# --- Archiving ---
+
+
+def _archive_turns(db: Session, scope, cutoff: datetime, batch_size: int) -> int:
+    rows = db.execute(
+        select(*TURN_COLUMNS, Conversation.workspace_id.label("workspace_id"))
+        .join(Conversation, Conversation.id == Turn.conversation_id)
+        .where(_ws_filter(Conversation.workspace_id, scope), Turn.created_at < cutoff)
+        .order_by(Turn.conversation_id, Turn.seq)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return 0
+
+    segments = []
+    for conversation_id, group in groupby(rows, key=lambda r: r.conversation_id):
+        group = list(group)
+        segments.append(
+            dict(
+                kind="turns",
+                workspace_id=group[0].workspace_id,
+                conversation_id=conversation_id,
+                rows=[{k: v for k, v in r._asdict().items() if k != "workspace_id"} for r in group],
+            )
+        )
+    db.execute(delete(Turn).where(Turn.id.in_([r.id for r in rows])))
+    _commit_with_segments(db, segments)
+    return len(rows)
+
+
+def _archive_flat(db: Session, model, columns, kind: str, scope, cutoff, batch_size: int) -> int:
+    rows = db.execute(
+        select(*columns)
+        .where(_ws_filter(model.workspace_id, scope), model.created_at < cutoff)
+        .order_by(model.workspace_id, model.created_at, model.id)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return 0
+
+    ids = [r.id for r in rows]
+    if model is WarRoomRun:
+        # Outbox rows outlive their run; drop the link so the delete passes the FK.
+        db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.war_room_run_id.in_(ids))
+            .values(war_room_run_id=None)
+        )
+    db.execute(delete(model).where(model.id.in_(ids)))
+    _commit_with_segments(
+        db,
+        [
+            dict(kind=kind, workspace_id=workspace_id, rows=[r._asdict() for r in group])
+            for workspace_id, group in groupby(rows, key=lambda r: r.workspace_id)
+        ],
+    )
+    return len(rows)
+
+
+def _commit_with_segments(db: Session, segments: list[dict]) -> None:
+    """Write segment files for rows already deleted in `db`, then commit.
+
+    Files are written only once the deletes have gone through, and removed
+    again if the commit fails, so a failing pass never leaves segments that
+    duplicate rows still in the live tables.
+    """
+
+    written: list[str] = []
+    try:
+        db.flush()
+        for spec in segments:
+            written.append(_write_segment(db, **spec).path)
+        db.commit()
+    except Exception:
+        db.rollback()
+        for path in written:
+            try:
+                os.remove(path)
+            except OSError:
+                logger.warning("could not remove orphaned archive segment %s", path)
+        raise
+
+
+def run_archiver(db: Session, *, batch_size: int | None = None) -> dict[str, int]:
+    """Archive everything past its retention window; returns rows moved per kind."""
+
+    batch_size = batch_size or settings.archive_batch_size
+    moved = {"turns": 0, "audit_events": 0, "war_room_runs": 0}
+
+    for scope, policy in _policies(db):
+        cutoff = _cutoff(_days(policy, "turns_days"))
+        if cutoff is not None:
+            while n := _archive_turns(db, scope, cutoff, batch_size):
+                moved["turns"] += n
+
+        cutoff = _cutoff(_days(policy, "audit_days"))
+        if cutoff is not None:
+            while n := _archive_flat(
+                db, AuditEvent, AUDIT_COLUMNS, "audit_events", scope, cutoff, batch_size
+            ):
+                moved["audit_events"] += n
+
+        cutoff = _cutoff(_days(policy, "war_room_runs_days"))
+        if cutoff is not None:
+            while n := _archive_flat(
+                db, WarRoomRun, WAR_ROOM_RUN_COLUMNS, "war_room_runs", scope, cutoff, batch_size
+            ):
+                moved["war_room_runs"] += n
+
+    if any(moved.values()):
+        _compact()
+    return moved
+
+
+def _compact() -> None:
+    # Let SQLite hand freed pages back and refresh planner stats; Postgres
+    # relies on autovacuum. sync_schema puts the file in incremental
+    # auto-vacuum mode. executescript() steps the pragma to completion; a
+    # plain execute() frees a single page.
+    if engine.dialect.name != "sqlite":
+        return
+    raw = engine.raw_connection()
+    try:
+        raw.driver_connection.executescript("PRAGMA incremental_vacuum; PRAGMA optimize;")
+    finally:
+        raw.close()
+
+
+@job_handler("archive")
+async def archive_job(_db: Session, _payload: dict) -> dict[str, int]:
+    # Scheduled every ARCHIVE_INTERVAL_SECONDS by `schedule_periodic` (one node runs it).
+    moved = await asyncio.to_thread(_archive_once)
+    if any(moved.values()):
+        logger.info("archiver moved %s", moved)
+    return moved
+
+
+def _archive_once() -> dict[str, int]:
+    db = SessionLocal()
+    try:
+        return run_archiver(db)
+    finally:
+        db.close()
+
+
+# --- Reading archived rows ---
+
+
+def _turn_segments(db: Session, conversation_id: str) -> list[ArchiveSegment]:
+    return (
+        db.query(ArchiveSegment)
+        .filter(ArchiveSegment.kind == "turns", ArchiveSegment.conversation_id == conversation_id)
+        .order_by(ArchiveSegment.first_created_at.asc(), ArchiveSegment.created_at.asc())
+        .all()
+    )
+
+
+def archived_turns(db: Session, conversation_id: str) -> list[dict]:
+    """Archived turns of a conversation, oldest first (all older than live turns)."""
+
+    return [row for seg in _turn_segments(db, conversation_id) for row in read_segment(seg)]
+
+
+def archived_turn_count(db: Session, conversation_id: str) -> int:
+    return (
+        db.query(func.coalesce(func.sum(ArchiveSegment.row_count), 0))
+        .filter(ArchiveSegment.kind == "turns", ArchiveSegment.conversation_id == conversation_id)
+        .scalar()
+    )
+
+
+def archived_turn_paths(db: Session, conversation_id: str) -> list[str]:
+    return [seg.path for seg in _turn_segments(db, conversation_id)]
+
+
+def archived_rows(db: Session, kind: str, workspace_id: str | None, *, limit: int) -> list[dict]:
+    """Most recent archived rows of `kind`, newest first."""
+
+    q = db.query(ArchiveSegment).filter(ArchiveSegment.kind == kind)
+    if workspace_id:
+        q = q.filter(ArchiveSegment.workspace_id == workspace_id)
+
+    out: list[dict] = []
+    for seg in q.order_by(ArchiveSegment.last_created_at.desc()):
+        out.extend(reversed(list(read_segment(seg))))
+        if len(out) >= limit:
+            break
+    out.sort(key=lambda r: r.get("created_at") or "", reverse=True)
+    return out[:limit]
+
+
+def find_archived_turn(
+    db: Session, turn_id: str, conversation_id: str | None = None
+) -> dict | None:
+    """Look up an archived turn by id (scans segments; pass the conversation to narrow it)."""
+
+    q = db.query(ArchiveSegment).filter(ArchiveSegment.kind == "turns")
+    if conversation_id:
+        q = q.filter(ArchiveSegment.conversation_id == conversation_id)
+    for seg in q.order_by(ArchiveSegment.last_created_at.desc()):
+        for row in read_segment(seg):
+            if row.get("id") == turn_id:
+                return row
+    return None
+
+
+def find_archived_war_room_run(db: Session, run_id: str, workspace_id: str | None) -> dict | None:
+    q = db.query(ArchiveSegment).filter(ArchiveSegment.kind == "war_room_runs")
+    if workspace_id:
+        q = q.filter(ArchiveSegment.workspace_id == workspace_id)
+    for seg in q.order_by(ArchiveSegment.last_created_at.desc()):
+        for row in read_segment(seg):
+            if row.get("id") == run_id:
+                return row
+    return None
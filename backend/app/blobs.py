@@ -0,0 +1,100 @@
+"""Content-addressed blob store for large payloads (e.g. turn tool_events).
+
+Blobs are keyed by the sha256 of their uncompressed bytes, so identical
+payloads are stored once. Files live under `BLOB_DIR/ab/cd/<sha256>` and are
+optionally compressed with `BLOB_CODEC` (none | gzip | zstd).
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+from functools import lru_cache
+from uuid import uuid4
+
+import orjson
+
+from .settings import settings
+
+try:  # optional codec
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the install
+    zstandard = None
+
+
+class BlobNotFound(KeyError):
+    pass
+
+
+_SUFFIX = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+class LocalBlobStore:
+    def __init__(self, root: str, *, codec: str = "gzip"):
+        if codec not in _SUFFIX:
+            raise ValueError(f"Unknown blob codec: {codec}")
+        if codec == "zstd" and zstandard is None:
+            raise ValueError("BLOB_CODEC=zstd requires the `zstandard` package")
+        self.root = root
+        self.codec = codec
+
+    def _path(self, ref: str, codec: str) -> str:
+        return os.path.join(self.root, ref[:2], ref[2:4], ref + _SUFFIX[codec])
+
+    def put(self, data: bytes) -> str:
+        ref = hashlib.sha256(data).hexdigest()
+        path = self._path(ref, self.codec)
+        if os.path.exists(path):
+            return ref  # dedupe
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_compress(self.codec, data))
+        os.replace(tmp, path)
+        return ref
+
+    def get(self, ref: str) -> bytes:
+        # Look under every codec so changing BLOB_CODEC keeps old blobs readable.
+        for codec in (self.codec, *(c for c in _SUFFIX if c != self.codec)):
+            path = self._path(ref, codec)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    return _decompress(codec, f.read())
+        raise BlobNotFound(ref)
+
+
+@lru_cache
+def get_blob_store() -> LocalBlobStore:
+    return LocalBlobStore(settings.blob_dir, codec=settings.blob_codec)
+
+
+def offload_tool_events(tool_events: dict | None) -> tuple[dict | None, str | None, int | None]:
+    """Split tool_events into (inline value, blob ref, size in bytes).
+
+    Payloads at or above TOOL_EVENTS_INLINE_MAX_BYTES go to the blob store and
+    only the ref/size stay on the turn row.
+    """
+
+    if tool_events is None:
+        return None, None, None
+    data = orjson.dumps(tool_events)
+    if len(data) < settings.tool_events_inline_max_bytes:
+        return tool_events, None, len(data)
+    return None, get_blob_store().put(data), len(data)
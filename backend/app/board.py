@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Query, Session, load_only
+
+from .entity_cache import CachedAgent, cached_agents
+from .models import Agent, Task, TaskStatus, WarRoomRun
+
+# Kanban column ordering shared by the board and the War Room.
+BOARD_ORDER = (
+    Task.status.asc(),
+    Task.sort_order.asc(),
+    Task.priority.desc(),
+    Task.updated_at.desc(),
+)
+
+WAR_ROOM_STATUSES = (TaskStatus.DOING, TaskStatus.BLOCKED)
+
+
+def workspace_tasks(db: Session, workspace_id: str | None) -> Query:
+    q = db.query(Task)
+    if workspace_id:
+        q = q.filter(Task.workspace_id == workspace_id)
+    return q
+
+
+def workspace_agents(db: Session, workspace_id: str | None) -> Query:
+    q = db.query(Agent)
+    if workspace_id:
+        q = q.filter(Agent.workspace_id == workspace_id)
+    return q
+
+
+@dataclass
+class BoardSnapshot:
+    """Focus tasks of a workspace plus just the agents that own them."""
+
+    tasks: list[Task]
+    owners: dict[str, CachedAgent] = field(default_factory=dict)
+
+    def owner_of(self, task: Task) -> CachedAgent | None:
+        if not task.owner_agent_id:
+            return None
+        return self.owners.get(task.owner_agent_id)
+
+
+def board_snapshot(
+    db: Session,
+    workspace_id: str | None,
+    *,
+    statuses: tuple[TaskStatus, ...] = WAR_ROOM_STATUSES,
+) -> BoardSnapshot:
+    """Load tasks in `statuses`; their owners come from the entity cache.
+
+    Only the columns the War Room reads are selected, and owners that are
+    not cached are loaded in one query without their `soul_md`.
+    """
+
+    q = (
+        workspace_tasks(db, workspace_id)
+        .options(
+            load_only(
+                Task.id,
+                Task.workspace_id,
+                Task.title,
+                Task.description,
+                Task.status,
+                Task.priority,
+                Task.owner_agent_id,
+                Task.updated_at,
+                Task.version,
+            ),
+        )
+        .filter(Task.status.in_(statuses))
+        .order_by(Task.status.asc(), Task.priority.desc(), Task.updated_at.desc())
+    )
+    tasks = q.all()
+    owners = cached_agents(db, (t.owner_agent_id for t in tasks if t.owner_agent_id))
+    return BoardSnapshot(tasks=tasks, owners=owners)
+
+
+# --- Incremental War Room ---
+
+
+def owner_fingerprint(tasks: list[Task]) -> str:
+    """Hash of an owner's focus tasks; changes when one is added, removed or edited."""
+
+    parts = sorted(
+        f"{t.id}|{getattr(t.status, 'value', t.status)}|{t.priority}|{t.updated_at}" for t in tasks
+    )
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:32]
+
+
+def last_war_room_owners(db: Session, workspace_id: str | None) -> dict[str, dict]:
+    """Per-owner fingerprints recorded by the workspace's most recent War Room run."""
+
+    q = db.query(WarRoomRun.summary_json)
+    if workspace_id:
+        q = q.filter(WarRoomRun.workspace_id == workspace_id)
+    else:
+        q = q.filter(WarRoomRun.workspace_id.is_(None))
+    row = q.order_by(WarRoomRun.created_at.desc()).first()
+    if not row or not isinstance(row.summary_json, dict):
+        return {}
+    owners = row.summary_json.get("owners")
+    return owners if isinstance(owners, dict) else {}
+
+
+def owner_unchanged(prev: dict | None, fingerprint: str, now: datetime, max_age: timedelta) -> bool:
+    """True when the owner was refreshed recently enough and its tasks have not changed."""
+
+    if not prev or prev.get("fingerprint") != fingerprint:
+        return False
+    try:
+        refreshed_at = datetime.fromisoformat(prev["refreshed_at"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return now - refreshed_at < max_age
+
+
+def _aware(dt: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are stored as UTC.
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def pushed_state_fresh(
+    pushed_at: datetime | None, tasks: list[Task], now: datetime, max_age: timedelta
+) -> bool:
+    """True when the owner pushed their work state recently and after any task change."""
+
+    if pushed_at is None or max_age <= timedelta(0):
+        return False
+    pushed_at = _aware(pushed_at)
+    if now - pushed_at > max_age:
+        return False
+    return all(t.updated_at is None or _aware(t.updated_at) <= pushed_at for t in tasks)
@@ -0,0 +1,440 @@
+"""Streaming NDJSON import/export of agents, tasks, conversations and turns.
+
+One JSON record per line, tagged with `kind` (agent | task | conversation |
+turn). The other fields are those of the matching create schema plus `id`
+and timestamps (see `ImportRecord` in schemas.py). Exports list the kinds in
+dependency order (agents, tasks, conversations, turns), and imports expect
+that order.
+
+- Export reads through server-side cursors (`yield_per`), so memory stays
+  flat for workspaces of any size. Offloaded tool_events are inlined so a
+  dump is self-contained. Archived turns stay in their segments.
+- Import validates each batch of `BULK_BATCH_SIZE` lines, inserts it with
+  one multi-row insert per kind, and commits it with a single audit event.
+  Rows whose id already exists are skipped, so an import that stopped at a
+  bad line can simply be re-run. Turns get the next `seq` numbers of their
+  conversation in file order.
+
+CLI (works against DATABASE_URL directly):
+
+    python -m app.bulk export --workspace <id> -o workspace.ndjson
+    python -m app.bulk import workspace.ndjson --workspace <id>
+    python -m app.bulk import config/agent-templates.example.json --templates --workspace <id>
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+from uuid import uuid4
+
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .blobs import BlobNotFound, get_blob_store, offload_tool_events
+from .db import SessionLocal
+from .entity_cache import invalidate_entity
+from .models import Agent, AuditEvent, Conversation, Task, Turn
+from .schemas import ImportRecord
+from .settings import settings
+from .transcripts import TRANSCRIPT_ORDER, allocate_turn_seq
+from .upserts import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+BULK_KINDS = ("agent", "task", "conversation", "turn")
+
+_MODELS = {"agent": Agent, "task": Task, "conversation": Conversation, "turn": Turn}
+
+_EXPORT_COLUMNS = {
+    "agent": (
+        Agent.id,
+        Agent.name,
+        Agent.role,
+        Agent.soul_md,
+        Agent.model,
+        Agent.openclaw_agent_id,
+        Agent.enabled,
+        Agent.skills_allow,
+        Agent.execution_policy,
+        Agent.constraints,
+        Agent.output_contract,
+        Agent.created_at,
+    ),
+    "task": (
+        Task.id,
+        Task.title,
+        Task.description,
+        Task.status,
+        Task.priority,
+        Task.sort_order,
+        Task.owner_agent_id,
+        Task.created_at,
+        Task.updated_at,
+    ),
+    "conversation": (
+        Conversation.id,
+        Conversation.type,
+        Conversation.task_id,
+        Conversation.created_at,
+    ),
+    "turn": (
+        Turn.id,
+        Turn.conversation_id,
+        Turn.speaker_type,
+        Turn.speaker_id,
+        Turn.content,
+        Turn.tool_events,
+        Turn.tool_events_ref,
+        Turn.created_at,
+    ),
+}
+
+_RECORD = TypeAdapter(ImportRecord)
+
+
+# --- Export ---
+
+
+def _export_stmt(kind: str, workspace_id: str | None):
+    stmt = select(*_EXPORT_COLUMNS[kind])
+    if kind == "turn":
+        # Turns are scoped through their conversation; export transcripts in order.
+        stmt = stmt.join(Conversation, Conversation.id == Turn.conversation_id)
+        scope, order = Conversation.workspace_id, (Turn.conversation_id, *TRANSCRIPT_ORDER)
+    else:
+        model = _MODELS[kind]
+        scope, order = model.workspace_id, (model.id,)
+    if workspace_id:
+        stmt = stmt.where(scope == workspace_id)
+    return stmt.order_by(*order).execution_options(yield_per=settings.bulk_batch_size)
+
+
+def _export_record(kind: str, row) -> dict:
+    record = {"kind": kind, **row._asdict()}
+    if kind == "turn":
+        ref = record.pop("tool_events_ref")
+        if ref:
+            try:
+                record["tool_events"] = orjson.loads(get_blob_store().get(ref))
+            except BlobNotFound:
+                logger.warning("export: tool_events blob %s of turn %s missing", ref, row.id)
+    return record
+
+
+def export_ndjson(workspace_id: str | None, kinds: Iterable[str] = BULK_KINDS) -> Iterator[bytes]:
+    """Yield the workspace's rows as NDJSON lines (all workspaces when None).
+
+    Owns its session, like `stream_turns_ndjson`, because it outlives the request.
+    """
+
+    wanted = set(kinds)
+    db = SessionLocal()
+    try:
+        for kind in BULK_KINDS:
+            if kind not in wanted:
+                continue
+            for row in db.execute(_export_stmt(kind, workspace_id)):
+                yield orjson.dumps(_export_record(kind, row)) + b"\n"
+    finally:
+        db.close()
+
+
+# --- Import ---
+
+
+class BulkImportError(ValueError):
+    def __init__(self, line: int, detail: str):
+        super().__init__(f"line {line}: {detail}")
+        self.line = line
+        self.detail = detail
+        # What earlier (committed) batches imported, when known
+        self.result: ImportResult | None = None
+
+
+@dataclass
+class ImportResult:
+    inserted: dict[str, int] = field(default_factory=lambda: dict.fromkeys(BULK_KINDS, 0))
+    # Records whose id already existed
+    skipped: dict[str, int] = field(default_factory=lambda: dict.fromkeys(BULK_KINDS, 0))
+    batches: int = 0
+    lines: int = 0
+
+    def add(self, other: ImportResult) -> None:
+        for kind in BULK_KINDS:
+            self.inserted[kind] += other.inserted[kind]
+            self.skipped[kind] += other.skipped[kind]
+        self.batches += other.batches
+        self.lines += other.lines
+
+    def as_dict(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "skipped": self.skipped,
+            "batches": self.batches,
+            "lines": self.lines,
+        }
+
+
+def _utc(value: datetime | None, default: datetime) -> datetime:
+    if value is None:
+        return default
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _row(record, workspace_id: str | None, now: datetime) -> dict:
+    kind = record.kind
+    values = record.model_dump(exclude={"kind"})
+    values["id"] = values["id"] or str(uuid4())
+    values["created_at"] = _utc(values["created_at"], now)
+    if kind == "turn":
+        tool_events, ref, size = offload_tool_events(values.pop("tool_events"))
+        values.update(tool_events=tool_events, tool_events_ref=ref, tool_events_size=size)
+        return values
+    values["workspace_id"] = workspace_id
+    values["updated_at"] = _utc(values.pop("updated_at", None), values["created_at"])
+    if kind == "task":
+        values["version"] = 1
+    return values
+
+
+def _number_turns(db: Session, rows: list[dict], linenos: list[int]) -> None:
+    """Give turns the next seqs of their conversation, in file order.
+
+    Seqs are reserved before the insert, so turns skipped as already
+    imported leave gaps; the order is what matters.
+    """
+
+    by_conversation: dict[str, list[tuple[int, dict]]] = {}
+    for lineno, row in zip(linenos, rows):
+        by_conversation.setdefault(row["conversation_id"], []).append((lineno, row))
+    for conversation_id, group in by_conversation.items():
+        first = allocate_turn_seq(db, conversation_id, len(group))
+        if first is None:
+            db.rollback()
+            raise BulkImportError(group[0][0], f"unknown conversation {conversation_id}")
+        for seq, (_, row) in enumerate(group, start=first):
+            row["seq"] = seq
+
+
+def _parse(lines: Iterable[tuple[int, bytes | str]]) -> list:
+    records = []
+    for lineno, line in lines:
+        try:
+            records.append(_RECORD.validate_json(line))
+        except ValidationError as e:
+            err = e.errors(include_url=False)[0]
+            loc = ".".join(str(p) for p in err["loc"])
+            raise BulkImportError(lineno, f"{loc}: {err['msg']}" if loc else err["msg"]) from None
+    return records
+
+
+def import_batch(
+    db: Session,
+    lines: list[tuple[int, bytes | str]],
+    *,
+    workspace_id: str | None,
+    actor: str,
+    role: str,
+) -> ImportResult:
+    """Validate and insert one batch of (line number, NDJSON line), then commit.
+
+    Nothing from the batch is written if any of its lines is invalid.
+    """
+
+    result = ImportResult(batches=1, lines=len(lines))
+    records = _parse(lines)
+    now = datetime.now(timezone.utc)
+    rows: dict[str, list[dict]] = {kind: [] for kind in BULK_KINDS}
+    turn_lines: list[int] = []
+    for (lineno, _), record in zip(lines, records):
+        rows[record.kind].append(_row(record, workspace_id, now))
+        if record.kind == "turn":
+            turn_lines.append(lineno)
+
+    for kind in BULK_KINDS:
+        if not rows[kind]:
+            continue
+        if kind == "turn":
+            _number_turns(db, rows[kind], turn_lines)
+        model = _MODELS[kind]
+        stmt = (
+            dialect_insert(db, model)
+            .on_conflict_do_nothing(index_elements=[model.id])
+            .returning(model.id)
+        )
+        try:
+            inserted = len(db.execute(stmt, rows[kind]).all())
+        except IntegrityError as e:
+            db.rollback()
+            raise BulkImportError(lines[0][0], f"batch rejected: {e.orig}") from None
+        result.inserted[kind] = inserted
+        result.skipped[kind] = len(rows[kind]) - inserted
+
+    db.add(
+        AuditEvent(
+            id=str(uuid4()),
+            workspace_id=workspace_id,
+            actor=actor,
+            role=role,
+            action="bulk.import",
+            entity_type="bulk",
+            entity_id=None,
+            payload={
+                "first_line": lines[0][0] if lines else None,
+                "last_line": lines[-1][0] if lines else None,
+                **result.as_dict(),
+            },
+        )
+    )
+    db.commit()
+    return result
+
+
+def numbered_lines(lines: Iterable[bytes | str]) -> Iterator[tuple[int, bytes | str]]:
+    """Number lines from 1, dropping blank ones."""
+
+    for lineno, line in enumerate(lines, 1):
+        if line.strip():
+            yield lineno, line
+
+
+def import_ndjson(
+    db: Session,
+    lines: Iterable[bytes | str],
+    *,
+    workspace_id: str | None,
+    actor: str,
+    role: str,
+    batch_size: int | None = None,
+) -> ImportResult:
+    """Import NDJSON lines in committed batches; raises BulkImportError at the first bad line."""
+
+    batch_size = batch_size or settings.bulk_batch_size
+    total = ImportResult()
+    batch: list[tuple[int, bytes | str]] = []
+    try:
+        for item in numbered_lines(lines):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                total.add(
+                    import_batch(db, batch, workspace_id=workspace_id, actor=actor, role=role)
+                )
+                batch = []
+        if batch:
+            total.add(import_batch(db, batch, workspace_id=workspace_id, actor=actor, role=role))
+    except BulkImportError as e:
+        e.result = total
+        raise
+    return total
+
+
+async def aiter_numbered_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    """`numbered_lines` over a streamed request body."""
+
+    lineno = 0
+    buf = b""
+    async for chunk in chunks:
+        buf += chunk
+        *complete, buf = buf.split(b"\n")
+        for line in complete:
+            lineno += 1
+            if line.strip():
+                yield lineno, line
+    if buf.strip():
+        yield lineno + 1, buf
+
+
+def template_lines(path: str) -> Iterator[bytes]:
+    """Agent records from an agent-templates JSON file (a list of agent definitions).
+
+    Template ids (e.g. "ops") are names, not row ids, so imported agents get new ids.
+    """
+
+    with open(path, "rb") as f:
+        templates = orjson.loads(f.read())
+    for tpl in templates:
+        tpl = {k: v for k, v in tpl.items() if k != "id"}
+        yield orjson.dumps({"kind": "agent", **tpl})
+
+
+# --- CLI ---
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="NDJSON import/export (uses DATABASE_URL)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser("export", help="write a workspace as NDJSON")
+    exp.add_argument("--workspace", help="workspace id (default: all rows)")
+    exp.add_argument("--kinds", default=",".join(BULK_KINDS), help="comma-separated subset")
+    exp.add_argument("-o", "--output", default="-", help="file (default: stdout)")
+
+    imp = sub.add_parser("import", help="load NDJSON (or agent templates) into a workspace")
+    imp.add_argument("path", help="NDJSON file, or - for stdin")
+    imp.add_argument("--workspace", help="workspace id the rows are imported into")
+    imp.add_argument("--templates", action="store_true", help="path is an agent-templates file")
+    imp.add_argument("--batch-size", type=int, default=settings.bulk_batch_size)
+    imp.add_argument("--actor", default="cli")
+
+    args = parser.parse_args(argv)
+
+    # Same schema setup as the API process (tables, added columns, search triggers).
+    from .db import engine, sync_schema
+    from .models import Base
+    from .search import install_search
+
+    sync_schema(Base.metadata)
+    install_search(engine)
+
+    if args.command == "export":
+        kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+        out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+        try:
+            for line in export_ndjson(args.workspace, kinds):
+                out.write(line)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        return 0
+
+    if args.templates:
+        lines: Iterable[bytes] = template_lines(args.path)
+    elif args.path == "-":
+        lines = sys.stdin.buffer
+    else:
+        lines = open(args.path, "rb")
+    db = SessionLocal()
+    try:
+        result = import_ndjson(
+            db,
+            lines,
+            workspace_id=args.workspace,
+            actor=args.actor,
+            role="admin",
+            batch_size=args.batch_size,
+        )
+    except BulkImportError as e:
+        print(f"import failed at {e}; earlier batches were committed", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+        if hasattr(lines, "close"):
+            lines.close()
+        # Running API workers pick this up when ENTITY_CACHE_REDIS_URL is set.
+        invalidate_entity("agent", None)
+    print(orjson.dumps(result.as_dict()).decode())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
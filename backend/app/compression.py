@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # optional: pip install "openclaw-mission-control-backend[brotli]"
+    import brotli
+except ImportError:  # pragma: no cover - depends on the install
+    brotli = None
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    out: set[str] = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for p in params.split(";"):
+            k, _, v = p.strip().partition("=")
+            if k == "q":
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            out.add(token)
+    return out
+
+
+class _Compressor:
+    def __init__(self, encoding: str, *, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 -> gzip container
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Flush per chunk so streamed responses (NDJSON) reach the client promptly.
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.flush()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._br.finish()
+        return self._gz.flush(zlib.Z_FINISH)
+
+    def whole(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.finish()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """Compress responses with Brotli (if installed) or gzip.
+
+    Only bodies of at least `minimum_size` bytes whose content type starts
+    with one of `content_types` are compressed. Streaming responses are
+    compressed chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        content_types: tuple[str, ...] = ("application/json",),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(ct.lower() for ct in content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _negotiate(self, scope: Scope) -> str | None:
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._negotiate(scope)
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+        await _Responder(self, encoding, send)(scope, receive)
+
+
+class _Responder:
+    def __init__(self, mw: CompressionMiddleware, encoding: str, send: Send):
+        self.mw = mw
+        self.encoding = encoding
+        self.send = send
+        self.start: Message | None = None
+        self.compressor: _Compressor | None = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive) -> None:
+        await self.mw.app(scope, receive, self._send)
+
+    def _eligible(self, headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers:
+            return False
+        ctype = headers.get("content-type", "").lower()
+        return any(ctype.startswith(ct) for ct in self.mw.content_types)
+
+    async def _send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=start["headers"])
+            if not self._eligible(headers) or (not more_body and len(body) < self.mw.minimum_size):
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            self.compressor = _Compressor(
+                self.encoding,
+                gzip_level=self.mw.gzip_level,
+                brotli_quality=self.mw.brotli_quality,
+            )
+            headers["content-encoding"] = self.encoding
+            headers.add_vary_header("accept-encoding")
+            if more_body:
+                del headers["content-length"]
+                body = self.compressor.chunk(body)
+            else:
+                body = self.compressor.whole(body)
+                headers["content-length"] = str(len(body))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        if self.passthrough or self.compressor is None:
+            await self.send(message)
+            return
+
+        data = self.compressor.chunk(body)
+        if not more_body:
+            data += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import MetaData, create_engine, inspect
 from sqlalchemy.orm import sessionmaker
 
 from .settings import settings
@@ -17,3 +17,46 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def sync_schema(metadata: MetaData) -> None:
+    """create_all() plus the additive changes it skips on existing tables.
+
+    Adds missing nullable columns, NOT NULL columns that have a server
+    default, and missing indexes, so older databases pick up new fields
+    without a migration. Anything else (type changes, NOT NULL columns
+    without a default) still needs a manual migration.
+    """
+
+    _enable_incremental_vacuum()
+    metadata.create_all(bind=engine)
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in existing:
+                    continue
+                ddl = col.type.compile(dialect=engine.dialect)
+                if not col.nullable:
+                    if col.server_default is None:
+                        continue
+                    default = col.server_default.arg
+                    default = f"'{default}'" if isinstance(default, str) else default.text
+                    ddl += f" NOT NULL DEFAULT {default}"
+                conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN "{col.name}" {ddl}')
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+def _enable_incremental_vacuum() -> None:
+    # The archiver runs `PRAGMA incremental_vacuum` to give freed pages back,
+    # which only works in incremental auto-vacuum mode. Switching an existing
+    # file needs a one-off VACUUM, which cannot run inside a transaction.
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2:
+            return
+        conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.exec_driver_sql("VACUUM")
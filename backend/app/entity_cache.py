@@ -0,0 +1,297 @@
+"""In-process read-through cache for agents and workspaces.
+
+These rows change rarely but are read on hot paths: every War Room resolves
+its owners and the workspace's Telegram destination. Entries are frozen
+snapshots (`CachedAgent`, ...), not ORM objects, so they can be shared
+across sessions and threads. Each kind has an LRU bounded by
+`ENTITY_CACHE_MAX_ENTRIES`, keyed by `(kind, id)`, and entries expire after
+`ENTITY_CACHE_TTL_SECONDS`.
+
+Handlers call `invalidate_entity(kind, id)` after committing a create/update. When
+`ENTITY_CACHE_REDIS_URL` is set (needs the `redis` package), invalidations
+are also published so other API workers drop their copies. The TTL bounds
+staleness if a message is lost.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, Iterable, TypeVar
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from .models import Agent, Workspace
+from .settings import settings
+
+try:  # optional: cross-worker invalidation
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - depends on the install
+    redis = None
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+CHANNEL = "mc:entity-cache"
+_ORIGIN = uuid4().hex  # skip our own published messages
+
+
+@dataclass(frozen=True)
+class CachedAgent:
+    id: str
+    workspace_id: str | None
+    name: str
+    role: str
+    model: str | None
+    openclaw_agent_id: str | None
+    enabled: bool
+    output_contract: dict | None
+
+
+@dataclass(frozen=True)
+class CachedWorkspace:
+    id: str
+    name: str
+    gateway_id: str | None
+    telegram_chat_id: str | None
+    telegram_topic_id: str | None
+
+
+class EntityCache(Generic[V]):
+    """Thread-safe LRU with a TTL. `None` results are cached too (row not found).
+
+    Entries are stored under `(kind, id)`, so a cache only ever answers for
+    its own kind even if ids from different tables collide.
+    """
+
+    def __init__(self, kind: str, *, max_entries: int, ttl: float):
+        self.kind = kind
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, Hashable], tuple[float, V | None]] = OrderedDict()
+        # Bumped by every invalidation; a load that raced one is not stored.
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _key(self, key: Hashable) -> tuple[str, Hashable]:
+        return (self.kind, key)
+
+    def lookup(self, key: Hashable) -> tuple[bool, V | None]:
+        key = self._key(key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def epoch(self) -> int:
+        with self._lock:
+            return self._epoch
+
+    def store(self, key: Hashable, value: V | None, epoch: int) -> None:
+        key = self._key(key)
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, key: Hashable, load: Callable[[], V | None]) -> V | None:
+        found, value = self.lookup(key)
+        if found:
+            return value
+        epoch = self.epoch()
+        value = load()
+        self.store(key, value, epoch)
+        return value
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drop one entry, or all of them when `key` is None."""
+
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._key(key), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def _cache(kind: str) -> EntityCache:
+    return EntityCache(
+        kind, max_entries=settings.entity_cache_max_entries, ttl=settings.entity_cache_ttl_seconds
+    )
+
+
+agents: EntityCache[CachedAgent] = _cache("agent")
+workspaces: EntityCache[CachedWorkspace] = _cache("workspace")
+_CACHES = {c.kind: c for c in (agents, workspaces)}
+
+
+def _agent(row: Agent) -> CachedAgent:
+    return CachedAgent(
+        id=row.id,
+        workspace_id=row.workspace_id,
+        name=row.name,
+        role=row.role,
+        model=row.model,
+        openclaw_agent_id=row.openclaw_agent_id,
+        enabled=row.enabled,
+        output_contract=row.output_contract,
+    )
+
+
+_AGENT_COLUMNS = (
+    Agent.id,
+    Agent.workspace_id,
+    Agent.name,
+    Agent.role,
+    Agent.model,
+    Agent.openclaw_agent_id,
+    Agent.enabled,
+    Agent.output_contract,
+)
+
+
+def cached_agent(db: Session, agent_id: str) -> CachedAgent | None:
+    return cached_agents(db, [agent_id]).get(agent_id)
+
+
+def cached_agents(db: Session, agent_ids: Iterable[str]) -> dict[str, CachedAgent]:
+    """Agents by id; cache misses are loaded with a single query."""
+
+    out: dict[str, CachedAgent] = {}
+    missing: list[str] = []
+    for agent_id in dict.fromkeys(agent_ids):
+        if not settings.entity_cache_enabled:
+            missing.append(agent_id)
+            continue
+        found, value = agents.lookup(agent_id)
+        if not found:
+            missing.append(agent_id)
+        elif value is not None:
+            out[agent_id] = value
+    if not missing:
+        return out
+
+    epoch = agents.epoch()
+    rows = {r.id: _agent(r) for r in db.query(*_AGENT_COLUMNS).filter(Agent.id.in_(missing))}
+    for agent_id in missing:
+        value = rows.get(agent_id)
+        if settings.entity_cache_enabled:
+            agents.store(agent_id, value, epoch)
+        if value is not None:
+            out[agent_id] = value
+    return out
+
+
+def cached_workspace(db: Session, workspace_id: str) -> CachedWorkspace | None:
+    def load() -> CachedWorkspace | None:
+        row = db.get(Workspace, workspace_id)
+        if row is None:
+            return None
+        return CachedWorkspace(
+            id=row.id,
+            name=row.name,
+            gateway_id=row.gateway_id,
+            telegram_chat_id=row.telegram_chat_id,
+            telegram_topic_id=row.telegram_topic_id,
+        )
+
+    if not settings.entity_cache_enabled:
+        return load()
+    return workspaces.get(workspace_id, load)
+
+
+# --- Invalidation ---
+
+
+_publisher = None
+
+
+def _publish(message: str) -> None:
+    global _publisher
+    if not settings.entity_cache_redis_url or redis is None:
+        return
+    try:
+        if _publisher is None:
+            _publisher = redis.Redis.from_url(settings.entity_cache_redis_url)
+        _publisher.publish(CHANNEL, f"{_ORIGIN}|{message}")
+    except Exception:
+        # Other workers fall back to the TTL.
+        logger.warning("entity cache invalidation publish failed", exc_info=True)
+
+
+def _evict(kind: str, key: str) -> None:
+    cache = _CACHES.get(kind)
+    if cache is not None:
+        cache.invalidate(key or None)
+
+
+def invalidate_entity(kind: str, key: str | None) -> None:
+    """Drop a cached entity here and, when configured, in every other worker."""
+
+    _evict(kind, key or "")
+    _publish(f"{kind}|{key or ''}")
+
+
+async def invalidation_listener() -> None:
+    """Apply invalidations published by other workers (runs for the process lifetime)."""
+
+    if aioredis is None:
+        logger.warning("ENTITY_CACHE_REDIS_URL is set but the `redis` package is missing")
+        return
+    while True:
+        try:
+            client = aioredis.from_url(settings.entity_cache_redis_url)
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(CHANNEL)
+                async for msg in pubsub.listen():
+                    if msg.get("type") != "message":
+                        continue
+                    origin, kind, key = msg["data"].decode().split("|", 2)
+                    if origin != _ORIGIN:
+                        _evict(kind, key)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("entity cache listener failed; reconnecting", exc_info=True)
+            # Anything published meanwhile was missed.
+            for cache in _CACHES.values():
+                cache.invalidate()
+            await asyncio.sleep(5)
+
+
+def entity_cache_stats() -> dict:
+    return {kind: cache.stats() for kind, cache in _CACHES.items()}
@@ -0,0 +1,145 @@
+"""Agent-pushed work state and transcript turns (`POST /api/agent-updates`).
+
+Agents report progress themselves, instead of waiting to be woken by a War
+Room. Each request is a batch of work-state updates and turns, applied in
+one transaction with one audit event. Items may carry an `idempotency_key`:
+a key that was already applied (within `INGEST_KEY_TTL_HOURS`), or that
+repeats inside the batch, is skipped. Retried batches are therefore safe.
+
+A War Room does not ask an owner whose pushed state is fresh and newer than
+their focus tasks (see `board.pushed_state_fresh`).
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from .entity_cache import cached_agents
+from .models import AuditEvent, Conversation, IngestKey
+from .schemas import AgentUpdatesIn
+from .settings import settings
+from .transcripts import append_turns
+from .upserts import dialect_insert, upsert_work_states
+
+_last_prune = float("-inf")
+
+
+class IngestError(ValueError):
+    pass
+
+
+@dataclass
+class IngestResult:
+    work_states: int
+    turns: int
+    duplicates: int
+    # Workspaces whose agents changed (for cache invalidation)
+    workspaces: set[str | None]
+
+
+def _claim_keys(db: Session, keys: list[str]) -> set[str]:
+    """Record `keys`; returns the ones that were not seen before."""
+
+    if not keys:
+        return set()
+    stmt = (
+        dialect_insert(db, IngestKey)
+        .on_conflict_do_nothing(index_elements=[IngestKey.key])
+        .returning(IngestKey.key)
+    )
+    return set(db.execute(stmt, [{"key": k} for k in keys]).scalars())
+
+
+def _prune_keys(db: Session) -> None:
+    global _last_prune
+    now = time.monotonic()
+    if now - _last_prune < 600:
+        return
+    _last_prune = now
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.ingest_key_ttl_hours)
+    db.execute(delete(IngestKey).where(IngestKey.created_at < cutoff))
+
+
+def ingest_agent_updates(
+    db: Session, body: AgentUpdatesIn, *, actor: str, role: str, workspace_id: str | None
+) -> IngestResult:
+    """Apply a batch and commit; raises IngestError (nothing written) on unknown ids."""
+
+    items = [*body.work_states, *body.turns]
+    if len(items) > settings.ingest_max_items:
+        raise IngestError(f"At most {settings.ingest_max_items} items per batch")
+
+    agents = cached_agents(db, {u.agent_id for u in body.work_states})
+    unknown = {u.agent_id for u in body.work_states} - agents.keys()
+    if unknown:
+        raise IngestError(f"Unknown agents: {', '.join(sorted(unknown))}")
+    convo_ids = {t.conversation_id for t in body.turns}
+    if convo_ids:
+        found = set(db.scalars(select(Conversation.id).where(Conversation.id.in_(convo_ids))))
+        if convo_ids - found:
+            raise IngestError(f"Unknown conversations: {', '.join(sorted(convo_ids - found))}")
+
+    # First occurrence of a key in the batch wins; later ones are duplicates.
+    keys = list(dict.fromkeys(i.idempotency_key for i in items if i.idempotency_key))
+    fresh = _claim_keys(db, keys)
+    seen: set[str] = set()
+
+    def new(item) -> bool:
+        key = item.idempotency_key
+        if key is None:
+            return True
+        if key in seen or key not in fresh:
+            return False
+        seen.add(key)
+        return True
+
+    work_states = [u for u in body.work_states if new(u)]
+    turns = [t for t in body.turns if new(t)]
+    duplicates = len(items) - len(work_states) - len(turns)
+
+    now = datetime.now(timezone.utc)
+    # One row per agent (the last update in the batch wins).
+    latest = {
+        u.agent_id: u.model_dump(include={"agent_id", "task_id", "status", "next_step", "blockers"})
+        for u in work_states
+    }
+    if latest:
+        upsert_work_states(db, list(latest.values()), pushed_at=now)
+
+    by_conversation: dict[str, list] = {}
+    for t in turns:
+        by_conversation.setdefault(t.conversation_id, []).append(t)
+    for conversation_id, items in by_conversation.items():
+        append_turns(db, conversation_id, items)
+
+    db.add(
+        AuditEvent(
+            id=str(uuid4()),
+            workspace_id=workspace_id,
+            actor=actor,
+            role=role,
+            action="agent_updates.ingest",
+            entity_type="agent_work_state",
+            entity_id=None,
+            payload={
+                "agents": sorted(latest),
+                "work_states": len(work_states),
+                "turns": len(turns),
+                "duplicates": duplicates,
+            },
+        )
+    )
+    _prune_keys(db)
+    db.commit()
+    return IngestResult(
+        work_states=len(work_states),
+        turns=len(turns),
+        duplicates=duplicates,
+        workspaces={agents[a].workspace_id for a in latest},
+    )
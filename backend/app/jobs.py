@@ -0,0 +1,347 @@
+"""Database-backed job queue shared by every API node.
+
+Work that should run on one node rather than on every node (a background
+War Room, an archiver pass) is enqueued as a `Job` row with `enqueue_job`,
+and each node's `job_worker_loop` claims due jobs, up to `JOB_WORKERS` at a
+time. Delivery is at least once: a job whose node dies after the work but
+before recording the result runs again.
+
+- Claiming is one `UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED
+  LIMIT n) RETURNING`: on Postgres concurrent nodes skip each other's rows
+  instead of queueing on them. SQLite has no row locks (the clause is not
+  rendered); the single conditional statement runs under its database write
+  lock, which gives the same guarantee.
+- A claimed job holds a lease (`JOB_LEASE_SECONDS`) that its node renews
+  with heartbeats. If the node dies the lease runs out and another node
+  takes the job over. A node that loses its lease stops the job, and its
+  late result is ignored.
+- Failures are retried with exponential backoff, up to the job's
+  `max_attempts`. A handler can raise `JobDeferred` to be re-run later
+  without spending an attempt.
+- `singleton_key` allows at most one unfinished job per key (unique
+  column, cleared when the job finishes); enqueueing another returns the
+  existing one.
+
+Handlers are registered with `@job_handler(kind)` and called as
+`await handler(db, payload)`; their return value (JSON) is stored as the
+job's result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal
+from .models import Job
+from .settings import settings
+from .upserts import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Session, dict], Awaitable[Any]]
+
+# Identifies this process in `locked_by`.
+NODE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+
+_handlers: dict[str, Handler] = {}
+_last_prune = float("-inf")
+
+
+class JobDeferred(Exception):
+    """Raised by a handler to run the job again in `delay` seconds (no attempt spent)."""
+
+    def __init__(self, delay: float, reason: str = ""):
+        super().__init__(reason or f"deferred for {delay:.0f}s")
+        self.delay = delay
+
+
+def job_handler(kind: str) -> Callable[[Handler], Handler]:
+    def register(fn: Handler) -> Handler:
+        _handlers[kind] = fn
+        return fn
+
+    return register
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: dict | None = None,
+    *,
+    workspace_id: str | None = None,
+    singleton_key: str | None = None,
+    delay: float = 0,
+    max_attempts: int | None = None,
+) -> Job:
+    """Add a job (caller commits; a singleton insert is flushed right away).
+
+    With `singleton_key`, returns the unfinished job holding that key
+    instead, if there is one.
+    """
+
+    values = {
+        "id": str(uuid4()),
+        "workspace_id": workspace_id,
+        "kind": kind,
+        "payload": payload or {},
+        "singleton_key": singleton_key,
+        "status": "pending",
+        "attempts": 0,
+        "max_attempts": max_attempts or settings.job_max_attempts,
+        "run_at": _now() + timedelta(seconds=delay),
+    }
+    if singleton_key is None:
+        job = Job(**values)
+        db.add(job)
+        return job
+
+    # Insert-or-get, so concurrent nodes agree on a single job.
+    stmt = (
+        dialect_insert(db, Job)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=[Job.singleton_key])
+    )
+    db.execute(stmt)
+    return db.query(Job).filter(Job.singleton_key == singleton_key).one()
+
+
+def _backoff(attempts: int) -> timedelta:
+    delay = settings.job_backoff_base_seconds * (2 ** max(0, attempts - 1))
+    return timedelta(seconds=min(delay, settings.job_backoff_max_seconds))
+
+
+def _expired(now: datetime):
+    return and_(Job.status == "running", Job.locked_until < now)
+
+
+def claim_jobs(db: Session, limit: int) -> list[Any]:
+    """Claim up to `limit` due jobs for this node and commit; returns the claimed rows."""
+
+    now = _now()
+    kinds = list(_handlers)
+    # Jobs whose node died on their last attempt are not retried.
+    db.execute(
+        update(Job)
+        .where(_expired(now), Job.attempts >= Job.max_attempts)
+        .values(
+            status="failed",
+            last_error="lease expired",
+            locked_by=None,
+            locked_until=None,
+            singleton_key=None,
+            finished_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    due = (
+        select(Job.id)
+        .where(
+            Job.kind.in_(kinds),
+            or_(and_(Job.status == "pending", Job.run_at <= now), _expired(now)),
+            Job.attempts < Job.max_attempts,
+        )
+        .order_by(Job.run_at.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(
+        update(Job)
+        .where(Job.id.in_(due))
+        .values(
+            status="running",
+            attempts=Job.attempts + 1,
+            locked_by=NODE_ID,
+            locked_until=now + timedelta(seconds=settings.job_lease_seconds),
+            started_at=now,
+        )
+        .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+        .execution_options(synchronize_session=False)
+    ).all()
+    _prune(db, now)
+    db.commit()
+    return rows
+
+
+def _prune(db: Session, now: datetime) -> None:
+    global _last_prune
+    if time.monotonic() - _last_prune < 600:
+        return
+    _last_prune = time.monotonic()
+    cutoff = now - timedelta(days=settings.job_retention_days)
+    db.execute(
+        delete(Job)
+        .where(Job.status.in_(["done", "failed"]), Job.finished_at < cutoff)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _owned(job_id: str):
+    # Every write by the running node is conditional on still holding the lease.
+    return and_(Job.id == job_id, Job.status == "running", Job.locked_by == NODE_ID)
+
+
+def _settle(job_id: str, **values) -> bool:
+    db = SessionLocal()
+    try:
+        res = db.execute(
+            update(Job)
+            .where(_owned(job_id))
+            .values(locked_by=None, locked_until=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return bool(res.rowcount)
+    finally:
+        db.close()
+
+
+def _finish(job_id: str, status: str, *, result: Any = None, error: str | None = None) -> bool:
+    return _settle(
+        job_id,
+        status=status,
+        result=result,
+        last_error=error,
+        singleton_key=None,
+        finished_at=_now(),
+    )
+
+
+def _retry(job: Any, error: str) -> bool:
+    if job.attempts >= job.max_attempts:
+        return _finish(job.id, "failed", error=error)
+    return _settle(
+        job.id, status="pending", last_error=error, run_at=_now() + _backoff(job.attempts)
+    )
+
+
+def _put_back(job_id: str, delay: float, error: str | None = None) -> bool:
+    # Not the job's fault (deferred, node shutting down): the attempt is given back.
+    return _settle(
+        job_id,
+        status="pending",
+        attempts=Job.attempts - 1,
+        last_error=error,
+        run_at=_now() + timedelta(seconds=delay),
+    )
+
+
+def _renew(job_id: str) -> bool:
+    db = SessionLocal()
+    try:
+        res = db.execute(
+            update(Job)
+            .where(_owned(job_id))
+            .values(locked_until=_now() + timedelta(seconds=settings.job_lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return bool(res.rowcount)
+    finally:
+        db.close()
+
+
+async def _keep_lease(job_id: str, task: asyncio.Task) -> None:
+    while True:
+        await asyncio.sleep(settings.job_lease_seconds / 3)
+        if not _renew(job_id):
+            # Taken over after a missed heartbeat: stop, the new owner reruns it.
+            logger.warning("job %s lost its lease; cancelling", job_id)
+            task.cancel()
+            return
+
+
+async def run_job(job: Any) -> None:
+    """Run one claimed job to completion, retry or put-back."""
+
+    handler = _handlers[job.kind]
+    db = SessionLocal()
+    work = asyncio.create_task(handler(db, job.payload or {}))
+    lease = asyncio.create_task(_keep_lease(job.id, work))
+    try:
+        result = await asyncio.shield(work)
+    except asyncio.CancelledError:
+        lease.cancel()
+        if not work.done():
+            # This node is shutting down: hand the job back.
+            work.cancel()
+            await asyncio.gather(work, return_exceptions=True)
+            _put_back(job.id, 0, "node shut down")
+            raise
+        # Cancelled by a lost lease: the job is no longer ours.
+        return
+    except JobDeferred as e:
+        lease.cancel()
+        _put_back(job.id, e.delay, str(e))
+        return
+    except Exception as e:
+        lease.cancel()
+        logger.exception("job %s (%s) failed", job.id, job.kind)
+        db.rollback()
+        _retry(job, f"{type(e).__name__}: {e}")
+        return
+    finally:
+        db.close()
+    lease.cancel()
+    if not _finish(job.id, "done", result=result):
+        logger.warning("job %s finished after losing its lease; result dropped", job.id)
+
+
+async def job_worker_loop(slots: int, interval: float) -> None:
+    """Claim and run jobs on this node, at most `slots` at a time."""
+
+    running: set[asyncio.Task] = set()
+    try:
+        while True:
+            claimed = []
+            if len(running) < slots:
+                db = SessionLocal()
+                try:
+                    claimed = claim_jobs(db, slots - len(running))
+                except Exception:
+                    logger.exception("job claim failed")
+                    db.rollback()
+                finally:
+                    db.close()
+            for job in claimed:
+                task = asyncio.create_task(run_job(job))
+                running.add(task)
+                task.add_done_callback(running.discard)
+            await asyncio.sleep(interval)
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+async def schedule_periodic(kind: str, interval: float) -> None:
+    """Keep one `kind` job queued `interval` seconds ahead, for the whole deployment.
+
+    Every node runs this; the singleton key lets only one pending or running
+    job of the kind exist, so the work happens about once per interval.
+    """
+
+    while True:
+        db = SessionLocal()
+        try:
+            enqueue_job(db, kind, singleton_key=f"periodic:{kind}", delay=interval)
+            db.commit()
+        except Exception:
+            logger.exception("scheduling %s failed", kind)
+            db.rollback()
+        finally:
+            db.close()
+        await asyncio.sleep(min(interval, 60))
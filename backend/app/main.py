@@ -1,12 +1,61 @@
+import asyncio
 import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from itertools import chain, count
 from uuid import uuid4
 
-from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, undefer
+from sqlalchemy.orm.exc import StaleDataError
+
+from .agent_sessions import ask_agent
+from .archive import (
+    archived_rows,
+    archived_turn_count,
+    archived_turn_paths,
+    archived_turns,
+    find_archived_turn,
+    find_archived_war_room_run,
+    iter_segment_lines,
+    run_archiver,
+)
+from .blobs import BlobNotFound, get_blob_store, offload_tool_events
+from .board import (
+    BOARD_ORDER,
+    board_snapshot,
+    last_war_room_owners,
+    owner_fingerprint,
+    owner_unchanged,
+    pushed_state_fresh,
+    workspace_agents,
+    workspace_tasks,
+)
+from .bulk import (
+    BULK_KINDS,
+    BulkImportError,
+    ImportResult,
+    aiter_numbered_lines,
+    export_ndjson,
+    import_batch,
+)
+from .compression import CompressionMiddleware
 from .crypto import CryptoError, encrypt_token
-from .db import engine, get_db
+from .db import SessionLocal, engine, get_db, sync_schema
+from .entity_cache import (
+    cached_agent,
+    cached_workspace,
+    entity_cache_stats,
+    invalidate_entity,
+    invalidation_listener,
+)
+from .ingest import IngestError, ingest_agent_updates
+from .jobs import JobDeferred, enqueue_job, job_handler, job_worker_loop, schedule_periodic
 from .models import (
     Agent,
     AgentWorkState,
@@ -15,6 +64,9 @@ from .models import (
     Conversation,
     ConversationType,
     Gateway,
+    Job,
+    OutboundMessage,
+    RetentionPolicy,
     Task,
     Turn,
     WarRoomRun,
@@ -22,28 +74,90 @@ from .models import (
 )
 from .openclaw import get_openclaw
 from .openclaw_status import probe_openclaw, status_dict
+from .outbox import deliver_due, enqueue_message, outbox_loop
+from .owner_updates import TaskIndex, has_blockers, parse_owner_updates, required_fields_for
+from .ratelimit import RateLimitMiddleware, war_room_admission
+from .readcache import coalesced_response, invalidate, read_cache
+from .replica import ReadYourWritesMiddleware, get_read_db, session_factory_for
+from .responses import FastJSONResponse, render_rows, rows_response
 from .schemas import (
     AgentCreate,
     AgentOut,
+    AgentSummaryOut,
+    AgentUpdatesIn,
     AgentWorkStateUpsert,
     AuditEventOut,
     ConversationCreate,
     ConversationOut,
     GatewayCreate,
     GatewayOut,
+    JobOut,
+    OutboundMessageOut,
+    RetentionPolicyIn,
+    RetentionPolicyOut,
+    SearchPageOut,
     TaskCreate,
     TaskOut,
+    TaskSummaryOut,
+    TurnBatchIn,
     TurnCreate,
     TurnOut,
+    TurnPageOut,
     WarRoomRunOut,
     WorkspaceCreate,
     WorkspaceOut,
 )
+from .search import install_search, search
 from .settings import settings
-
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="OpenClaw Mission Control API", version="0.0.1")
+from .transcripts import (
+    TRANSCRIPT_ORDER,
+    allocate_turn_seq,
+    append_turns,
+    backfill_turn_seq,
+    stream_turns_ndjson,
+    tail_turns,
+    turns_after,
+)
+from .upserts import move_task, upsert_agent_session, upsert_work_state
+
+sync_schema(Base.metadata)
+with SessionLocal() as _db:
+    backfill_turn_seq(_db)
+search_available = install_search(engine)
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    # Background workers run for the lifetime of the process.
+    workers: list[asyncio.Task] = []
+    if settings.archive_interval_seconds > 0:
+        # Queued as a job, so one node archives per interval rather than all of them.
+        workers.append(
+            asyncio.create_task(schedule_periodic("archive", settings.archive_interval_seconds))
+        )
+    if settings.job_workers > 0:
+        workers.append(
+            asyncio.create_task(job_worker_loop(settings.job_workers, settings.job_poll_seconds))
+        )
+    if settings.outbox_poll_seconds > 0:
+        workers.append(asyncio.create_task(outbox_loop(settings.outbox_poll_seconds)))
+    if settings.entity_cache_redis_url:
+        workers.append(asyncio.create_task(invalidation_listener()))
+    try:
+        yield
+    finally:
+        for w in workers:
+            w.cancel()
+        # Lets the job worker hand its running jobs back before the process exits.
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+app = FastAPI(
+    title="OpenClaw Mission Control API",
+    version="0.0.1",
+    default_response_class=FastJSONResponse,
+    lifespan=_lifespan,
+)
 
 
 def _require_api_key(x_mc_api_key: str | None = Header(default=None)):
@@ -75,6 +189,17 @@ def _workspace_from_header(x_mc_workspace: str | None = Header(default=None)) ->
     return x_mc_workspace
 
 
+async def _war_room_slot(workspace_id: str | None = Depends(_workspace_from_header)):
+    # Held for the whole run; 429 when this workspace (or the global cap) is busy.
+    async with war_room_admission(workspace_id):
+        yield
+
+
+def _expand_param(expand: str | None = None) -> set[str]:
+    # `?expand=soul_md,description` opts list endpoints into deferred columns.
+    return {f.strip() for f in (expand or "").split(",") if f.strip()}
+
+
 def _audit(
     db: Session,
     *,
@@ -100,6 +225,29 @@ def _audit(
     )
 
 
+def _etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def _etag_matches(if_match: str | None, version: int) -> bool:
+    """If-Match check against a row version; no header means unconditional."""
+
+    if if_match is None:
+        return True
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == _etag(version):
+            return True
+    return False
+
+
+if settings.database_read_url:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Inside CORS, so 429s still carry the CORS headers browsers need to read them.
+if settings.rate_limit_enabled:
+    app.add_middleware(RateLimitMiddleware)
+
 origins = [o.strip() for o in settings.cors_origins.split(",") if o.strip()]
 app.add_middleware(
     CORSMiddleware,
@@ -109,12 +257,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        content_types=tuple(
+            ct.strip() for ct in settings.compression_content_types.split(",") if ct.strip()
+        ),
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
 
 @app.get("/health")
 def health():
     return {"ok": True}
 
 
+@app.get("/api/cache/stats")
+def cache_stats():
+    return {"entities": entity_cache_stats(), "reads": read_cache.stats()}
+
+
 @app.get("/api/openclaw/status")
 async def openclaw_status():
     st = await probe_openclaw()
@@ -125,7 +289,7 @@ async def openclaw_status():
 
 
 @app.get("/api/gateways", response_model=list[GatewayOut])
-def list_gateways(db: Session = Depends(get_db)):
+def list_gateways(db: Session = Depends(get_read_db)):
     return db.query(Gateway).order_by(Gateway.created_at.desc()).all()
 
 
@@ -168,7 +332,7 @@ def create_gateway(
 
 
 @app.get("/api/workspaces", response_model=list[WorkspaceOut])
-def list_workspaces(db: Session = Depends(get_db)):
+def list_workspaces(db: Session = Depends(get_read_db)):
     return db.query(Workspace).order_by(Workspace.created_at.desc()).all()
 
 
@@ -203,6 +367,7 @@ def update_workspace(
         payload=body,
     )
     db.commit()
+    invalidate_entity("workspace", ws.id)
     db.refresh(ws)
     return ws
 
@@ -241,25 +406,93 @@ def create_workspace(
         },
     )
     db.commit()
+    invalidate_entity("workspace", ws.id)
     db.refresh(ws)
     return ws
 
 
+@app.get("/api/workspaces/{workspace_id}/retention", response_model=RetentionPolicyOut)
+def get_retention_policy(workspace_id: str, db: Session = Depends(get_read_db)):
+    policy = db.query(RetentionPolicy).filter(RetentionPolicy.workspace_id == workspace_id).first()
+    if not policy:
+        # No explicit policy: report the settings defaults.
+        return RetentionPolicyOut(
+            workspace_id=workspace_id,
+            turns_days=settings.retention_turns_days,
+            audit_days=settings.retention_audit_days,
+            war_room_runs_days=settings.retention_war_room_runs_days,
+        )
+    return policy
+
+
+@app.put(
+    "/api/workspaces/{workspace_id}/retention",
+    response_model=RetentionPolicyOut,
+    dependencies=[Depends(_require_api_key), Depends(_require_role({"admin"}))],
+)
+def put_retention_policy(
+    workspace_id: str,
+    body: RetentionPolicyIn,
+    db: Session = Depends(get_db),
+    actor_role: tuple[str, str] = Depends(_actor_from_headers),
+):
+    if not db.query(Workspace.id).filter(Workspace.id == workspace_id).first():
+        raise HTTPException(status_code=404, detail="Workspace not found")
+
+    policy = db.query(RetentionPolicy).filter(RetentionPolicy.workspace_id == workspace_id).first()
+    if not policy:
+        policy = RetentionPolicy(workspace_id=workspace_id)
+    policy.turns_days = body.turns_days
+    policy.audit_days = body.audit_days
+    policy.war_room_runs_days = body.war_room_runs_days
+
+    db.add(policy)
+    _audit(
+        db,
+        actor=actor_role[0],
+        role=actor_role[1],
+        workspace_id=workspace_id,
+        action="retention.update",
+        entity_type="workspace",
+        entity_id=workspace_id,
+        payload=body.model_dump(),
+    )
+    db.commit()
+    db.refresh(policy)
+    return policy
+
+
+@app.post(
+    "/api/archive/run",
+    dependencies=[Depends(_require_api_key), Depends(_require_role({"admin"}))],
+)
+def run_archive(db: Session = Depends(get_db)):
+    return {"ok": True, "moved": run_archiver(db)}
+
+
 # --- Agents ---
 
 
-@app.get("/api/agents", response_model=list[AgentOut])
+_AGENT_LIST = TypeAdapter(list[AgentSummaryOut])
+
+
+@app.get("/api/agents", response_model=list[AgentSummaryOut], response_model_exclude_unset=True)
 def list_agents(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     workspace_id: str | None = Depends(_workspace_from_header),
+    expand: set[str] = Depends(_expand_param),
 ):
-    q = db.query(Agent)
-    if workspace_id:
-        q = q.filter(Agent.workspace_id == workspace_id)
-    agents = q.order_by(Agent.updated_at.desc()).all()
-    for a in agents:
-        _ = a.work_state
-    return agents
+    def render() -> bytes:
+        q = workspace_agents(db, workspace_id)
+        if "soul_md" in expand:
+            q = q.options(undefer(Agent.soul_md))
+        agents = q.order_by(Agent.updated_at.desc()).all()
+        for a in agents:
+            _ = a.work_state
+        return _AGENT_LIST.dump_json(_AGENT_LIST.validate_python(agents), exclude_unset=True)
+
+    return coalesced_response(request, db, workspace_id, render)
 
 
 @app.post(
@@ -299,13 +532,15 @@ def create_agent(
         payload={"name": agent.name, "role": agent.role},
     )
     db.commit()
+    invalidate(agent.workspace_id)
+    invalidate_entity("agent", agent.id)
     db.refresh(agent)
     return agent
 
 
 @app.get("/api/agents/{agent_id}", response_model=AgentOut)
-def get_agent(agent_id: str, db: Session = Depends(get_db)):
-    agent = db.query(Agent).filter(Agent.id == agent_id).first()
+def get_agent(agent_id: str, db: Session = Depends(get_read_db)):
+    agent = db.query(Agent).options(undefer(Agent.soul_md)).filter(Agent.id == agent_id).first()
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     return agent
@@ -347,6 +582,8 @@ def update_agent(
         payload=body,
     )
     db.commit()
+    invalidate(agent.workspace_id)
+    invalidate_entity("agent", agent.id)
     db.refresh(agent)
     return agent
 
@@ -363,42 +600,85 @@ def upsert_agent_work_state(
     body: AgentWorkStateUpsert,
     db: Session = Depends(get_db),
     actor_role: tuple[str, str] = Depends(_actor_from_headers),
+    workspace_id: str | None = Depends(_workspace_from_header),
 ):
-    state = db.query(AgentWorkState).filter(AgentWorkState.agent_id == body.agent_id).first()
-    if not state:
-        state = AgentWorkState(agent_id=body.agent_id)
-
-    state.task_id = body.task_id
-    state.status = body.status
-    state.next_step = body.next_step
-    state.blockers = body.blockers
-
-    db.add(state)
+    version = upsert_work_state(
+        db,
+        agent_id=body.agent_id,
+        task_id=body.task_id,
+        status=body.status,
+        next_step=body.next_step,
+        blockers=body.blockers,
+    )
     _audit(
         db,
         actor=actor_role[0],
         role=actor_role[1],
+        workspace_id=workspace_id,
         action="agent_work_state.upsert",
         entity_type="agent_work_state",
         entity_id=body.agent_id,
         payload=body.model_dump(),
     )
     db.commit()
-    return {"ok": True}
+    agent = cached_agent(db, body.agent_id)
+    invalidate(agent.workspace_id if agent else workspace_id)
+    return {"ok": True, "version": version}
+
+
+@app.post(
+    "/api/agent-updates",
+    response_model=dict,
+    dependencies=[Depends(_require_api_key), Depends(_require_role({"admin", "operator"}))],
+)
+def ingest_agent_updates_endpoint(
+    body: AgentUpdatesIn,
+    db: Session = Depends(get_db),
+    actor_role: tuple[str, str] = Depends(_actor_from_headers),
+    workspace_id: str | None = Depends(_workspace_from_header),
+):
+    try:
+        result = ingest_agent_updates(
+            db, body, actor=actor_role[0], role=actor_role[1], workspace_id=workspace_id
+        )
+    except IngestError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    for ws in result.workspaces:
+        invalidate(ws)
+    return {
+        "ok": True,
+        "workStates": result.work_states,
+        "turns": result.turns,
+        "duplicates": result.duplicates,
+    }
 
 
 # --- Tasks ---
 
 
-@app.get("/api/tasks", response_model=list[TaskOut])
+@app.get("/api/tasks", response_model=list[TaskSummaryOut])
 def list_tasks(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     workspace_id: str | None = Depends(_workspace_from_header),
+    expand: set[str] = Depends(_expand_param),
 ):
-    q = db.query(Task)
-    if workspace_id:
-        q = q.filter(Task.workspace_id == workspace_id)
-    return q.order_by(Task.status.asc(), Task.sort_order.asc(), Task.priority.desc(), Task.updated_at.desc()).all()
+    # Read-only list: project columns straight into the response.
+    cols = [
+        Task.id,
+        Task.title,
+        Task.status,
+        Task.priority,
+        Task.sort_order,
+        Task.owner_agent_id,
+        Task.version,
+    ]
+    if "description" in expand:
+        cols.insert(2, Task.description)
+    q = workspace_tasks(db, workspace_id).with_entities(*cols)
+    return coalesced_response(
+        request, db, workspace_id, lambda: render_rows(q.order_by(*BOARD_ORDER))
+    )
 
 
 @app.post(
@@ -434,15 +714,17 @@ def create_task(
         payload={"title": task.title, "status": str(task.status), "priority": task.priority},
     )
     db.commit()
+    invalidate(task.workspace_id)
     db.refresh(task)
     return task
 
 
 @app.get("/api/tasks/{task_id}", response_model=TaskOut)
-def get_task(task_id: str, db: Session = Depends(get_db)):
-    task = db.query(Task).filter(Task.id == task_id).first()
+def get_task(task_id: str, response: Response, db: Session = Depends(get_read_db)):
+    task = db.query(Task).options(undefer(Task.description)).filter(Task.id == task_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    response.headers["ETag"] = _etag(task.version)
     return task
 
 
@@ -470,10 +752,12 @@ def get_or_create_task_conversation(
 
     turns = (
         db.query(Turn)
+        .options(undefer(Turn.content))
         .filter(Turn.conversation_id == convo.id)
-        .order_by(Turn.created_at.asc())
+        .order_by(*TRANSCRIPT_ORDER)
         .all()
     )
+    turns = [*archived_turns(db, convo.id), *turns]
     return ConversationOut(id=convo.id, type=convo.type, task_id=convo.task_id, turns=turns)
 
 
@@ -485,13 +769,17 @@ def get_or_create_task_conversation(
 def update_task(
     task_id: str,
     body: dict,
+    response: Response,
     db: Session = Depends(get_db),
     actor_role: tuple[str, str] = Depends(_actor_from_headers),
     workspace_id: str | None = Depends(_workspace_from_header),
+    if_match: str | None = Header(default=None),
 ):
     task = db.query(Task).filter(Task.id == task_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    if not _etag_matches(if_match, task.version):
+        raise HTTPException(status_code=412, detail="Task has changed (version mismatch)")
 
     for field in ["title", "description", "status", "priority", "sort_order", "owner_agent_id"]:
         if field in body:
@@ -508,8 +796,15 @@ def update_task(
         entity_id=task.id,
         payload=body,
     )
-    db.commit()
+    try:
+        # The ORM update is `WHERE version = <loaded>`; a concurrent writer wins.
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(status_code=412, detail="Task has changed (version mismatch)")
+    invalidate(task.workspace_id)
     db.refresh(task)
+    response.headers["ETag"] = _etag(task.version)
     return task
 
 
@@ -526,30 +821,89 @@ def create_conversation(body: ConversationCreate, db: Session = Depends(get_db))
 
 
 @app.get("/api/conversations/{conversation_id}", response_model=ConversationOut)
-def get_conversation(conversation_id: str, db: Session = Depends(get_db)):
+def get_conversation(conversation_id: str, db: Session = Depends(get_read_db)):
     convo = db.query(Conversation).filter(Conversation.id == conversation_id).first()
     if not convo:
         return None  # type: ignore[return-value]
 
     turns = (
         db.query(Turn)
+        .options(undefer(Turn.content))
         .filter(Turn.conversation_id == conversation_id)
-        .order_by(Turn.created_at.asc())
+        .order_by(*TRANSCRIPT_ORDER)
         .all()
     )
+    turns = [*archived_turns(db, conversation_id), *turns]
 
     return ConversationOut(id=convo.id, type=convo.type, task_id=convo.task_id, turns=turns)
 
 
+def _conversation_or_404(db: Session, conversation_id: str, workspace_id: str | None) -> None:
+    # Unscoped conversations are visible everywhere; another workspace's are not.
+    q = db.query(Conversation.id).filter(Conversation.id == conversation_id)
+    if workspace_id:
+        q = q.filter(
+            or_(Conversation.workspace_id == workspace_id, Conversation.workspace_id.is_(None))
+        )
+    if not q.first():
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+
+@app.get("/api/conversations/{conversation_id}/turns", response_model=TurnPageOut)
+def list_turns(
+    conversation_id: str,
+    tail: int = 50,
+    before: str | None = None,
+    after: int | None = None,
+    db: Session = Depends(get_read_db),
+    workspace_id: str | None = Depends(_workspace_from_header),
+):
+    _conversation_or_404(db, conversation_id, workspace_id)
+    limit = max(1, min(tail, 500))
+    # Paging covers live turns only; report how many older ones were archived.
+    archived = archived_turn_count(db, conversation_id)
+    if after is not None:
+        # Polling: turns with seq > `after`, oldest first.
+        return TurnPageOut(
+            turns=turns_after(db, conversation_id, after=after, limit=limit),
+            archived_turns=archived,
+        )
+    # Tail mode: newest `tail` turns first, then older pages via `before`.
+    page = tail_turns(db, conversation_id, limit=limit, before=before)
+    return TurnPageOut(turns=page.turns, next_before=page.next_before, archived_turns=archived)
+
+
+@app.get("/api/conversations/{conversation_id}/turns/stream")
+def stream_turns(
+    conversation_id: str,
+    db: Session = Depends(get_read_db),
+    workspace_id: str | None = Depends(_workspace_from_header),
+):
+    _conversation_or_404(db, conversation_id, workspace_id)
+    # Archived turns are all older than live ones, so they stream first.
+    archived = [iter_segment_lines(p) for p in archived_turn_paths(db, conversation_id)]
+    return StreamingResponse(
+        chain(*archived, stream_turns_ndjson(conversation_id, session_factory_for(db))),
+        media_type="application/x-ndjson",
+    )
+
+
 @app.post("/api/conversations/{conversation_id}/turns", response_model=TurnOut)
 def add_turn(conversation_id: str, body: TurnCreate, db: Session = Depends(get_db)):
+    seq = allocate_turn_seq(db, conversation_id)
+    if seq is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    tool_events, tool_events_ref, tool_events_size = offload_tool_events(body.tool_events)
     turn = Turn(
         id=str(uuid4()),
         conversation_id=conversation_id,
+        seq=seq,
         speaker_type=body.speaker_type,
         speaker_id=body.speaker_id,
         content=body.content,
-        tool_events=body.tool_events,
+        tool_events=tool_events,
+        tool_events_ref=tool_events_ref,
+        tool_events_size=tool_events_size,
     )
     db.add(turn)
     db.commit()
@@ -557,27 +911,174 @@ def add_turn(conversation_id: str, body: TurnCreate, db: Session = Depends(get_d
     return turn
 
 
+@app.post("/api/conversations/{conversation_id}/turns/batch")
+def add_turns(conversation_id: str, body: TurnBatchIn, db: Session = Depends(get_db)):
+    # One multi-row INSERT and one commit for the whole batch (e.g. streamed tool-call logs).
+    if len(body.turns) > settings.ingest_max_items:
+        raise HTTPException(
+            status_code=422, detail=f"At most {settings.ingest_max_items} turns per batch"
+        )
+    ids = append_turns(db, conversation_id, body.turns)
+    if ids is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    db.commit()
+    return {"ok": True, "ids": ids}
+
+
+@app.get("/api/turns/{turn_id}/tool-events")
+def get_turn_tool_events(
+    turn_id: str,
+    conversation_id: str | None = None,
+    db: Session = Depends(get_read_db),
+):
+    row = (
+        db.query(Turn.tool_events, Turn.tool_events_ref).filter(Turn.id == turn_id).first()
+    )
+    if row:
+        tool_events, ref = row.tool_events, row.tool_events_ref
+    else:
+        # Archived turns keep their tool_events (or blob ref) in the segment.
+        # `conversation_id` is optional and only narrows the segment scan.
+        archived = find_archived_turn(db, turn_id, conversation_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail="Turn not found")
+        tool_events, ref = archived.get("tool_events"), archived.get("tool_events_ref")
+    if not ref:
+        return tool_events
+    try:
+        # Blobs are stored as JSON bytes: pass them through without re-encoding.
+        data = get_blob_store().get(ref)
+    except BlobNotFound:
+        raise HTTPException(status_code=404, detail="tool_events blob missing")
+    return Response(content=data, media_type="application/json")
+
+
+# --- Bulk import / export (NDJSON) ---
+
+
+@app.get(
+    "/api/export",
+    dependencies=[Depends(_require_api_key), Depends(_require_role({"admin"}))],
+)
+def export_endpoint(
+    kinds: str | None = None,
+    workspace_id: str | None = Depends(_workspace_from_header),
+):
+    wanted = [k.strip() for k in (kinds or ",".join(BULK_KINDS)).split(",") if k.strip()]
+    unknown = set(wanted) - set(BULK_KINDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kinds: {', '.join(sorted(unknown))}")
+    return StreamingResponse(
+        export_ndjson(workspace_id, wanted), media_type="application/x-ndjson"
+    )
+
+
+@app.post(
+    "/api/import",
+    dependencies=[Depends(_require_api_key), Depends(_require_role({"admin"}))],
+)
+async def import_endpoint(
+    request: Request,
+    db: Session = Depends(get_db),
+    actor_role: tuple[str, str] = Depends(_actor_from_headers),
+    workspace_id: str | None = Depends(_workspace_from_header),
+):
+    # Batches are inserted in the threadpool while the body keeps streaming in.
+    def flush(batch: list[tuple[int, bytes]]) -> ImportResult:
+        return import_batch(
+            db, batch, workspace_id=workspace_id, actor=actor_role[0], role=actor_role[1]
+        )
+
+    total = ImportResult()
+    batch: list[tuple[int, bytes]] = []
+    try:
+        async for item in aiter_numbered_lines(request.stream()):
+            batch.append(item)
+            if len(batch) >= settings.bulk_batch_size:
+                total.add(await run_in_threadpool(flush, batch))
+                batch = []
+        if batch:
+            total.add(await run_in_threadpool(flush, batch))
+    except BulkImportError as e:
+        # Earlier batches are committed; re-running the import skips them.
+        raise HTTPException(
+            status_code=422, detail={"line": e.line, "error": e.detail, **total.as_dict()}
+        )
+    finally:
+        invalidate(workspace_id)
+        invalidate_entity("agent", None)
+    return total.as_dict()
+
+
 # --- Audit ---
 
 
 @app.get("/api/audit", response_model=list[AuditEventOut])
 def list_audit(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: int = 200,
+    archived: bool = False,
     workspace_id: str | None = Depends(_workspace_from_header),
 ):
-    q = db.query(AuditEvent)
+    if archived:
+        return FastJSONResponse(
+            archived_rows(db, "audit_events", workspace_id, limit=min(limit, 500))
+        )
+    q = db.query(
+        AuditEvent.id,
+        AuditEvent.actor,
+        AuditEvent.role,
+        AuditEvent.action,
+        AuditEvent.entity_type,
+        AuditEvent.entity_id,
+        AuditEvent.payload,
+        AuditEvent.created_at,
+    )
     if workspace_id:
         q = q.filter(AuditEvent.workspace_id == workspace_id)
-    return q.order_by(AuditEvent.created_at.desc()).limit(min(limit, 500)).all()
+    return rows_response(q.order_by(AuditEvent.created_at.desc()).limit(min(limit, 500)))
+
+
+# --- Search ---
+
+
+@app.get("/api/search", response_model=SearchPageOut)
+def search_endpoint(
+    q: str,
+    types: str | None = None,
+    limit: int = 20,
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
+    workspace_id: str | None = Depends(_workspace_from_header),
+):
+    if not search_available:
+        raise HTTPException(status_code=503, detail="Full-text search not available")
+    doc_types = tuple(t.strip() for t in types.split(",") if t.strip()) if types else None
+    try:
+        page = search(
+            db,
+            q,
+            workspace_id=workspace_id,
+            limit=max(1, min(limit, 100)),
+            cursor=cursor,
+            doc_types=doc_types,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return SearchPageOut(results=page.hits, next_cursor=page.next_cursor)
 
 
 @app.get("/api/war-room/runs", response_model=list[WarRoomRunOut])
 def list_war_room_runs(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: int = 50,
+    archived: bool = False,
     workspace_id: str | None = Depends(_workspace_from_header),
 ):
+    if archived:
+        return FastJSONResponse(
+            archived_rows(db, "war_room_runs", workspace_id, limit=min(limit, 200))
+        )
     q = db.query(WarRoomRun)
     if workspace_id:
         q = q.filter(WarRoomRun.workspace_id == workspace_id)
@@ -587,106 +1088,151 @@ def list_war_room_runs(
 @app.get("/api/war-room/runs/{run_id}", response_model=WarRoomRunOut)
 def get_war_room_run(
     run_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     workspace_id: str | None = Depends(_workspace_from_header),
 ):
     q = db.query(WarRoomRun).filter(WarRoomRun.id == run_id)
     if workspace_id:
         q = q.filter(WarRoomRun.workspace_id == workspace_id)
-    run = q.first()
+    run = q.first() or find_archived_war_room_run(db, run_id, workspace_id)
     if not run:
         raise HTTPException(status_code=404, detail="War room run not found")
     return run
 
 
-# --- War Room ---
-
+@app.get("/api/outbox", response_model=list[OutboundMessageOut])
+def list_outbox(
+    db: Session = Depends(get_read_db),
+    status: str | None = None,
+    limit: int = 50,
+):
+    q = db.query(OutboundMessage)
+    if status:
+        q = q.filter(OutboundMessage.status == status)
+    return q.order_by(OutboundMessage.created_at.desc()).limit(min(limit, 200)).all()
 
-async def _send_telegram_via_openclaw(
-    text: str,
-    *,
-    chat_id: str | None,
-    topic_id: str | None,
-) -> tuple[str | None, str | None]:
-    oc = get_openclaw()
-    if not oc:
-        return None, "OPENCLAW_GATEWAY_URL/TOKEN not configured"
-    if not chat_id:
-        return None, "TELEGRAM_CHAT_ID not configured"
 
-    try:
-        result = await oc.message_send(
-            channel="telegram",
-            target=chat_id,
-            text=text,
-            thread_id=topic_id,
-        )
-        message_id = None
-        if isinstance(result, dict):
-            message_id = result.get("messageId") or result.get("id")
-        return (str(message_id) if message_id else None), None
-    except Exception as e:
-        return None, str(e)
+@app.post(
+    "/api/outbox/flush",
+    dependencies=[Depends(_require_api_key), Depends(_require_role({"admin"}))],
+)
+async def flush_outbox(db: Session = Depends(get_db)):
+    # Deliver whatever is due now instead of waiting for the next worker pass.
+    return {"ok": True, "sent": await deliver_due(db)}
 
 
-def _parse_owner_updates(text: str) -> list[dict]:
-    """Parse a batched owner update response.
+# --- Jobs ---
 
-    Expected blocks separated by '---'. Each block may contain keys:
-    task_title/current_task/status/next_step/blockers
 
-    Returns list of dicts.
-    """
+@job_handler("war_room")
+async def _war_room_job(db: Session, payload: dict) -> dict:
+    workspace_id = payload.get("workspace_id")
+    try:
+        async with war_room_admission(workspace_id):
+            return await war_room_run(
+                full=payload.get("full", False),
+                db=db,
+                actor_role=(payload["actor"], payload["role"]),
+                workspace_id=workspace_id,
+            )
+    except HTTPException as e:
+        if e.status_code != 429:
+            raise
+        # A synchronous run holds the slot: try again once it is likely free.
+        raise JobDeferred(settings.war_room_busy_retry_after_seconds, e.detail) from None
+
+
+@app.get("/api/jobs", response_model=list[JobOut])
+def list_jobs(
+    db: Session = Depends(get_read_db),
+    status: str | None = None,
+    kind: str | None = None,
+    limit: int = 50,
+    workspace_id: str | None = Depends(_workspace_from_header),
+):
+    q = db.query(Job)
+    if workspace_id:
+        q = q.filter(Job.workspace_id == workspace_id)
+    if status:
+        q = q.filter(Job.status == status)
+    if kind:
+        q = q.filter(Job.kind == kind)
+    return q.order_by(Job.created_at.desc()).limit(min(limit, 200)).all()
 
-    if not text:
-        return []
 
-    blocks = [b.strip() for b in str(text).split("---") if b.strip()]
-    out: list[dict] = []
+@app.get("/api/jobs/{job_id}", response_model=JobOut)
+def get_job(job_id: str, db: Session = Depends(get_read_db)):
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
-    for b in blocks:
-        item: dict[str, str] = {}
-        for line in b.splitlines():
-            if ":" not in line:
-                continue
-            k, v = line.split(":", 1)
-            k = k.strip().lower()
-            v = v.strip()
-            if k in {"task_title", "current_task", "status", "next_step", "blockers"}:
-                item[k] = v
-        if item:
-            out.append(item)
 
-    return out
+# --- War Room ---
 
 
 @app.post(
     "/api/war-room/run",
-    dependencies=[Depends(_require_api_key), Depends(_require_role({"admin", "operator"}))],
+    dependencies=[
+        Depends(_require_api_key),
+        Depends(_require_role({"admin", "operator"})),
+        Depends(_war_room_slot),
+    ],
 )
 async def war_room_run(
+    full: bool = False,
+    background: bool = False,
     db: Session = Depends(get_db),
     actor_role: tuple[str, str] = Depends(_actor_from_headers),
     workspace_id: str | None = Depends(_workspace_from_header),
 ):
+    if background:
+        # Any node's job worker runs it; a queued or running one is joined instead.
+        job = enqueue_job(
+            db,
+            "war_room",
+            {
+                "full": full,
+                "actor": actor_role[0],
+                "role": actor_role[1],
+                "workspace_id": workspace_id,
+            },
+            workspace_id=workspace_id,
+            singleton_key=f"war_room:{workspace_id or ''}",
+        )
+        _audit(
+            db,
+            actor=actor_role[0],
+            role=actor_role[1],
+            workspace_id=workspace_id,
+            action="war_room.enqueue",
+            entity_type="job",
+            entity_id=job.id,
+            payload={"full": full},
+        )
+        db.commit()
+        return FastJSONResponse(
+            {"ok": True, "jobId": job.id, "status": job.status}, status_code=202
+        )
+
     convo = Conversation(id=str(uuid4()), workspace_id=workspace_id, type=ConversationType.WAR_ROOM)
     db.add(convo)
 
-    agents = db.query(Agent).order_by(Agent.name.asc()).all()
-    agents_by_id = {a.id: a for a in agents}
+    # One workspace-scoped query: focus tasks joined to just their owners.
+    snapshot = board_snapshot(db, workspace_id)
+    tasks = snapshot.tasks
 
-    tasks_q = db.query(Task).filter(Task.status.in_(["DOING", "BLOCKED"]))
-    if workspace_id:
-        tasks_q = tasks_q.filter(Task.workspace_id == workspace_id)
-    tasks = (
-        tasks_q.order_by(Task.status.asc(), Task.priority.desc(), Task.updated_at.desc()).all()
-    )
+    # The conversation is new and only this transaction can see it, so its
+    # turns are numbered locally.
+    turn_seq = count(1)
 
     def add_turn(speaker_type: str, content: str, speaker_id: str | None = None):
+        convo.last_turn_seq = next(turn_seq)
         db.add(
             Turn(
                 id=str(uuid4()),
                 conversation_id=convo.id,
+                seq=convo.last_turn_seq,
                 speaker_type=speaker_type,
                 speaker_id=speaker_id,
                 content=content,
@@ -708,7 +1254,7 @@ async def war_room_run(
 
     snapshot_lines = ["Current focus (DOING/BLOCKED):"]
     for t in tasks:
-        owner = agents_by_id.get(t.owner_agent_id) if t.owner_agent_id else None
+        owner = snapshot.owner_of(t)
         snapshot_lines.append(
             f"- [{t.status}] {t.title} (prio {t.priority}) — owner: {owner.name if owner else 'Unassigned'}"
         )
@@ -723,6 +1269,41 @@ async def war_room_run(
             continue
         tasks_by_owner.setdefault(t.owner_agent_id, []).append(t)
 
+    # Incremental mode: owners whose tasks are unchanged since the last run are
+    # not asked again; `owner_state` is what this run records for the next one.
+    incremental = settings.war_room_incremental and not full
+    prev_owners = last_war_room_owners(db, workspace_id) if incremental else {}
+    started_at = datetime.now(timezone.utc)
+    max_age = timedelta(minutes=settings.war_room_refresh_max_age_minutes)
+    owner_state: dict[str, dict] = {}
+    state_writes: list[dict] = []
+    session_writes: list[dict] = []
+    status_moves: list[tuple[Task, str]] = []
+    refreshed_owners: list[str] = []
+    skipped_owners: list[str] = []
+    # Work states owners pushed themselves (POST /api/agent-updates)
+    push_max_age = timedelta(minutes=settings.war_room_push_fresh_minutes)
+    pushed: dict[str, AgentWorkState] = {}
+    if incremental:
+        q = db.query(AgentWorkState).filter(
+            AgentWorkState.agent_id.in_(list(tasks_by_owner)),
+            AgentWorkState.pushed_at.is_not(None),
+        )
+        pushed = {state.agent_id: state for state in q}
+
+    def carry_forward(state: AgentWorkState, heading: str) -> None:
+        add_turn(
+            "system",
+            "\n".join(
+                [
+                    heading,
+                    f"status: {state.status}",
+                    f"next_step: {state.next_step}",
+                    f"blockers: {state.blockers}",
+                ]
+            ),
+        )
+
     # Unassigned tasks
     for t in unassigned:
         add_turn(
@@ -741,10 +1322,35 @@ async def war_room_run(
         )
 
     for owner_id, owner_tasks in tasks_by_owner.items():
-        owner = agents_by_id.get(owner_id)
+        owner = snapshot.owners.get(owner_id)
         if not owner:
             continue
 
+        fingerprint = owner_fingerprint(owner_tasks)
+        prev = prev_owners.get(owner_id)
+        if owner.openclaw_agent_id and owner_unchanged(prev, fingerprint, started_at, max_age):
+            add_turn(
+                "chair",
+                f"Owner {owner.name}: no task changes since the last War Room; skipping.",
+            )
+            state = db.query(AgentWorkState).filter(AgentWorkState.agent_id == owner.id).first()
+            if state:
+                carry_forward(state, "Carried forward from the last update:")
+            owner_state[owner_id] = prev
+            skipped_owners.append(owner_id)
+            continue
+
+        state = pushed.get(owner_id)
+        if state and pushed_state_fresh(state.pushed_at, owner_tasks, started_at, push_max_age):
+            add_turn("chair", f"Owner {owner.name}: pushed a fresh update; not asking.")
+            carry_forward(state, f"Pushed by the agent at {state.pushed_at}:")
+            owner_state[owner_id] = {
+                "fingerprint": fingerprint,
+                "refreshed_at": started_at.isoformat(),
+            }
+            skipped_owners.append(owner_id)
+            continue
+
         add_turn(
             "chair",
             "\n".join(
@@ -763,11 +1369,14 @@ async def war_room_run(
                 add_turn("system", "OpenClaw gateway not configured; cannot spawn agent runs.")
                 continue
 
+            marker = f"[war-room:{convo.id}]"
             prompt = "\n".join(
                 [
+                    marker,
                     "You are in the hourly War Room.",
                     "Provide a structured update for each task listed.",
                     "Format for each task:",
+                    "task_id:",
                     "task_title:",
                     "current_task:",
                     "status:",
@@ -776,7 +1385,7 @@ async def war_room_run(
                     "---",
                     "Tasks:",
                     *[
-                        f"- {t.title}\n  description: {(t.description or '').strip()}\n  status: {t.status}\n  priority: {t.priority}"
+                        f"- {t.title}\n  id: {t.id}\n  description: {(t.description or '').strip()}\n  status: {t.status}\n  priority: {t.priority}"
                         for t in owner_tasks
                     ],
                 ]
@@ -784,102 +1393,79 @@ async def war_room_run(
 
             add_turn(
                 "system",
-                f"Spawning OpenClaw agent `{owner.openclaw_agent_id}` for owner update…",
+                f"Asking OpenClaw agent `{owner.openclaw_agent_id}` for owner update…",
             )
 
             try:
-                import asyncio
-
-                spawn_res = await oc.sessions_spawn(
-                    task=prompt,
+                reply = await ask_agent(
+                    db,
+                    oc,
+                    owner,
+                    prompt,
                     label=f"war-room:{convo.id}:owner:{owner.id}",
-                    agent_id=owner.openclaw_agent_id,
+                    marker=marker,
+                )
+                child_key = reply.session_key
+                assistant_msg = reply.text
+                if reply.spawned:
+                    session_writes.append(reply.spawned)
+                add_turn(
+                    "system",
+                    f"{'Reused' if reply.reused else 'Spawned'} session {child_key}.",
                 )
-                child_key = spawn_res.get("childSessionKey")
-                if not child_key:
-                    add_turn("system", f"Spawn returned no childSessionKey: {spawn_res}")
-                    continue
-
-                assistant_msg = None
-                for _ in range(25):
-                    hist = await oc.sessions_history(child_key, limit=30, include_tools=False)
-                    msgs = (
-                        hist
-                        if isinstance(hist, list)
-                        else hist.get("messages")
-                        if isinstance(hist, dict)
-                        else []
-                    )
-                    for m in reversed(msgs):
-                        if isinstance(m, dict) and m.get("role") == "assistant":
-                            assistant_msg = m.get("content")
-                            break
-                    if assistant_msg:
-                        break
-                    await asyncio.sleep(1.5)
 
                 if assistant_msg:
                     add_turn("agent", str(assistant_msg), speaker_id=owner.id)
+                    owner_state[owner_id] = {
+                        "fingerprint": fingerprint,
+                        "refreshed_at": started_at.isoformat(),
+                    }
+                    refreshed_owners.append(owner_id)
 
                     # Parse structured updates and update AgentWorkState + (optionally) task statuses
-                    parsed = _parse_owner_updates(str(assistant_msg))
+                    parsed = parse_owner_updates(
+                        str(assistant_msg),
+                        required_fields=required_fields_for(owner.output_contract),
+                    )
+                    if parsed.errors:
+                        add_turn(
+                            "system",
+                            "Update does not meet the output contract:\n"
+                            + "\n".join(f"- {e}" for e in parsed.errors),
+                        )
                     if parsed:
+                        index = TaskIndex(owner_tasks)
                         # pick a representative current task for the agent work state
                         # prefer the highest priority task title in this owner batch
-                        top = sorted(owner_tasks, key=lambda x: x.priority, reverse=True)[0]
-
-                        # Find matching parsed item (by task_title or current_task)
-                        best = None
-                        for it in parsed:
-                            tt = (it.get("task_title") or "").strip()
-                            if tt and tt.lower() == top.title.lower():
-                                best = it
-                                break
-                        if not best:
-                            best = parsed[0]
-
-                        state = (
-                            db.query(AgentWorkState)
-                            .filter(AgentWorkState.agent_id == owner.id)
-                            .first()
+                        top = max(owner_tasks, key=lambda x: x.priority)
+                        best = next(
+                            (it for it in parsed.items if index.match(it) is top), parsed.items[0]
                         )
-                        if not state:
-                            state = AgentWorkState(agent_id=owner.id)
 
-                        state.task_id = top.id
-                        state.status = best.get("status", "working")
-                        state.next_step = best.get("next_step", "")
-                        state.blockers = best.get("blockers", "")
-                        db.add(state)
+                        state_writes.append(
+                            {
+                                "agent_id": owner.id,
+                                "task_id": top.id,
+                                "status": best.get("status") or "working",
+                                "next_step": best.get("next_step", ""),
+                                "blockers": best.get("blockers", ""),
+                            }
+                        )
 
                         # If APPLY_WAR_ROOM_MOVES is enabled, also mark tasks blocked/unblocked based on blockers
                         if settings.apply_war_room_moves:
-                            for it in parsed:
-                                title = (it.get("task_title") or it.get("current_task") or "").strip()
-                                if not title:
-                                    continue
-                                # match task by title within this owner's tasks
-                                match = None
-                                for ot in owner_tasks:
-                                    if ot.title.lower() == title.lower():
-                                        match = ot
-                                        break
-                                if not match:
-                                    continue
-                                blockers = (it.get("blockers") or "").strip().lower()
-                                if blockers and blockers not in {"none", "n/a", "na", "no"}:
-                                    match.status = "BLOCKED"
-                                else:
-                                    # keep DONE as DONE, otherwise set to DOING
-                                    if match.status != "DONE":
-                                        match.status = "DOING"
-                                db.add(match)
+                            for it in parsed.items:
+                                match = index.match(it)
+                                if match:
+                                    status_moves.append(
+                                        (match, "BLOCKED" if has_blockers(it) else "DOING")
+                                    )
 
                 else:
                     add_turn("system", f"Timed out waiting for agent response (session {child_key}).")
 
             except Exception as e:
-                add_turn("system", f"Agent spawn/history failed: {e}")
+                add_turn("system", f"Agent session/history failed: {e}")
 
         else:
             add_turn(
@@ -899,6 +1485,19 @@ async def war_room_run(
                 speaker_id=owner.id,
             )
 
+    # Writes are applied only now, after every gateway call, so the run never
+    # holds the database write lock (SQLite: the whole file) while awaiting agents.
+    for values in session_writes:
+        upsert_agent_session(db, **values)
+    for values in state_writes:
+        upsert_work_state(db, **values)
+    for task, to in status_moves:
+        # keep DONE as DONE
+        if task.status in {"DONE", to}:
+            continue
+        if not move_task(db, task, to):
+            add_turn("system", f"Not moving {task.title!r} to {to}: it changed meanwhile.")
+
     moves: list[dict] = []
     for t in tasks:
         if not t.owner_agent_id:
@@ -914,13 +1513,12 @@ async def war_room_run(
             to = m.get("to")
             if not tid or not to:
                 continue
-            task = db.query(Task).filter(Task.id == tid).first()
+            task = next((t for t in tasks if t.id == tid), None)
             if not task:
                 continue
-            # only apply status moves for now
-            task.status = to
-            db.add(task)
-            applied_moves.append(m)
+            # only apply status moves for now; skip tasks changed since the snapshot
+            if move_task(db, task, to):
+                applied_moves.append(m)
 
     final_answer = "War Room complete. Next steps assigned in Mission Control."
 
@@ -932,6 +1530,8 @@ async def war_room_run(
         "proposed_task_moves": moves,
         "applied_task_moves": applied_moves,
         "final_answer_for_telegram": final_answer,
+        "refreshed_owners": refreshed_owners,
+        "skipped_owners": skipped_owners,
     }
     add_turn(
         "chair",
@@ -942,11 +1542,13 @@ async def war_room_run(
     # Workspace overrides for Telegram destination
     ws_tg_chat = None
     ws_tg_topic = None
+    ws_label = "default"
     if workspace_id:
-        ws = db.query(Workspace).filter(Workspace.id == workspace_id).first()
+        ws = cached_workspace(db, workspace_id)
         if ws:
             ws_tg_chat = ws.telegram_chat_id
             ws_tg_topic = ws.telegram_topic_id
+            ws_label = ws.name
 
     tg_chat = ws_tg_chat or settings.telegram_chat_id
     tg_topic = ws_tg_topic or settings.telegram_topic_id
@@ -956,11 +1558,34 @@ async def war_room_run(
         workspace_id=workspace_id,
         conversation_id=convo.id,
         final_answer=final_answer,
-        summary_json=decision,
+        summary_json={**decision, "incremental": incremental, "owners": owner_state},
         telegram_chat_id=tg_chat,
         telegram_topic_id=tg_topic,
     )
     db.add(wr)
+
+    # Telegram delivery goes through the outbox; this request never waits on it.
+    tg_status = "queued"
+    if not get_openclaw():
+        wr.telegram_error = "OPENCLAW_GATEWAY_URL/TOKEN not configured"
+        tg_status = "skipped"
+    elif not tg_chat:
+        wr.telegram_error = "TELEGRAM_CHAT_ID not configured"
+        tg_status = "skipped"
+    else:
+        enqueue_message(
+            db,
+            idempotency_key=f"war_room_run:{run_id}",
+            channel="telegram",
+            target=tg_chat,
+            thread_id=tg_topic,
+            text=final_answer,
+            war_room_run_id=run_id,
+            # Runs from several workspaces sharing a chat go out as one digest.
+            coalesce=True,
+            label=ws_label,
+        )
+
     _audit(
         db,
         actor=actor_role[0],
@@ -973,32 +1598,19 @@ async def war_room_run(
     )
 
     db.commit()
-
-    try:
-        message_id, err = await _send_telegram_via_openclaw(
-            final_answer,
-            chat_id=tg_chat,
-            topic_id=tg_topic,
-        )
-        if message_id:
-            wr.telegram_message_id = str(message_id)
-        if err:
-            wr.telegram_error = err
-        db.add(wr)
-        db.commit()
-    except Exception as e:
-        wr.telegram_error = str(e)
-        db.add(wr)
-        db.commit()
+    invalidate(workspace_id)  # work states and (applied) task moves
 
     return {
         "ok": True,
         "conversationId": convo.id,
         "warRoomRunId": run_id,
+        "refreshedOwners": refreshed_owners,
+        "skippedOwners": skipped_owners,
         "telegram": {
-            "chatId": settings.telegram_chat_id,
-            "topicId": settings.telegram_topic_id,
-            "messageId": wr.telegram_message_id,
+            "chatId": tg_chat,
+            "topicId": tg_topic,
+            "status": tg_status,
+            "messageId": None,
             "error": wr.telegram_error,
         },
     }
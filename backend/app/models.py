@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import enum
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Integer, String, Text, func
+from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.sqlite import JSON
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -40,8 +40,9 @@ class Agent(Base):
     # High-level function / department label (e.g. "Ops", "Finance")
     role: Mapped[str] = mapped_column(String, nullable=False)
 
-    # The agent's core system prompt / Soul (markdown)
-    soul_md: Mapped[str] = mapped_column(Text, default="")
+    # The agent's core system prompt / Soul (markdown).
+    # Deferred: list endpoints only load it when asked (`?expand=soul_md`).
+    soul_md: Mapped[str] = mapped_column(Text, default="", deferred=True)
 
     # Optional model override (otherwise use platform default)
     model: Mapped[str | None] = mapped_column(String, nullable=True)
@@ -87,7 +88,8 @@ class Task(Base):
     )
 
     title: Mapped[str] = mapped_column(String, nullable=False)
-    description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Deferred: list endpoints only load it when asked (`?expand=description`).
+    description: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)
     status: Mapped[TaskStatus] = mapped_column(Enum(TaskStatus), default=TaskStatus.BACKLOG)
     priority: Mapped[int] = mapped_column(Integer, default=0)
 
@@ -104,6 +106,12 @@ class Task(Base):
 
     conversation: Mapped["Conversation | None"] = relationship(back_populates="task")
 
+    # Optimistic concurrency: bumped on every update; ORM updates are
+    # `... WHERE version = <loaded>`, and PATCH accepts it as an If-Match ETag.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
 
 class AgentWorkState(Base):
     __tablename__ = "agent_work_states"
@@ -123,6 +131,43 @@ class AgentWorkState(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
+    # Bumped by every upsert (see app.upserts); also the ORM version counter.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+
+    # Set when the agent pushed this state itself (POST /api/agent-updates)
+    pushed_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+class IngestKey(Base):
+    """Idempotency keys of agent-pushed updates that were already applied."""
+
+    __tablename__ = "ingest_keys"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    created_at: Mapped[str] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
+
+
+class AgentSession(Base):
+    """Long-lived OpenClaw session reused for an agent across War Rooms."""
+
+    __tablename__ = "agent_sessions"
+
+    agent_id: Mapped[str] = mapped_column(String, ForeignKey("agents.id"), primary_key=True)
+
+    session_key: Mapped[str] = mapped_column(String, nullable=False)
+    # The OpenClaw agent the session was spawned for; a changed id means respawn.
+    openclaw_agent_id: Mapped[str] = mapped_column(String, nullable=False)
+
+    uses: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_used_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
 
 class Conversation(Base):
     __tablename__ = "conversations"
@@ -144,6 +189,11 @@ class Conversation(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
+    # Highest turn `seq` handed out so far (see transcripts.allocate_turn_seq).
+    last_turn_seq: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+
     turns: Mapped[list["Turn"]] = relationship(back_populates="conversation")
 
 
@@ -157,11 +207,25 @@ class Turn(Base):
     speaker_type: Mapped[str] = mapped_column(String, nullable=False)
     speaker_id: Mapped[str | None] = mapped_column(String, nullable=True)
 
-    content: Mapped[str] = mapped_column(Text, nullable=False)
+    # Deferred: transcript reads undefer it explicitly.
+    content: Mapped[str] = mapped_column(Text, nullable=False, deferred=True)
+    # Small tool_events stay inline; large ones live in the blob store and only
+    # the sha256 ref + size are kept here (see app/blobs.py).
     tool_events: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    tool_events_ref: Mapped[str | None] = mapped_column(String, nullable=True)
+    tool_events_size: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    # Position in the conversation: monotonic, assigned when the turn is added.
+    # Nullable only so older databases can add the column (backfilled at startup).
+    seq: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
+    # Transcript reads (full, streamed, tail and after-seq pages) are range scans on this index.
+    __table_args__ = (
+        Index("ix_turns_conversation_seq", "conversation_id", "seq", unique=True),
+    )
+
 
 class WarRoomRun(Base):
     __tablename__ = "war_room_runs"
@@ -246,3 +310,125 @@ class Workspace(Base):
     # Relationships (optional)
     agents: Mapped[list["Agent"]] = relationship(primaryjoin="Workspace.id==Agent.workspace_id")
     tasks: Mapped[list["Task"]] = relationship(primaryjoin="Workspace.id==Task.workspace_id")
+
+
+# --- Retention / archival ---
+
+
+class RetentionPolicy(Base):
+    __tablename__ = "retention_policies"
+
+    workspace_id: Mapped[str] = mapped_column(String, ForeignKey("workspaces.id"), primary_key=True)
+
+    # Days rows stay in the live tables before being archived (null = keep forever)
+    turns_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    audit_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    war_room_runs_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    updated_at: Mapped[str] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class ArchiveSegment(Base):
+    """One compressed JSONL file of rows moved out of a live table."""
+
+    __tablename__ = "archive_segments"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    workspace_id: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    # "turns" | "audit_events" | "war_room_runs"
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+
+    # Set for turn segments (one conversation per segment)
+    conversation_id: Mapped[str | None] = mapped_column(String, nullable=True, index=True)
+
+    path: Mapped[str] = mapped_column(String, nullable=False)
+    row_count: Mapped[int] = mapped_column(Integer, default=0)
+    first_created_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_created_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_archive_segments_kind_ws", "kind", "workspace_id", "last_created_at"),
+    )
+
+
+# --- Outbound notifications ---
+
+
+class OutboundMessage(Base):
+    """Durable outbox row for a message delivered through the OpenClaw gateway."""
+
+    __tablename__ = "outbound_messages"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+
+    # Re-enqueueing the same key is a no-op; also forwarded to the gateway.
+    idempotency_key: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+
+    channel: Mapped[str] = mapped_column(String, nullable=False)  # e.g. "telegram"
+    target: Mapped[str] = mapped_column(String, nullable=False)  # chat id
+    thread_id: Mapped[str | None] = mapped_column(String, nullable=True)  # topic id
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+
+    # "pending" | "sending" | "sent" | "failed"
+    status: Mapped[str] = mapped_column(String, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Claim lease while "sending"; an expired lease makes the row claimable again.
+    locked_until: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # Messages sharing a coalesce key (same chat + topic) may be merged into one
+    # digest; `label` titles this message's section and `batch_id` ties every
+    # message of a digest to the single message that was actually sent.
+    coalesce_key: Mapped[str | None] = mapped_column(String, nullable=True)
+    label: Mapped[str | None] = mapped_column(String, nullable=True)
+    batch_id: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    message_id: Mapped[str | None] = mapped_column(String, nullable=True)
+    war_room_run_id: Mapped[str | None] = mapped_column(
+        String, ForeignKey("war_room_runs.id"), nullable=True
+    )
+
+    created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    sent_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (Index("ix_outbound_messages_due", "status", "next_attempt_at"),)
+
+
+class Job(Base):
+    """Background job, claimed by whichever API node is free (see app/jobs.py)."""
+
+    __tablename__ = "jobs"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    workspace_id: Mapped[str | None] = mapped_column(
+        String, ForeignKey("workspaces.id"), nullable=True
+    )
+
+    kind: Mapped[str] = mapped_column(String, nullable=False)  # e.g. "war_room"
+    payload: Mapped[dict] = mapped_column(JSON, default=dict)
+    # At most one unfinished job per key; cleared when the job finishes.
+    singleton_key: Mapped[str | None] = mapped_column(String, unique=True, nullable=True)
+
+    # "pending" | "running" | "done" | "failed"
+    status: Mapped[str] = mapped_column(String, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3)
+    run_at: Mapped[str] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Lease while "running", extended by the owner's heartbeats; an expired
+    # lease (dead node) makes the job claimable again.
+    locked_by: Mapped[str | None] = mapped_column(String, nullable=True)
+    locked_until: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+
+    created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    started_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (Index("ix_jobs_due", "status", "run_at"),)
@@ -1,11 +1,56 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from typing import AsyncIterator
 
 import httpx
 
+from .resilience import Bulkhead, BulkheadFullError, CircuitBreaker, parse_limits
 from .settings import settings
 
+# Shared by every client for the same gateway (get_openclaw() builds a new one per call).
+_breakers: dict[tuple[str, str], CircuitBreaker] = {}
+_bulkheads: dict[tuple[str, str], Bulkhead] = {}
+
+
+def _breaker(base_url: str, tool: str) -> CircuitBreaker:
+    key = (base_url, tool)
+    if key not in _breakers:
+        _breakers[key] = CircuitBreaker(
+            f"{base_url} {tool}",
+            window=settings.openclaw_breaker_window,
+            min_calls=settings.openclaw_breaker_min_calls,
+            failure_rate=settings.openclaw_breaker_failure_rate,
+            open_seconds=settings.openclaw_breaker_open_seconds,
+        )
+    return _breakers[key]
+
+
+def _bulkhead(base_url: str, tool: str) -> Bulkhead:
+    key = (base_url, tool)
+    if key not in _bulkheads:
+        limits = parse_limits(settings.openclaw_bulkheads)
+        _bulkheads[key] = Bulkhead(
+            f"{base_url} {tool}",
+            limits.get(tool, limits.get("*", 8)),
+            wait_seconds=settings.openclaw_bulkhead_wait_seconds,
+        )
+    return _bulkheads[key]
+
+
+def _is_gateway_failure(exc: BaseException) -> bool:
+    """Transport errors, timeouts and 5xx count against the breaker; 4xx and tool errors don't."""
+
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def breaker_states() -> list[dict]:
+    return [b.snapshot() for b in _breakers.values()]
+
 
 @dataclass
 class OpenClawClient:
@@ -28,13 +73,35 @@ class OpenClawClient:
         if session_key:
             payload["sessionKey"] = session_key
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            res = await client.post(self._tools_invoke_url, headers=self._headers, json=payload)
-            res.raise_for_status()
-            data = res.json()
-            if not isinstance(data, dict) or not data.get("ok"):
-                raise RuntimeError(f"OpenClaw tools/invoke error: {data}")
-            return data["result"]
+        async with self._guarded(tool):
+            async with httpx.AsyncClient(timeout=settings.openclaw_timeout_seconds) as client:
+                res = await client.post(self._tools_invoke_url, headers=self._headers, json=payload)
+                res.raise_for_status()
+                data = res.json()
+        if not isinstance(data, dict) or not data.get("ok"):
+            raise RuntimeError(f"OpenClaw tools/invoke error: {data}")
+        return data["result"]
+
+    @asynccontextmanager
+    async def _guarded(self, tool: str) -> AsyncIterator[None]:
+        """Fail fast while the tool's breaker is open; cap concurrent calls per tool."""
+
+        breaker = _breaker(self.base_url, tool)
+        breaker.before_call()
+        try:
+            async with _bulkhead(self.base_url, tool).slot():
+                try:
+                    yield
+                except asyncio.CancelledError:
+                    breaker.cancel()
+                    raise
+                except Exception as e:
+                    breaker.record(failed=_is_gateway_failure(e))
+                    raise
+                breaker.record(failed=False)
+        except BulkheadFullError:
+            breaker.cancel()
+            raise
 
     async def sessions_list(self, *, limit: int = 50) -> dict:
         return await self.invoke_tool("sessions_list", {"limit": limit})
@@ -56,10 +123,20 @@ class OpenClawClient:
             args["agentId"] = agent_id
         return await self.invoke_tool("sessions_spawn", args)
 
-    async def message_send(self, *, channel: str, target: str, text: str, thread_id: str | None = None) -> dict:
+    async def message_send(
+        self,
+        *,
+        channel: str,
+        target: str,
+        text: str,
+        thread_id: str | None = None,
+        idempotency_key: str | None = None,
+    ) -> dict:
         args: dict = {"action": "send", "channel": channel, "target": target, "message": text}
         if thread_id:
             args["threadId"] = thread_id
+        if idempotency_key:
+            args["idempotencyKey"] = idempotency_key
         return await self.invoke_tool("message", args)
 
 
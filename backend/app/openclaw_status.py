@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
 
 import httpx
 
-from .openclaw import OpenClawClient, get_openclaw
+from .openclaw import OpenClawClient, breaker_states, get_openclaw
 from .settings import settings
 
 
@@ -18,6 +18,8 @@ class OpenClawStatus:
     tool_invoke_ok: bool
 
     error: str | None
+    # Circuit breakers seen so far (one per gateway tool), e.g. {"state": "open", ...}
+    breakers: list[dict] = field(default_factory=list)
 
 
 async def probe_openclaw() -> OpenClawStatus:
@@ -75,6 +77,7 @@ async def probe_openclaw() -> OpenClawStatus:
         auth_ok=auth_ok,
         tool_invoke_ok=tool_invoke_ok,
         error=err,
+        breakers=breaker_states(),
     )
 
 
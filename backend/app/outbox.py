@@ -0,0 +1,360 @@
+"""Durable outbound message queue (War Room summaries -> Telegram via OpenClaw).
+
+Messages are enqueued as `OutboundMessage` rows in the caller's transaction
+and delivered by `outbox_loop`, so request handlers never wait on Telegram.
+Delivery retries with exponential backoff, is rate limited per chat (through
+the rate limit backend, so the limit is shared across API nodes when that is
+Redis), and carries the idempotency key to the gateway so a retried send is
+not posted twice.
+
+Messages enqueued with `coalesce=True` wait out a short window and are then
+sent together with every other pending message for the same key as a single
+digest (bounded by count and length). Digest membership is fixed by
+`batch_id` before the first attempt, and retries resend that exact batch
+under the same key.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal
+from .models import OutboundMessage, WarRoomRun
+from .openclaw import get_openclaw
+from .ratelimit import get_backend
+from .resilience import CircuitOpenError
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue_message(
+    db: Session,
+    *,
+    idempotency_key: str,
+    channel: str,
+    target: str,
+    text: str,
+    thread_id: str | None = None,
+    war_room_run_id: str | None = None,
+    coalesce: bool = False,
+    label: str | None = None,
+) -> OutboundMessage:
+    """Add a message to the outbox (caller commits). Same key -> same row.
+
+    With `coalesce`, the message is held for the digest window and may be
+    merged with other messages for the same channel/target/thread.
+    """
+
+    existing = (
+        db.query(OutboundMessage).filter(OutboundMessage.idempotency_key == idempotency_key).first()
+    )
+    if existing:
+        return existing
+
+    window = settings.telegram_digest_window_seconds if coalesce else 0
+    msg = OutboundMessage(
+        id=str(uuid4()),
+        idempotency_key=idempotency_key,
+        channel=channel,
+        target=target,
+        thread_id=thread_id,
+        text=text,
+        status="pending",
+        attempts=0,
+        next_attempt_at=_now() + timedelta(seconds=window),
+        coalesce_key=f"{channel}:{target}:{thread_id or ''}" if coalesce else None,
+        label=label,
+        war_room_run_id=war_room_run_id,
+    )
+    db.add(msg)
+    return msg
+
+
+async def _chat_wait(target: str) -> float:
+    """Take a send token for the chat; returns 0 or the seconds to wait."""
+
+    per_minute = max(1, settings.telegram_per_chat_per_minute)
+    return await get_backend().take(
+        f"telegram:{target}", capacity=per_minute, per_second=per_minute / 60
+    )
+
+
+def _backoff(attempts: int) -> timedelta:
+    delay = settings.outbox_backoff_base_seconds * (2 ** max(0, attempts - 1))
+    return timedelta(seconds=min(delay, settings.outbox_backoff_max_seconds))
+
+
+def _claimable(now: datetime):
+    return or_(
+        OutboundMessage.status == "pending",
+        # a sender that died mid-delivery: lease expired
+        (OutboundMessage.status == "sending") & (OutboundMessage.locked_until < now),
+    )
+
+
+def _claim(db: Session, ids: list[str], now: datetime) -> list[str]:
+    lease = now + timedelta(seconds=settings.outbox_lease_seconds)
+    claimed: list[str] = []
+    for msg_id in ids:
+        # Conditional update so two workers never claim the same row.
+        res = db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.id == msg_id, _claimable(now))
+            .values(status="sending", locked_until=lease)
+        )
+        if res.rowcount:
+            claimed.append(msg_id)
+    return claimed
+
+
+def _claim_due(db: Session, limit: int) -> list[OutboundMessage]:
+    now = _now()
+    due = (
+        db.query(OutboundMessage.id)
+        .filter(_claimable(now), OutboundMessage.next_attempt_at <= now)
+        .order_by(OutboundMessage.next_attempt_at.asc())
+        .limit(limit)
+        .all()
+    )
+    claimed = _claim(db, [d.id for d in due], now)
+    db.commit()
+    if not claimed:
+        return []
+    return (
+        db.query(OutboundMessage)
+        .filter(OutboundMessage.id.in_(claimed))
+        .order_by(OutboundMessage.created_at.asc())
+        .all()
+    )
+
+
+def _claim_companions(db: Session, key: str, room: int, exclude: set[str]) -> list[OutboundMessage]:
+    """Claim other unbatched pending messages for the same digest, even if still in their window."""
+
+    if room <= 0:
+        return []
+    now = _now()
+    ids = [
+        r.id
+        for r in db.query(OutboundMessage.id)
+        .filter(
+            OutboundMessage.coalesce_key == key,
+            OutboundMessage.batch_id.is_(None),
+            OutboundMessage.status == "pending",
+            OutboundMessage.id.notin_(exclude),
+        )
+        .order_by(OutboundMessage.created_at.asc())
+        .limit(room)
+    ]
+    claimed = _claim(db, ids, now)
+    db.commit()
+    if not claimed:
+        return []
+    return (
+        db.query(OutboundMessage)
+        .filter(OutboundMessage.id.in_(claimed))
+        .order_by(OutboundMessage.created_at.asc())
+        .all()
+    )
+
+
+def _section(msg: OutboundMessage) -> str:
+    return f"— {msg.label}: {msg.text}" if msg.label else f"— {msg.text}"
+
+
+def _digest_text(batch: list[OutboundMessage]) -> str:
+    if len(batch) == 1:
+        return batch[0].text
+    return "\n\n".join([f"War Room digest ({len(batch)} updates)", *map(_section, batch)])
+
+
+def _claim_batch_rest(db: Session, batch_id: str, have: list[OutboundMessage]) -> bool:
+    """Claim the members of an existing batch not in `have`; False if some are held elsewhere."""
+
+    now = _now()
+    held = {m.id for m in have}
+    members = [
+        r.id
+        for r in db.query(OutboundMessage.id).filter(
+            OutboundMessage.batch_id == batch_id, OutboundMessage.status.notin_(["sent", "failed"])
+        )
+    ]
+    missing = [m for m in members if m not in held]
+    claimed = _claim(db, missing, now)
+    db.commit()
+    if len(claimed) < len(missing):
+        # Another sender holds part of the batch; let go of what we took.
+        db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.id.in_(claimed))
+            .values(status="pending", locked_until=None)
+        )
+        db.commit()
+        return False
+    have.extend(
+        db.query(OutboundMessage)
+        .filter(OutboundMessage.id.in_(claimed))
+        .order_by(OutboundMessage.created_at.asc())
+        .all()
+    )
+    return True
+
+
+def _batches(db: Session, claimed: list[OutboundMessage]) -> list[list[OutboundMessage]]:
+    """Group claimed messages into sends.
+
+    Messages that already belong to a batch are resent with exactly that
+    batch. The rest are grouped by coalesce key, split at the count/length
+    caps, and each new batch gets its `batch_id` committed before any send.
+    """
+
+    batches: list[list[OutboundMessage]] = []
+    existing: dict[str, list[OutboundMessage]] = {}
+    groups: dict[str, list[OutboundMessage]] = {}
+    for msg in claimed:
+        if msg.batch_id:
+            existing.setdefault(msg.batch_id, []).append(msg)
+        elif msg.coalesce_key:
+            groups.setdefault(msg.coalesce_key, []).append(msg)
+        else:
+            batches.append([msg])
+
+    for batch_id, batch in existing.items():
+        if not _claim_batch_rest(db, batch_id, batch):
+            _put_back(db, batch, 0)
+            continue
+        batch.sort(key=lambda m: m.created_at)
+        batches.append(batch)
+
+    max_messages = max(1, settings.telegram_digest_max_messages)
+    for key, group in groups.items():
+        group += _claim_companions(
+            db, key, max_messages - len(group), exclude={m.id for m in group}
+        )
+        group.sort(key=lambda m: m.created_at)
+
+        chunks: list[list[OutboundMessage]] = [[]]
+        size = 0
+        for msg in group:
+            size += len(_section(msg)) + 2
+            batch = chunks[-1]
+            if batch and (len(batch) >= max_messages or size > settings.telegram_digest_max_chars):
+                chunks.append([])
+                size = len(_section(msg)) + 2
+            chunks[-1].append(msg)
+
+        for batch in chunks:
+            batch_id = str(uuid4())
+            for msg in batch:
+                msg.batch_id = batch_id
+        batches += chunks
+
+    # Persist membership before sending, so a retry resends the same digest.
+    db.commit()
+    return batches
+
+
+def _record_on_run(db: Session, msg: OutboundMessage) -> None:
+    if not msg.war_room_run_id:
+        return
+    values = {"telegram_message_id": msg.message_id, "telegram_error": None}
+    if msg.status == "failed":
+        values = {"telegram_error": msg.last_error}
+    db.execute(update(WarRoomRun).where(WarRoomRun.id == msg.war_room_run_id).values(**values))
+
+
+async def _deliver(batch: list[OutboundMessage], batch_id: str) -> tuple[str | None, str | None]:
+    oc = get_openclaw()
+    if not oc:
+        return None, "OPENCLAW_GATEWAY_URL/TOKEN not configured"
+    head = batch[0]
+    result = await oc.message_send(
+        channel=head.channel,
+        target=head.target,
+        text=_digest_text(batch),
+        thread_id=head.thread_id,
+        # Single sends keep their own key; a digest is keyed by its batch.
+        idempotency_key=head.idempotency_key if len(batch) == 1 else f"batch:{batch_id}",
+    )
+    message_id = None
+    if isinstance(result, dict):
+        message_id = result.get("messageId") or result.get("id")
+    return (str(message_id) if message_id else None), None
+
+
+def _put_back(db: Session, batch: list[OutboundMessage], wait: float) -> None:
+    for msg in batch:
+        msg.status = "pending"
+        msg.locked_until = None
+        msg.next_attempt_at = _now() + timedelta(seconds=wait)
+    db.commit()
+
+
+async def deliver_due(db: Session, *, limit: int = 20) -> int:
+    """One delivery pass; returns the number of messages sent."""
+
+    sent = 0
+    for batch in _batches(db, _claim_due(db, limit)):
+        head = batch[0]
+        wait = await _chat_wait(head.target)
+        if wait:
+            # Rate limited: put them back without spending an attempt.
+            _put_back(db, batch, wait)
+            continue
+
+        # Digests carry the batch id fixed in _batches, so retries reuse the key.
+        batch_id = head.batch_id or str(uuid4())
+        try:
+            message_id, err = await _deliver(batch, batch_id)
+        except CircuitOpenError as e:
+            # Nothing was sent; retry once the breaker lets calls through again.
+            _put_back(db, batch, e.retry_after)
+            continue
+        except Exception as e:
+            message_id, err = None, str(e)
+
+        for msg in batch:
+            msg.attempts += 1
+            msg.locked_until = None
+            msg.batch_id = batch_id
+            if err is None:
+                msg.status = "sent"
+                msg.message_id = message_id
+                msg.last_error = None
+                msg.sent_at = _now()
+                sent += 1
+            elif msg.attempts >= settings.outbox_max_attempts:
+                msg.status = "failed"
+                msg.last_error = err
+            else:
+                msg.status = "pending"
+                msg.last_error = err
+                msg.next_attempt_at = _now() + _backoff(msg.attempts)
+            if msg.status in {"sent", "failed"}:
+                _record_on_run(db, msg)
+        db.commit()
+    return sent
+
+
+async def outbox_loop(interval: float) -> None:
+    while True:
+        db = SessionLocal()
+        try:
+            await deliver_due(db)
+        except Exception:
+            logger.exception("outbox delivery pass failed")
+            db.rollback()
+        finally:
+            db.close()
+        await asyncio.sleep(interval)
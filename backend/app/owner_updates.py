@@ -0,0 +1,256 @@
+"""Parsing of owner update replies from War Room agents.
+
+Agents are asked for `task_title / current_task / status / next_step /
+blockers` per task but answer in whatever shape the model prefers. This
+accepts, in order of preference:
+
+- JSON (an object, a list of objects, or `{"updates": [...]}`), bare or in a
+  fenced code block;
+- YAML-ish `key: value` blocks, optionally fenced, as `- key: value` list
+  items, or separated by `---` lines.
+
+Only known keys are read, values are split on the first colon only, and
+`---` inside fenced code is not a separator. Every pass is a single scan of
+the text, so parse time is linear in the reply size.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from .models import Task
+
+UPDATE_KEYS = ("task_id", "task_title", "current_task", "status", "next_step", "blockers")
+
+DEFAULT_REQUIRED_FIELDS = ("current_task", "status", "next_step", "blockers")
+
+_ALIASES = {
+    "id": "task_id",
+    "task": "task_title",
+    "title": "task_title",
+    "current": "current_task",
+    "next": "next_step",
+    "next_steps": "next_step",
+    "blocker": "blockers",
+    "blocked_by": "blockers",
+}
+
+_FENCE = re.compile(r"^[ \t]*(```|~~~)[ \t]*([\w+-]*)[ \t]*$", re.M)
+_KEY_LINE = re.compile(
+    r"^[ \t]*(?:[-*+][ \t]+)?[*_`]{0,2}([A-Za-z][A-Za-z_ -]{0,30}?)[*_`]{0,2}[ \t]*:(.*)$"
+)
+_SEPARATOR = re.compile(r"^[ \t]*(?:-{3,}|\*{3,}|_{3,}|={3,})[ \t]*$")
+_LIST_ITEM = re.compile(r"^[ \t]*[-*+][ \t]+\S")
+_NO_BLOCKERS = {"", "none", "n/a", "na", "no", "-", "nothing", "null"}
+
+
+@dataclass
+class ParsedUpdates:
+    items: list[dict[str, str]] = field(default_factory=list)
+    # Output contract violations, e.g. "update 2 (Ship v2) missing: next_step"
+    errors: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.items)
+
+
+def _norm_key(key: str) -> str | None:
+    k = re.sub(r"[\s-]+", "_", key.strip().strip("*_`").lower())
+    k = _ALIASES.get(k, k)
+    return k if k in UPDATE_KEYS else None
+
+
+def _clean_value(value: str) -> str:
+    v = value.strip().strip("*_`").strip()
+    if v in {"|", ">", "|-", ">-"}:  # YAML block scalar; the value follows indented
+        return ""
+    if len(v) >= 2 and v[0] == v[-1] and v[0] in "'\"":
+        v = v[1:-1]
+    return v
+
+
+def _stringify(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "; ".join(_stringify(v) for v in value if v is not None)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value).strip()
+
+
+# --- JSON ---
+
+
+def _from_json(data: Any) -> list[dict[str, str]]:
+    if isinstance(data, dict):
+        for wrapper in ("updates", "tasks", "items"):
+            if isinstance(data.get(wrapper), list):
+                return _from_json(data[wrapper])
+        data = [data]
+    if not isinstance(data, list):
+        return []
+
+    out: list[dict[str, str]] = []
+    for obj in data:
+        if not isinstance(obj, dict):
+            continue
+        item: dict[str, str] = {}
+        for k, v in obj.items():
+            key = _norm_key(str(k))
+            if key and key not in item:
+                item[key] = _stringify(v)
+        if item:
+            out.append(item)
+    return out
+
+
+def _try_json(text: str) -> list[dict[str, str]] | None:
+    s = text.strip()
+    if not s or s[0] not in "[{":
+        return None
+    try:
+        return _from_json(json.loads(s))
+    except ValueError:
+        return None
+
+
+# --- Key/value ---
+
+
+def _from_key_values(lines: Iterable[str]) -> list[dict[str, str]]:
+    out: list[dict[str, str]] = []
+    item: dict[str, str] = {}
+    last: str | None = None
+
+    def flush() -> None:
+        nonlocal item, last
+        if item:
+            out.append({k: v.strip() for k, v in item.items()})
+        item, last = {}, None
+
+    for line in lines:
+        if _SEPARATOR.match(line):
+            flush()
+            continue
+
+        m = _KEY_LINE.match(line)
+        key = _norm_key(m.group(1)) if m else None
+        if key:
+            # A repeated key, or a new "- key:" list item, starts the next update.
+            if key in item or (item and _LIST_ITEM.match(line)):
+                flush()
+            item[key] = _clean_value(m.group(2))
+            last = key
+            continue
+
+        if last and line.strip() and (line[:1] in " \t" or _LIST_ITEM.match(line)):
+            # Indented continuation or a bullet under the previous key.
+            item[last] = f"{item[last]}\n{line.strip()}" if item[last] else line.strip()
+        elif not line.strip():
+            last = None
+    flush()
+    return out
+
+
+# --- Entry point ---
+
+
+def _split_fences(text: str) -> tuple[list[tuple[str, str]], list[str]]:
+    """([(lang, body)] of fenced blocks, lines outside any fence)."""
+
+    blocks: list[tuple[str, str]] = []
+    outside: list[str] = []
+    pos = 0
+    open_fence: re.Match | None = None
+    for m in _FENCE.finditer(text):
+        if open_fence is None:
+            outside.extend(text[pos : m.start()].splitlines())
+            open_fence = m
+        elif m.group(1) == open_fence.group(1) and not m.group(2):
+            blocks.append((open_fence.group(2).lower(), text[open_fence.end() : m.start()]))
+            open_fence = None
+        else:
+            continue
+        pos = m.end()
+    if open_fence is not None:  # unterminated fence: treat the rest as its body
+        blocks.append((open_fence.group(2).lower(), text[open_fence.end() :]))
+    else:
+        outside.extend(text[pos:].splitlines())
+    return blocks, outside
+
+
+def required_fields_for(output_contract: dict | None) -> tuple[str, ...]:
+    fields = (output_contract or {}).get("required_fields")
+    if isinstance(fields, list) and all(isinstance(f, str) for f in fields):
+        return tuple(fields)
+    return DEFAULT_REQUIRED_FIELDS
+
+
+def parse_owner_updates(text: str | None, *, required_fields: Iterable[str] = ()) -> ParsedUpdates:
+    """Parse an owner's reply into update dicts and check them against the contract."""
+
+    if not text:
+        return ParsedUpdates()
+    text = str(text)
+
+    items = _try_json(text)
+    if not items:
+        blocks, outside = _split_fences(text)
+        fenced: list[dict[str, str]] = []
+        for lang, body in blocks:
+            parsed = _try_json(body) if lang in {"", "json", "json5"} else None
+            fenced.extend(parsed if parsed else _from_key_values(body.splitlines()))
+        items = fenced or _from_key_values(outside)
+
+    result = ParsedUpdates(items=items)
+    required = tuple(required_fields)
+    for n, item in enumerate(items, 1):
+        missing = [f for f in required if f not in item]
+        if missing:
+            name = item.get("task_title") or item.get("current_task") or item.get("task_id") or "?"
+            result.errors.append(f"update {n} ({name}) missing: {', '.join(missing)}")
+    return result
+
+
+def has_blockers(item: dict[str, str]) -> bool:
+    return item.get("blockers", "").strip().strip(".").lower() not in _NO_BLOCKERS
+
+
+# --- Task matching ---
+
+_STATUS_SUFFIX = re.compile(r"\s*\((?:status|prio)[^)]*\)\s*$")
+_MARKUP = re.compile(r"[*_`\"']+")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_title(title: str) -> str:
+    t = _MARKUP.sub("", title).strip().lstrip("-*+ ").rstrip(" .:;")
+    t = _STATUS_SUFFIX.sub("", t)
+    return _SPACE.sub(" ", t).casefold()
+
+
+class TaskIndex:
+    """Lookup of an owner's tasks by id and normalized title."""
+
+    def __init__(self, tasks: Iterable[Task]):
+        self.by_id: dict[str, Task] = {}
+        self.by_title: dict[str, Task] = {}
+        for t in tasks:
+            self.by_id[t.id] = t
+            self.by_title.setdefault(normalize_title(t.title), t)
+
+    def match(self, item: dict[str, str]) -> Task | None:
+        task_id = item.get("task_id", "").strip()
+        if task_id in self.by_id:
+            return self.by_id[task_id]
+        for key in ("task_title", "current_task"):
+            value = item.get(key)
+            if value:
+                task = self.by_title.get(normalize_title(value))
+                if task is not None:
+                    return task
+        return None
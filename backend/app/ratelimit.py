@@ -0,0 +1,273 @@
+"""Rate limiting and War Room admission control.
+
+- `RateLimitMiddleware` puts token buckets per actor and per workspace in
+  front of every mutating `/api` request. `POST /api/war-room/run` also has
+  its own, much smaller, per-workspace bucket.
+- `war_room_admission` lets at most one War Room run per workspace, and at
+  most `WAR_ROOM_MAX_CONCURRENT` in total.
+
+Rejections are 429s with a `Retry-After` header. State lives in a backend:
+in-process by default, or Redis (`RATE_LIMIT_BACKEND=redis`, needs the
+`redis` package) so several API processes share limits.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Protocol
+from uuid import uuid4
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .settings import settings
+
+try:  # optional: shared limits across processes
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - depends on the install
+    aioredis = None
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+WAR_ROOM_PATH = "/api/war-room/run"
+
+
+class RateLimitBackend(Protocol):
+    async def take(self, key: str, *, capacity: int, per_second: float) -> float:
+        """Take one token; returns 0 when allowed, else seconds until one is available."""
+
+    async def acquire(self, key: str, *, limit: int, ttl: int) -> str | None:
+        """Take one of `limit` concurrency slots; returns its token, or None when full.
+
+        Each slot expires on its own after `ttl` seconds, so a holder that
+        dies without releasing only costs its own slot, and only for `ttl`.
+        """
+
+    async def release(self, key: str, token: str) -> None:
+        """Give back the slot `token`; a no-op if it already expired."""
+
+
+# Idle token buckets are dropped at most this often (MemoryBackend).
+BUCKET_SWEEP_SECONDS = 60.0
+
+
+class MemoryBackend:
+    # Methods never await, so each call is atomic on the event loop.
+
+    def __init__(self):
+        # key -> (tokens, last update, time the bucket is full again)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._slots: dict[str, dict[str, float]] = {}
+        self._next_sweep = time.monotonic() + BUCKET_SWEEP_SECONDS
+
+    def _sweep(self, now: float) -> None:
+        # A bucket that has refilled behaves exactly like a missing one.
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + BUCKET_SWEEP_SECONDS
+        self._buckets = {k: b for k, b in self._buckets.items() if b[2] > now}
+        for key, slots in list(self._slots.items()):
+            live = {t: exp for t, exp in slots.items() if exp > now}
+            if live:
+                self._slots[key] = live
+            else:
+                del self._slots[key]
+
+    async def take(self, key: str, *, capacity: int, per_second: float) -> float:
+        now = time.monotonic()
+        self._sweep(now)
+        tokens, last, _ = self._buckets.get(key, (float(capacity), now, now))
+        tokens = min(capacity, tokens + (now - last) * per_second)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / per_second
+        self._buckets[key] = (tokens, now, now + (capacity - tokens) / per_second)
+        return wait
+
+    async def acquire(self, key: str, *, limit: int, ttl: int) -> str | None:
+        now = time.monotonic()
+        # Expired slots belong to runs that never released them.
+        live = {t: exp for t, exp in self._slots.get(key, {}).items() if exp > now}
+        self._slots[key] = live
+        if len(live) >= limit:
+            return None
+        token = uuid4().hex
+        live[token] = now + ttl
+        return token
+
+    async def release(self, key: str, token: str) -> None:
+        self._slots.get(key, {}).pop(token, None)
+
+
+_TAKE_LUA = """
+local cap = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1e6
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(b[1]) or cap
+local ts = tonumber(b[2]) or now
+tokens = math.min(cap, tokens + (now - ts) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(cap / rate) + 1)
+return tostring(wait)
+"""
+
+# Slots are members of a sorted set scored by their expiry time, so each one
+# lapses on its own; the key TTL only cleans up once the newest slot is gone.
+_ACQUIRE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1e6
+local ttl = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+  return 0
+end
+redis.call('ZADD', KEYS[1], now + ttl, ARGV[3])
+redis.call('EXPIRE', KEYS[1], math.ceil(ttl) + 1)
+return 1
+"""
+
+
+class RedisBackend:
+    def __init__(self, url: str, *, prefix: str = "mc:rl:"):
+        if aioredis is None:
+            raise ValueError("RATE_LIMIT_BACKEND=redis requires the `redis` package")
+        self._redis = aioredis.from_url(url)
+        self._prefix = prefix
+        self._take = self._redis.register_script(_TAKE_LUA)
+        self._acquire = self._redis.register_script(_ACQUIRE_LUA)
+
+    async def take(self, key: str, *, capacity: int, per_second: float) -> float:
+        return float(await self._take(keys=[self._prefix + key], args=[capacity, per_second]))
+
+    async def acquire(self, key: str, *, limit: int, ttl: int) -> str | None:
+        token = uuid4().hex
+        ok = await self._acquire(keys=[self._prefix + "slotset:" + key], args=[limit, ttl, token])
+        return token if ok else None
+
+    async def release(self, key: str, token: str) -> None:
+        # ZREM of one member: never drops the count below the live slots.
+        await self._redis.zrem(self._prefix + "slotset:" + key, token)
+
+
+@lru_cache
+def get_backend() -> RateLimitBackend:
+    if settings.rate_limit_backend == "redis":
+        if not settings.rate_limit_redis_url:
+            raise ValueError("RATE_LIMIT_BACKEND=redis requires RATE_LIMIT_REDIS_URL")
+        return RedisBackend(settings.rate_limit_redis_url)
+    if settings.rate_limit_backend != "memory":
+        raise ValueError(f"Unknown rate limit backend: {settings.rate_limit_backend}")
+    return MemoryBackend()
+
+
+def _retry_after(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+def _too_many(detail: str, wait: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail}, status_code=429, headers={"Retry-After": _retry_after(wait)}
+    )
+
+
+class RateLimitMiddleware:
+    """Token buckets for mutating /api requests (pure ASGI)."""
+
+    def __init__(self, app: ASGIApp, *, backend: RateLimitBackend | None = None):
+        self.app = app
+        self._backend = backend
+
+    @property
+    def backend(self) -> RateLimitBackend:
+        return self._backend or get_backend()
+
+    def _limits(self, scope: Scope) -> list[tuple[str, str, int, float]]:
+        """(label, bucket key, capacity, tokens per second) that apply to this request."""
+
+        headers = Headers(scope=scope)
+        client = scope.get("client")
+        actor = headers.get("x-mc-user") or f"ip:{client[0] if client else 'unknown'}"
+        workspace = headers.get("x-mc-workspace") or "_default"
+
+        limits = [
+            (
+                "actor",
+                f"actor:{actor}",
+                settings.rate_limit_actor_per_minute,
+                settings.rate_limit_actor_per_minute / 60,
+            ),
+            (
+                "workspace",
+                f"ws:{workspace}",
+                settings.rate_limit_workspace_per_minute,
+                settings.rate_limit_workspace_per_minute / 60,
+            ),
+        ]
+        if scope["path"] == WAR_ROOM_PATH:
+            limits.append(
+                (
+                    "War Room",
+                    f"war_room:{workspace}",
+                    settings.rate_limit_war_room_per_hour,
+                    settings.rate_limit_war_room_per_hour / 3600,
+                )
+            )
+        return limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in MUTATING_METHODS
+            or not scope["path"].startswith("/api/")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        for label, key, capacity, per_second in self._limits(scope):
+            if capacity <= 0:
+                continue
+            wait = await self.backend.take(key, capacity=capacity, per_second=per_second)
+            if wait:
+                response = _too_many(f"Rate limit exceeded ({label})", wait)
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+
+@asynccontextmanager
+async def war_room_admission(workspace_id: str | None) -> AsyncIterator[None]:
+    """Hold a War Room slot for the workspace and one of the global slots, or raise 429."""
+
+    backend = get_backend()
+    ttl = settings.war_room_slot_ttl_seconds
+    busy = {"Retry-After": _retry_after(settings.war_room_busy_retry_after_seconds)}
+
+    ws_key = f"war_room:{workspace_id or '_default'}"
+    ws_slot = await backend.acquire(ws_key, limit=1, ttl=ttl)
+    if ws_slot is None:
+        raise HTTPException(
+            status_code=429, detail="A War Room is already running here", headers=busy
+        )
+    try:
+        global_slot = await backend.acquire(
+            "war_room:_global", limit=settings.war_room_max_concurrent, ttl=ttl
+        )
+        if global_slot is None:
+            raise HTTPException(status_code=429, detail="Too many War Rooms running", headers=busy)
+        try:
+            yield
+        finally:
+            await backend.release("war_room:_global", global_slot)
+    finally:
+        await backend.release(ws_key, ws_slot)
@@ -0,0 +1,128 @@
+"""Single-flight coalescing and a micro-cache for hot list endpoints.
+
+Many open tabs poll `GET /api/tasks` / `GET /api/agents` for the same
+workspace. Identical concurrent requests (same route, workspace and query
+string) share one query and one rendered body, and that body is reused for
+`READ_CACHE_TTL_SECONDS` afterwards.
+
+Mutation handlers call `invalidate(workspace_id)` after they commit. This
+bumps the workspace's generation, which is part of every key, so requests
+that arrive later never see a body rendered before the write (the
+unscoped, all-workspaces listing is bumped too). The cache is per process,
+and its entries only live for the TTL.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from .settings import settings
+
+_ALL = ""  # generation of the unscoped listing (no X-MC-Workspace)
+
+
+class ReadCoalescer:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._generations: dict[str, int] = {}
+        self._cached: dict[tuple, tuple[float, bytes]] = {}
+        self._inflight: dict[tuple, Future[bytes]] = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def key(self, route: str, workspace_id: str | None, query: str, *, replica: bool) -> tuple:
+        scope = workspace_id or _ALL
+        with self._lock:
+            return (route, scope, self._generations.get(scope, 0), query, replica)
+
+    def get(self, key: tuple, render: Callable[[], bytes]) -> bytes:
+        """Return the cached body for `key`, wait for the in-flight one, or render it."""
+
+        now = time.monotonic()
+        with self._lock:
+            hit = self._cached.get(key)
+            if hit and hit[0] > now:
+                self.hits += 1
+                return hit[1]
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return fut.result()
+
+        try:
+            body = render()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            del self._inflight[key]
+            if self.ttl > 0:
+                self._cached[key] = (time.monotonic() + self.ttl, body)
+            self._prune(now)
+        fut.set_result(body)
+        return body
+
+    def invalidate(self, workspace_id: str | None = None) -> None:
+        with self._lock:
+            scopes = {workspace_id or _ALL, _ALL}
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+            self._cached = {k: v for k, v in self._cached.items() if k[1] not in scopes}
+
+    def _prune(self, now: float) -> None:
+        # Called with the lock held; keeps the dict from collecting dead generations.
+        if len(self._cached) > 1024:
+            self._cached = {k: v for k, v in self._cached.items() if v[0] > now}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "entries": len(self._cached),
+            }
+
+
+read_cache = ReadCoalescer(settings.read_cache_ttl_seconds)
+
+
+def coalesced_response(
+    request: Request, db: Session, workspace_id: str | None, render: Callable[[], bytes]
+) -> Response:
+    """Serve a JSON list endpoint through `read_cache` (or directly when disabled).
+
+    Bodies read from the replica are kept apart from primary ones, so a client
+    pinned to the primary after a write never gets a replica's older copy.
+    """
+
+    if not settings.read_coalesce_enabled:
+        body = render()
+    else:
+        query = urlencode(sorted(request.query_params.multi_items()))
+        key = read_cache.key(
+            request.url.path, workspace_id, query, replica=db.info.get("replica", False)
+        )
+        body = read_cache.get(key, render)
+    return Response(content=body, media_type="application/json")
+
+
+def invalidate(workspace_id: str | None = None) -> None:
+    read_cache.invalidate(workspace_id)
@@ -0,0 +1,150 @@
+"""Read-replica routing for GET endpoints.
+
+With `DATABASE_READ_URL` set, read-only handlers take their session from
+`get_read_db` and read from the replica. They fall back to the primary when:
+
+- the client wrote recently. Every successful mutating `/api` request gets a
+  `mc_read_primary_until` cookie and an `X-MC-Read-Primary-Until` header
+  (unix seconds, `READ_YOUR_WRITES_SECONDS` ahead). Clients that don't keep
+  cookies echo the header back.
+- the replica is down, or (on Postgres) further behind than
+  `READ_REPLICA_MAX_LAG_SECONDS`. This is checked at most every
+  `READ_REPLICA_CHECK_SECONDS`.
+
+Writes and the War Room always use the primary (`get_db`).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .db import SessionLocal
+from .ratelimit import MUTATING_METHODS
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+READ_AFTER_COOKIE = "mc_read_primary_until"
+READ_AFTER_HEADER = "x-mc-read-primary-until"
+
+read_engine = None
+ReadSessionLocal = None
+if settings.database_read_url:
+    read_connect_args: dict = {}
+    if settings.database_read_url.startswith("sqlite"):
+        read_connect_args = {"check_same_thread": False}
+    elif settings.database_read_url.startswith("postgresql"):
+        read_connect_args = {"options": "-c default_transaction_read_only=on"}
+    read_engine = create_engine(
+        settings.database_read_url, connect_args=read_connect_args, pool_pre_ping=True
+    )
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Seconds of replay lag; 0 when the replica has applied everything it received.
+_PG_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaHealth:
+    """Cached answer to "is the replica up and caught up?"."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+        self._ok = False
+
+    def ok(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < settings.read_replica_check_seconds:
+                return self._ok
+            self._checked_at = now  # concurrent callers keep the previous answer meanwhile
+        ok = self._check()
+        with self._lock:
+            self._ok = ok
+        return ok
+
+    def _check(self) -> bool:
+        try:
+            with read_engine.connect() as conn:
+                if read_engine.dialect.name != "postgresql":
+                    conn.execute(text("SELECT 1"))
+                    return True
+                lag = float(conn.execute(_PG_LAG_SQL).scalar() or 0)
+        except Exception:
+            logger.warning("read replica unavailable; reading from the primary", exc_info=True)
+            return False
+        if lag > settings.read_replica_max_lag_seconds:
+            logger.warning("read replica is %.1fs behind; reading from the primary", lag)
+            return False
+        return True
+
+
+replica_health = ReplicaHealth()
+
+
+def _wrote_recently(request: Request) -> bool:
+    raw = request.headers.get(READ_AFTER_HEADER) or request.cookies.get(READ_AFTER_COOKIE)
+    try:
+        return raw is not None and float(raw) > time.time()
+    except ValueError:
+        return False
+
+
+def get_read_db(request: Request):
+    use_replica = (
+        ReadSessionLocal is not None and not _wrote_recently(request) and replica_health.ok()
+    )
+    db = ReadSessionLocal() if use_replica else SessionLocal()
+    db.info["replica"] = use_replica
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def session_factory_for(db: Session) -> sessionmaker:
+    """The session factory behind a `get_read_db` session (for work that outlives it)."""
+
+    return ReadSessionLocal if db.info.get("replica") else SessionLocal
+
+
+class ReadYourWritesMiddleware:
+    """Pin a client to the primary for a while after each successful mutation (pure ASGI)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in MUTATING_METHODS
+            or not scope["path"].startswith("/api/")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                ttl = settings.read_your_writes_seconds
+                until = f"{time.time() + ttl:.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(READ_AFTER_HEADER, until)
+                headers.append(
+                    "set-cookie",
+                    f"{READ_AFTER_COOKIE}={until}; Max-Age={int(ttl) + 1}; Path=/; "
+                    "HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
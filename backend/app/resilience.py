@@ -0,0 +1,143 @@
+"""Circuit breakers and bulkheads for calls to the OpenClaw gateway.
+
+Each (gateway, tool) pair gets its own breaker. It opens when the failure
+rate over the last `window` calls crosses the threshold, fails fast while
+open, and after `open_seconds` lets a single probe call through (half-open).
+That probe's outcome decides whether the breaker closes again or reopens.
+
+Bulkheads cap concurrent calls per (gateway, tool), so a degraded tool (say
+`sessions_spawn`) cannot tie up every connection the others need. Callers
+wait up to `wait_seconds` for a slot and then fail fast.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from weakref import WeakKeyDictionary
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"OpenClaw circuit open for {name} (retry in {retry_after:.0f}s)")
+        self.retry_after = retry_after
+
+
+class BulkheadFullError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        *,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        open_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self._outcomes: deque[bool] = deque(maxlen=window)  # True = failure
+        self.state = "closed"  # closed | open | half_open
+        self._opened_at = 0.0
+        self._probing = False
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now."""
+
+        if self.state == "closed":
+            return
+        if self.state == "open":
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(self.name, remaining)
+            self.state = "half_open"
+        # half-open: exactly one probe in flight
+        if self._probing:
+            raise CircuitOpenError(self.name, self.open_seconds)
+        self._probing = True
+
+    def record(self, failed: bool) -> None:
+        if self.state == "half_open":
+            self._probing = False
+            if failed:
+                self._open()
+            else:
+                self.state = "closed"
+                self._outcomes.clear()
+            return
+
+        self._outcomes.append(failed)
+        n = len(self._outcomes)
+        if n >= self.min_calls and sum(self._outcomes) / n >= self.failure_rate:
+            self._open()
+
+    def cancel(self) -> None:
+        """The call allowed by `before_call` never happened."""
+
+        if self.state == "half_open":
+            self._probing = False
+
+    def _open(self) -> None:
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def snapshot(self) -> dict:
+        n = len(self._outcomes)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "calls": n,
+            "failure_rate": round(sum(self._outcomes) / n, 3) if n else 0.0,
+        }
+
+
+class Bulkhead:
+    def __init__(self, name: str, limit: int, *, wait_seconds: float):
+        self.name = name
+        self.limit = limit
+        self.wait_seconds = wait_seconds
+        # Semaphores belong to an event loop; keep one per loop.
+        self._sems: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            WeakKeyDictionary()
+        )
+
+    def _sem(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = self._sems.get(loop)
+        if sem is None:
+            sem = self._sems[loop] = asyncio.Semaphore(self.limit)
+        return sem
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        sem = self._sem()
+        try:
+            await asyncio.wait_for(sem.acquire(), timeout=self.wait_seconds)
+        except asyncio.TimeoutError:
+            raise BulkheadFullError(
+                f"OpenClaw bulkhead {self.name} full ({self.limit} calls in flight)"
+            ) from None
+        try:
+            yield
+        finally:
+            sem.release()
+
+
+def parse_limits(spec: str) -> dict[str, int]:
+    """"sessions_spawn=4,sessions_history=8,*=8" -> {"sessions_spawn": 4, ...}."""
+
+    out: dict[str, int] = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if name.strip() and value.strip():
+            out[name.strip()] = int(value)
+    return out
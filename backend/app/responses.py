@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (native datetime/enum/UUID support)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def rows_response(rows: Iterable[Any]) -> FastJSONResponse:
+    """Render column-projected rows directly, skipping ORM objects and pydantic.
+
+    For read-only list endpoints: the query selects exactly the output
+    columns, so each row already has the shape of the response model.
+    """
+
+    return FastJSONResponse([r._asdict() for r in rows])
+
+
+def render_rows(rows: Iterable[Any]) -> bytes:
+    """Like `rows_response`, but just the JSON body."""
+
+    return orjson.dumps([r._asdict() for r in rows], option=orjson.OPT_NON_STR_KEYS)
@@ -1,8 +1,23 @@
-from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field, model_validator
+from sqlalchemy import inspect as sa_inspect
 
 from .models import ConversationType, TaskStatus
 
 
+def _skip_unloaded(cls: type[BaseModel], data, deferred: set[str]):
+    """Drop deferred ORM columns that were not loaded instead of lazy-loading them."""
+    state = sa_inspect(data, raiseerr=False)
+    if state is None:
+        return data
+    skip = deferred & state.unloaded
+    if not skip:
+        return data
+    return {name: getattr(data, name) for name in cls.model_fields if name not in skip}
+
+
 # --- Agent profile schema ---
 
 
@@ -49,7 +64,9 @@ class AgentWorkStateOut(BaseModel):
     status: str
     next_step: str
     blockers: str
-    updated_at: str | None = None
+    updated_at: datetime | None = None
+    version: int | None = None
+    pushed_at: datetime | None = None
 
     class Config:
         from_attributes = True
@@ -75,6 +92,16 @@ class AgentOut(BaseModel):
         from_attributes = True
 
 
+class AgentSummaryOut(AgentOut):
+    # List projection: soul_md is only present when it was loaded.
+    soul_md: str | None = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _deferred(cls, data):
+        return _skip_unloaded(cls, data, {"soul_md"})
+
+
 # --- Tasks ---
 
 
@@ -95,11 +122,22 @@ class TaskOut(BaseModel):
     priority: int
     sort_order: int
     owner_agent_id: str | None
+    version: int | None = None
 
     class Config:
         from_attributes = True
 
 
+class TaskSummaryOut(TaskOut):
+    # List projection: description is only present when it was loaded.
+    description: str | None = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _deferred(cls, data):
+        return _skip_unloaded(cls, data, {"description"})
+
+
 # --- Conversations / transcripts ---
 
 
@@ -115,6 +153,10 @@ class TurnCreate(BaseModel):
     tool_events: dict | None = None
 
 
+class TurnBatchIn(BaseModel):
+    turns: list[TurnCreate]
+
+
 class TurnOut(BaseModel):
     id: str
     conversation_id: str
@@ -122,12 +164,26 @@ class TurnOut(BaseModel):
     speaker_id: str | None
     content: str
     tool_events: dict | None
-    created_at: str | None = None
+    # Set when tool_events were offloaded; fetch via /api/turns/{id}/tool-events
+    tool_events_ref: str | None = None
+    tool_events_size: int | None = None
+    # Position in the conversation; poll newer turns with `?after=<seq>`.
+    seq: int | None = None
+    created_at: datetime | None = None
 
     class Config:
         from_attributes = True
 
 
+class TurnPageOut(BaseModel):
+    turns: list[TurnOut]
+    # Pass as `before` to load the next older page; null when there is none.
+    next_before: str | None = None
+    # Turns older than every live turn that have been archived. Paging never
+    # reaches them; the full conversation read and the stream include them.
+    archived_turns: int = 0
+
+
 class WarRoomRunOut(BaseModel):
     id: str
     workspace_id: str | None
@@ -138,7 +194,7 @@ class WarRoomRunOut(BaseModel):
     telegram_topic_id: str | None
     telegram_message_id: str | None
     telegram_error: str | None
-    created_at: str | None = None
+    created_at: datetime | None = None
 
     class Config:
         from_attributes = True
@@ -152,6 +208,21 @@ class AgentWorkStateUpsert(BaseModel):
     blockers: str = ""
 
 
+class WorkStatePush(AgentWorkStateUpsert):
+    # Client-chosen; an update whose key was already applied is skipped
+    idempotency_key: str | None = None
+
+
+class TurnPush(TurnCreate):
+    conversation_id: str
+    idempotency_key: str | None = None
+
+
+class AgentUpdatesIn(BaseModel):
+    work_states: list[WorkStatePush] = Field(default_factory=list)
+    turns: list[TurnPush] = Field(default_factory=list)
+
+
 class AuditEventOut(BaseModel):
     id: str
     actor: str
@@ -160,7 +231,7 @@ class AuditEventOut(BaseModel):
     entity_type: str
     entity_id: str | None
     payload: dict
-    created_at: str | None = None
+    created_at: datetime | None = None
 
     class Config:
         from_attributes = True
@@ -178,7 +249,7 @@ class GatewayOut(BaseModel):
     name: str
     url: str
     enabled: bool
-    created_at: str | None = None
+    created_at: datetime | None = None
 
     class Config:
         from_attributes = True
@@ -197,7 +268,7 @@ class WorkspaceOut(BaseModel):
     gateway_id: str | None
     telegram_chat_id: str | None
     telegram_topic_id: str | None
-    created_at: str | None = None
+    created_at: datetime | None = None
 
     class Config:
         from_attributes = True
@@ -211,3 +282,112 @@ class ConversationOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SearchHitOut(BaseModel):
+    doc_type: str
+    doc_id: str
+    parent_id: str | None
+    workspace_id: str | None
+    snippet: str
+    score: float
+
+    class Config:
+        from_attributes = True
+
+
+class SearchPageOut(BaseModel):
+    results: list[SearchHitOut]
+    next_cursor: str | None = None
+
+
+class RetentionPolicyIn(BaseModel):
+    # Days to keep rows in the live tables; null keeps them forever.
+    turns_days: int | None = Field(default=None, ge=1)
+    audit_days: int | None = Field(default=None, ge=1)
+    war_room_runs_days: int | None = Field(default=None, ge=1)
+
+
+class RetentionPolicyOut(RetentionPolicyIn):
+    workspace_id: str
+
+    class Config:
+        from_attributes = True
+
+
+class OutboundMessageOut(BaseModel):
+    id: str
+    idempotency_key: str
+    channel: str
+    target: str
+    thread_id: str | None
+    text: str
+    status: str
+    attempts: int
+    next_attempt_at: datetime | None = None
+    last_error: str | None
+    coalesce_key: str | None = None
+    label: str | None = None
+    batch_id: str | None = None
+    message_id: str | None
+    war_room_run_id: str | None
+    created_at: datetime | None = None
+    sent_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class JobOut(BaseModel):
+    id: str
+    workspace_id: str | None
+    kind: str
+    payload: dict
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: datetime | None = None
+    locked_by: str | None = None
+    locked_until: datetime | None = None
+    last_error: str | None = None
+    result: dict | None = None
+    created_at: datetime | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+# --- Bulk import (NDJSON, one record per line; see app/bulk.py) ---
+
+
+class AgentImport(AgentCreate):
+    kind: Literal["agent"]
+    id: str | None = None
+    created_at: datetime | None = None
+
+
+class TaskImport(TaskCreate):
+    kind: Literal["task"]
+    id: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+class ConversationImport(ConversationCreate):
+    kind: Literal["conversation"]
+    id: str | None = None
+    created_at: datetime | None = None
+
+
+class TurnImport(TurnCreate):
+    kind: Literal["turn"]
+    id: str | None = None
+    conversation_id: str
+    created_at: datetime | None = None
+
+
+ImportRecord = Annotated[
+    AgentImport | TaskImport | ConversationImport | TurnImport, Field(discriminator="kind")
+]
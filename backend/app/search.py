@@ -0,0 +1,367 @@
+"""Full-text search over turns, tasks and audit events.
+
+Searchable text lives in `search_documents`, one row per source row, kept
+current by database triggers on `turns`, `tasks` and `audit_events` (so bulk
+inserts that bypass the ORM are indexed too). The full-text index itself is
+dialect specific: an external-content FTS5 table on SQLite, a generated
+`tsvector` column with a GIN index on Postgres. `search()` hides the
+difference behind one ranked, keyset-paged query.
+"""
+
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+DOC_TYPES = ("turn", "task", "audit")
+
+_SQLITE_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS search_documents (
+        id INTEGER PRIMARY KEY,
+        doc_type TEXT NOT NULL,
+        doc_id TEXT NOT NULL,
+        workspace_id TEXT,
+        parent_id TEXT,
+        body TEXT NOT NULL,
+        UNIQUE (doc_type, doc_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_workspace ON search_documents (workspace_id)",
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_fts
+    USING fts5(body, content='search_documents', content_rowid='id')
+    """,
+    # search_documents -> search_fts (standard external-content sync)
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN
+        INSERT INTO search_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN
+        INSERT INTO search_fts(search_fts, rowid, body) VALUES ('delete', old.id, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN
+        INSERT INTO search_fts(search_fts, rowid, body) VALUES ('delete', old.id, old.body);
+        INSERT INTO search_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+    # source tables -> search_documents
+    """
+    CREATE TRIGGER IF NOT EXISTS turns_search_ai AFTER INSERT ON turns BEGIN
+        INSERT INTO search_documents(doc_type, doc_id, workspace_id, parent_id, body)
+        VALUES (
+            'turn', new.id,
+            (SELECT workspace_id FROM conversations WHERE id = new.conversation_id),
+            new.conversation_id, new.content
+        )
+        ON CONFLICT (doc_type, doc_id) DO UPDATE SET body = excluded.body;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS turns_search_au AFTER UPDATE OF content ON turns BEGIN
+        UPDATE search_documents SET body = new.content
+        WHERE doc_type = 'turn' AND doc_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS turns_search_ad AFTER DELETE ON turns BEGIN
+        DELETE FROM search_documents WHERE doc_type = 'turn' AND doc_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_search_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO search_documents(doc_type, doc_id, workspace_id, parent_id, body)
+        VALUES (
+            'task', new.id, new.workspace_id, NULL,
+            new.title || char(10) || coalesce(new.description, '')
+        )
+        ON CONFLICT (doc_type, doc_id) DO UPDATE SET body = excluded.body;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_search_au
+    AFTER UPDATE OF title, description, workspace_id ON tasks BEGIN
+        UPDATE search_documents
+        SET body = new.title || char(10) || coalesce(new.description, ''),
+            workspace_id = new.workspace_id
+        WHERE doc_type = 'task' AND doc_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_search_ad AFTER DELETE ON tasks BEGIN
+        DELETE FROM search_documents WHERE doc_type = 'task' AND doc_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS audit_events_search_ai AFTER INSERT ON audit_events BEGIN
+        INSERT INTO search_documents(doc_type, doc_id, workspace_id, parent_id, body)
+        VALUES (
+            'audit', new.id, new.workspace_id, new.entity_id,
+            new.action || ' ' || new.entity_type || ' ' || coalesce(new.payload, '')
+        )
+        ON CONFLICT (doc_type, doc_id) DO UPDATE SET body = excluded.body;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS audit_events_search_ad AFTER DELETE ON audit_events BEGIN
+        DELETE FROM search_documents WHERE doc_type = 'audit' AND doc_id = old.id;
+    END
+    """,
+]
+
+_POSTGRES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS search_documents (
+        id BIGSERIAL PRIMARY KEY,
+        doc_type TEXT NOT NULL,
+        doc_id TEXT NOT NULL,
+        workspace_id TEXT,
+        parent_id TEXT,
+        body TEXT NOT NULL,
+        tsv tsvector GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED,
+        UNIQUE (doc_type, doc_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_workspace ON search_documents (workspace_id)",
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_tsv ON search_documents USING GIN (tsv)",
+    """
+    CREATE OR REPLACE FUNCTION mc_search_sync() RETURNS trigger AS $$
+    DECLARE
+        v_ws text;
+        v_parent text;
+        v_body text;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM search_documents WHERE doc_type = TG_ARGV[0] AND doc_id = OLD.id;
+            RETURN OLD;
+        END IF;
+        IF TG_TABLE_NAME = 'turns' THEN
+            SELECT workspace_id INTO v_ws FROM conversations WHERE id = NEW.conversation_id;
+            v_parent := NEW.conversation_id;
+            v_body := NEW.content;
+        ELSIF TG_TABLE_NAME = 'tasks' THEN
+            v_ws := NEW.workspace_id;
+            v_body := NEW.title || E'\\n' || coalesce(NEW.description, '');
+        ELSE
+            v_ws := NEW.workspace_id;
+            v_parent := NEW.entity_id;
+            v_body := NEW.action || ' ' || NEW.entity_type || ' '
+                || coalesce(NEW.payload::text, '');
+        END IF;
+        INSERT INTO search_documents(doc_type, doc_id, workspace_id, parent_id, body)
+        VALUES (TG_ARGV[0], NEW.id, v_ws, v_parent, v_body)
+        ON CONFLICT (doc_type, doc_id) DO UPDATE
+        SET workspace_id = EXCLUDED.workspace_id,
+            parent_id = EXCLUDED.parent_id,
+            body = EXCLUDED.body;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS turns_search ON turns",
+    """
+    CREATE TRIGGER turns_search AFTER INSERT OR UPDATE OF content OR DELETE ON turns
+    FOR EACH ROW EXECUTE FUNCTION mc_search_sync('turn')
+    """,
+    "DROP TRIGGER IF EXISTS tasks_search ON tasks",
+    """
+    CREATE TRIGGER tasks_search
+    AFTER INSERT OR UPDATE OF title, description, workspace_id OR DELETE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION mc_search_sync('task')
+    """,
+    "DROP TRIGGER IF EXISTS audit_events_search ON audit_events",
+    """
+    CREATE TRIGGER audit_events_search AFTER INSERT OR DELETE ON audit_events
+    FOR EACH ROW EXECUTE FUNCTION mc_search_sync('audit')
+    """,
+]
+
+_BACKFILL = [
+    """
+    INSERT INTO search_documents(doc_type, doc_id, workspace_id, parent_id, body)
+    SELECT 'turn', t.id, c.workspace_id, t.conversation_id, t.content
+    FROM turns t LEFT JOIN conversations c ON c.id = t.conversation_id
+    """,
+    """
+    INSERT INTO search_documents(doc_type, doc_id, workspace_id, parent_id, body)
+    SELECT 'task', id, workspace_id, NULL, title || :nl || coalesce(description, '')
+    FROM tasks
+    """,
+    """
+    INSERT INTO search_documents(doc_type, doc_id, workspace_id, parent_id, body)
+    SELECT 'audit', id, workspace_id, entity_id,
+           action || ' ' || entity_type || ' ' || coalesce(CAST(payload AS TEXT), '')
+    FROM audit_events
+    """,
+]
+
+
+def _has_search_table(conn: Connection) -> bool:
+    if conn.dialect.name == "sqlite":
+        q = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_documents'"
+    else:
+        q = "SELECT 1 FROM information_schema.tables WHERE table_name = 'search_documents'"
+    return conn.exec_driver_sql(q).first() is not None
+
+
+def install_search(engine: Engine) -> bool:
+    """Create the search tables/triggers (idempotent); backfill on first install.
+
+    Returns False when the database has no full-text support (e.g. SQLite
+    built without FTS5); search is then unavailable but writes still work.
+    """
+
+    if engine.dialect.name == "sqlite":
+        ddl = _SQLITE_DDL
+    elif engine.dialect.name == "postgresql":
+        ddl = _POSTGRES_DDL
+    else:
+        return False
+
+    try:
+        with engine.begin() as conn:
+            fresh = not _has_search_table(conn)
+            for stmt in ddl:
+                conn.exec_driver_sql(stmt)
+            if fresh:
+                _backfill(conn)
+    except DBAPIError:
+        return False
+    return True
+
+
+def _backfill(conn: Connection) -> None:
+    for stmt in _BACKFILL:
+        conn.execute(text(stmt), {"nl": "\n"})
+
+
+def rebuild_search_index(db: Session) -> None:
+    db.execute(text("DELETE FROM search_documents"))
+    _backfill(db.connection())
+    db.commit()
+
+
+# --- Querying ---
+
+
+@dataclass
+class SearchHit:
+    doc_type: str
+    doc_id: str
+    # conversation id for turns, entity id for audit events
+    parent_id: str | None
+    workspace_id: str | None
+    snippet: str
+    score: float
+
+
+@dataclass
+class SearchPage:
+    hits: list[SearchHit]
+    next_cursor: str | None
+
+
+def _encode_cursor(score: float, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{score!r}:{row_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        score, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return float(score), int(row_id)
+    except Exception as e:
+        raise ValueError("Invalid search cursor") from e
+
+
+def _fts5_query(q: str) -> str:
+    # Treat user input as plain terms (implicitly AND-ed), not FTS5 syntax.
+    return " ".join('"' + tok.replace('"', '""') + '"' for tok in q.split())
+
+
+def search(
+    db: Session,
+    q: str,
+    *,
+    workspace_id: str | None,
+    doc_types: tuple[str, ...] | None = None,
+    limit: int = 20,
+    cursor: str | None = None,
+) -> SearchPage:
+    """Ranked full-text search, best match first.
+
+    `score` is lower-is-better on both backends (FTS5 bm25 is negative,
+    Postgres ts_rank_cd is negated), so keyset paging is `(score, id)`.
+    """
+
+    if not q.strip():
+        return SearchPage(hits=[], next_cursor=None)
+
+    params: dict = {"limit": limit + 1}
+    where: list[str] = []
+
+    if db.get_bind().dialect.name == "sqlite":
+        score = "search_fts.rank"
+        sql = (
+            "SELECT d.id, d.doc_type, d.doc_id, d.parent_id, d.workspace_id, "
+            f"{score} AS score, "
+            "snippet(search_fts, 0, '[', ']', '…', 12) AS snippet "
+            "FROM search_fts JOIN search_documents d ON d.id = search_fts.rowid"
+        )
+        where.append("search_fts MATCH :q")
+        params["q"] = _fts5_query(q)
+    else:
+        score = "-CAST(ts_rank_cd(d.tsv, query) AS double precision)"
+        sql = (
+            "SELECT d.id, d.doc_type, d.doc_id, d.parent_id, d.workspace_id, "
+            f"{score} AS score, "
+            "ts_headline('simple', d.body, query, 'MaxWords=24, MinWords=8') AS snippet "
+            "FROM search_documents d, websearch_to_tsquery('simple', :q) query"
+        )
+        where.append("d.tsv @@ query")
+        params["q"] = q
+
+    if workspace_id:
+        where.append("d.workspace_id = :workspace_id")
+        params["workspace_id"] = workspace_id
+
+    unknown = sorted(set(doc_types or ()) - set(DOC_TYPES))
+    if unknown:
+        raise ValueError(f"Unknown search types: {', '.join(unknown)}")
+    types = list(dict.fromkeys(doc_types or DOC_TYPES))
+    if len(types) < len(DOC_TYPES):
+        names = [f"t{i}" for i in range(len(types))]
+        where.append(f"d.doc_type IN ({', '.join(':' + n for n in names)})")
+        params.update(dict(zip(names, types)))
+
+    if cursor:
+        after_score, after_id = _decode_cursor(cursor)
+        where.append(f"({score} > :after_score OR ({score} = :after_score AND d.id > :after_id))")
+        params.update(after_score=after_score, after_id=after_id)
+
+    sql += " WHERE " + " AND ".join(where) + f" ORDER BY {score}, d.id LIMIT :limit"
+    rows = db.execute(text(sql), params).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    hits = [
+        SearchHit(
+            doc_type=r.doc_type,
+            doc_id=r.doc_id,
+            parent_id=r.parent_id,
+            workspace_id=r.workspace_id,
+            snippet=r.snippet,
+            score=r.score,
+        )
+        for r in rows
+    ]
+    next_cursor = _encode_cursor(rows[-1].score, rows[-1].id) if has_more else None
+    return SearchPage(hits=hits, next_cursor=next_cursor)
@@ -5,6 +5,13 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
     database_url: str = "sqlite:///./dev.db"
+    # Optional read replica for GET endpoints (writes and the War Room use database_url)
+    database_read_url: str | None = None
+    # Read from the primary instead when the replica is this far behind (Postgres) or down
+    read_replica_max_lag_seconds: float = 5.0
+    read_replica_check_seconds: float = 5.0
+    # After a mutation the same client reads from the primary for this long
+    read_your_writes_seconds: float = 10.0
     cors_origins: str = "http://localhost:5173"
 
     # v0 auth: require a shared API key for mutations (UI will send it)
@@ -12,12 +19,114 @@ class Settings(BaseSettings):
 
     openclaw_gateway_url: str | None = None
     openclaw_gateway_token: str | None = None
+    openclaw_timeout_seconds: float = 30.0
+    # Per gateway+tool circuit breaker: open when at least `failure_rate` of the last
+    # `window` calls (and at least `min_calls`) failed; probe again after `open_seconds`
+    openclaw_breaker_window: int = 20
+    openclaw_breaker_min_calls: int = 5
+    openclaw_breaker_failure_rate: float = 0.5
+    openclaw_breaker_open_seconds: float = 30.0
+    # Max concurrent calls per tool ("*" = any other tool), and how long to wait for a slot
+    openclaw_bulkheads: str = "sessions_spawn=4,sessions_history=8,*=8"
+    openclaw_bulkhead_wait_seconds: float = 10.0
 
     telegram_chat_id: str | None = None
     telegram_topic_id: str | None = None
 
+    # Response compression (gzip; Brotli when the `brotli` extra is installed)
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    # Comma-separated content-type prefixes eligible for compression
+    compression_content_types: str = "application/json,application/x-ndjson,text/"
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+
+    # Retention / archival
+    archive_dir: str = "./archive"
+    # Seconds between archiver passes, run as a job by one node (0 disables them)
+    archive_interval_seconds: int = 3600
+    archive_batch_size: int = 5000
+    # Defaults for workspaces without a retention policy (unset = keep forever)
+    retention_turns_days: int | None = None
+    retention_audit_days: int | None = None
+    retention_war_room_runs_days: int | None = None
+
+    # Blob store for large turn tool_events (content-addressed, deduplicated)
+    blob_dir: str = "./blobs"
+    # none | gzip | zstd (zstd needs the `zstandard` package)
+    blob_codec: str = "gzip"
+    tool_events_inline_max_bytes: int = 16384
+
+    # Outbound message queue (War Room summaries -> Telegram via OpenClaw)
+    outbox_poll_seconds: float = 2.0
+    outbox_max_attempts: int = 8
+    outbox_backoff_base_seconds: float = 5.0
+    outbox_backoff_max_seconds: float = 3600.0
+    outbox_lease_seconds: float = 60.0
+
+    # Background jobs (War Rooms with ?background=true, archiving), shared by all API nodes
+    # Jobs this node runs at once (0: enqueue only, leave the work to other nodes)
+    job_workers: int = 2
+    job_poll_seconds: float = 1.0
+    # Lease on a running job, renewed by heartbeats every third of it
+    job_lease_seconds: float = 60.0
+    job_max_attempts: int = 3
+    job_backoff_base_seconds: float = 30.0
+    job_backoff_max_seconds: float = 1800.0
+    # Finished jobs are deleted after this many days
+    job_retention_days: int = 7
+    # Telegram allows ~20 messages/minute into one group chat
+    telegram_per_chat_per_minute: int = 20
+    # War Room summaries for the same chat/topic within this window go out as one digest
+    telegram_digest_window_seconds: float = 30.0
+    telegram_digest_max_messages: int = 10
+    telegram_digest_max_chars: int = 3500
+
+    # Rate limits for mutating /api requests (token buckets; 0 disables a limit)
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"  # memory | redis (shared across processes)
+    rate_limit_redis_url: str | None = None
+    rate_limit_actor_per_minute: int = 120
+    rate_limit_workspace_per_minute: int = 600
+    rate_limit_war_room_per_hour: int = 30
+
+    # War Room admission: one run per workspace at a time, plus a global cap
+    war_room_max_concurrent: int = 4
+    # A slot is considered abandoned after this long
+    war_room_slot_ttl_seconds: int = 1800
+    war_room_busy_retry_after_seconds: int = 30
+
+    # Identical concurrent GET /api/tasks|agents share one query; the body is reused this long
+    read_coalesce_enabled: bool = True
+    read_cache_ttl_seconds: float = 1.0
+
+    # Entity cache for agents/workspaces/gateways (LRU per kind + TTL)
+    entity_cache_enabled: bool = True
+    entity_cache_max_entries: int = 4096
+    entity_cache_ttl_seconds: float = 300.0
+    # Publish invalidations to other workers over Redis pub/sub (needs the `redis` package)
+    entity_cache_redis_url: str | None = None
+
+    # NDJSON import: lines per batch (one multi-row insert per kind, one commit, one audit event)
+    bulk_batch_size: int = 500
+
     # War room behavior
     apply_war_room_moves: bool = False
+    # Skip owners whose focus tasks are unchanged since the last run (`?full=true` overrides)
+    war_room_incremental: bool = True
+    # ...but re-ask an unchanged owner at least this often
+    war_room_refresh_max_age_minutes: int = 360
+    # Don't ask owners who pushed their work state this recently (and after any task change)
+    war_room_push_fresh_minutes: int = 60
+    # Agent updates and turn batches: max items per request; idempotency key retention
+    ingest_max_items: int = 1000
+    ingest_key_ttl_hours: int = 48
+    # Reuse one OpenClaw session per agent (sessions_send) until it is this old or idle
+    agent_session_max_age_hours: float = 24.0
+    agent_session_idle_minutes: float = 180.0
+    # How long to wait for an agent's reply
+    agent_reply_poll_attempts: int = 25
+    agent_reply_poll_seconds: float = 1.5
 
     # Secrets
     # Used to encrypt gateway tokens at rest (Fernet key).
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator
+from uuid import uuid4
+
+import orjson
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from .blobs import offload_tool_events
+from .db import SessionLocal
+from .models import Conversation, Turn
+from .schemas import TurnCreate
+
+# Columns that make up a TurnOut; selected directly so rows never become ORM objects.
+TURN_COLUMNS = (
+    Turn.id,
+    Turn.conversation_id,
+    Turn.speaker_type,
+    Turn.speaker_id,
+    Turn.content,
+    Turn.tool_events,
+    Turn.tool_events_ref,
+    Turn.tool_events_size,
+    Turn.seq,
+    Turn.created_at,
+)
+
+TRANSCRIPT_ORDER = (Turn.seq.asc(),)
+
+STREAM_BATCH_SIZE = 200
+
+
+def allocate_turn_seq(db: Session, conversation_id: str, count: int = 1) -> int | None:
+    """Reserve `count` consecutive turn seqs; returns the first, or None if no such conversation.
+
+    A single UPDATE ... RETURNING on the conversation row. The row stays
+    locked until the caller commits (SQLite: the database write lock), so
+    concurrent appenders to one conversation commit in seq order.
+    """
+
+    last = db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(last_turn_seq=Conversation.last_turn_seq + count)
+        .returning(Conversation.last_turn_seq)
+    ).scalar()
+    return None if last is None else last - count + 1
+
+
+def append_turns(
+    db: Session, conversation_id: str, items: Iterable[TurnCreate]
+) -> list[str] | None:
+    """Insert `items` as the next turns of a conversation, in order; returns their ids.
+
+    All rows go out in one multi-row INSERT (not committed), numbered from
+    one seq reservation. Returns None if the conversation does not exist.
+    """
+
+    items = list(items)
+    first = allocate_turn_seq(db, conversation_id, len(items))
+    if first is None:
+        return None
+    now = datetime.now(timezone.utc)
+    rows = []
+    for seq, item in enumerate(items, start=first):
+        tool_events, ref, size = offload_tool_events(item.tool_events)
+        rows.append(
+            {
+                "id": str(uuid4()),
+                "conversation_id": conversation_id,
+                "speaker_type": item.speaker_type,
+                "speaker_id": item.speaker_id,
+                "content": item.content,
+                "tool_events": tool_events,
+                "tool_events_ref": ref,
+                "tool_events_size": size,
+                "seq": seq,
+                "created_at": now,
+            }
+        )
+    if rows:
+        db.execute(insert(Turn), rows)
+    return [r["id"] for r in rows]
+
+
+def backfill_turn_seq(db: Session) -> int:
+    """Number turns that have no seq yet (rows from before the column existed).
+
+    They are numbered after the conversation's current `last_turn_seq`, in
+    (created_at, id) order, and the counters are then raised to cover every
+    stored seq. Commits; returns the number of turns numbered.
+    """
+
+    numbered = (
+        select(
+            Turn.id,
+            (
+                Conversation.last_turn_seq
+                + func.row_number().over(
+                    partition_by=Turn.conversation_id, order_by=(Turn.created_at, Turn.id)
+                )
+            ).label("seq"),
+        )
+        .join(Conversation, Conversation.id == Turn.conversation_id)
+        .where(Turn.seq.is_(None))
+        .subquery()
+    )
+    numbered_count = db.execute(
+        update(Turn)
+        .where(Turn.id == numbered.c.id)
+        .values(seq=numbered.c.seq)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    top = (
+        select(func.max(Turn.seq))
+        .where(Turn.conversation_id == Conversation.id)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(Conversation)
+        .where(func.coalesce(top, 0) > Conversation.last_turn_seq)
+        .values(last_turn_seq=top)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return numbered_count
+
+
+def stream_turns_ndjson(
+    conversation_id: str, session_factory: sessionmaker = SessionLocal
+) -> Iterator[bytes]:
+    """Yield a conversation's live turns as NDJSON lines, oldest first.
+
+    Rows are fetched through a server-side cursor in batches, so memory
+    stays flat however long the transcript is. The generator owns its
+    session because it outlives the request-scoped one; pass the read
+    session's factory so it reads from the same database (replica or primary).
+    """
+
+    db = session_factory()
+    try:
+        stmt = (
+            select(*TURN_COLUMNS)
+            .where(Turn.conversation_id == conversation_id)
+            .order_by(*TRANSCRIPT_ORDER)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        for row in db.execute(stmt):
+            yield orjson.dumps(row._asdict()) + b"\n"
+    finally:
+        db.close()
+
+
+@dataclass
+class TurnPage:
+    turns: list[Any]
+    # Pass back as `before` to fetch the next older page; None when exhausted.
+    next_before: str | None
+
+
+def tail_turns(
+    db: Session,
+    conversation_id: str,
+    *,
+    limit: int,
+    before: str | None = None,
+) -> TurnPage:
+    """Return the newest `limit` turns (older than turn `before`), oldest first."""
+
+    q = db.query(*TURN_COLUMNS).filter(Turn.conversation_id == conversation_id)
+    if before:
+        anchor = (
+            select(Turn.seq)
+            .where(Turn.conversation_id == conversation_id, Turn.id == before)
+            .scalar_subquery()
+        )
+        q = q.filter(Turn.seq < anchor)
+
+    rows = q.order_by(Turn.seq.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+    return TurnPage(turns=rows, next_before=rows[0].id if has_more and rows else None)
+
+
+def turns_after(db: Session, conversation_id: str, *, after: int, limit: int) -> list[Any]:
+    """Up to `limit` turns with seq > `after`, oldest first (incremental polling)."""
+
+    return (
+        db.query(*TURN_COLUMNS)
+        .filter(Turn.conversation_id == conversation_id, Turn.seq > after)
+        .order_by(Turn.seq.asc())
+        .limit(limit)
+        .all()
+    )
@@ -0,0 +1,116 @@
+"""Atomic writes for rows that API requests and War Rooms update concurrently.
+
+Agent work state is written with a single `INSERT ... ON CONFLICT DO UPDATE`
+instead of read-then-write (as is the per-agent OpenClaw session record),
+and task status moves are compare-and-set on `Task.version`. Concurrent
+writers therefore neither lose updates silently nor trip unique-key errors.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .models import AgentSession, AgentWorkState, Task, TaskStatus
+
+
+def dialect_insert(db: Session, model):
+    """`insert()` with `on_conflict_*` support for the session's dialect."""
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:  # pragma: no cover - only SQLite and Postgres are supported
+        raise NotImplementedError(f"upsert not supported on {dialect}")
+    return insert(model)
+
+
+def upsert_work_state(
+    db: Session,
+    *,
+    agent_id: str,
+    task_id: str | None,
+    status: str,
+    next_step: str,
+    blockers: str,
+) -> int:
+    """Create or replace an agent's work state in one statement; returns its new version.
+
+    Clears `pushed_at`: this state was not pushed by the agent, so the War
+    Room must not take it as the agent's own fresh update.
+    """
+
+    values = {
+        "task_id": task_id,
+        "status": status,
+        "next_step": next_step,
+        "blockers": blockers,
+        "pushed_at": None,
+    }
+    stmt = dialect_insert(db, AgentWorkState).values(agent_id=agent_id, version=1, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AgentWorkState.agent_id],
+        set_={**values, "version": AgentWorkState.version + 1, "updated_at": func.now()},
+    ).returning(AgentWorkState.version)
+    return db.execute(stmt).scalar_one()
+
+
+def upsert_work_states(db: Session, rows: list[dict], *, pushed_at: datetime | None) -> None:
+    """`upsert_work_state` for many agents in one executemany (one row per agent)."""
+
+    stmt = dialect_insert(db, AgentWorkState)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AgentWorkState.agent_id],
+        set_={
+            "task_id": stmt.excluded.task_id,
+            "status": stmt.excluded.status,
+            "next_step": stmt.excluded.next_step,
+            "blockers": stmt.excluded.blockers,
+            "pushed_at": stmt.excluded.pushed_at,
+            "version": AgentWorkState.version + 1,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt, [{**row, "version": 1, "pushed_at": pushed_at} for row in rows])
+
+
+def upsert_agent_session(
+    db: Session, *, agent_id: str, session_key: str, openclaw_agent_id: str, now: datetime
+) -> None:
+    """Record a freshly spawned session for the agent, replacing any previous one."""
+
+    values = {
+        "session_key": session_key,
+        "openclaw_agent_id": openclaw_agent_id,
+        "uses": 1,
+        "last_error": None,
+        "created_at": now,
+        "last_used_at": now,
+    }
+    stmt = dialect_insert(db, AgentSession).values(agent_id=agent_id, **values)
+    db.execute(stmt.on_conflict_do_update(index_elements=[AgentSession.agent_id], set_=values))
+
+
+def move_task(db: Session, task: Task, status: str | TaskStatus) -> bool:
+    """Set `task.status` only if the row still has the version we loaded.
+
+    Returns False (and leaves the row alone) when someone else changed the
+    task in the meantime.
+    """
+
+    status = TaskStatus(status)
+    res = db.execute(
+        update(Task.__table__)
+        .where(Task.id == task.id, Task.version == task.version)
+        .values(status=status, version=Task.version + 1)
+    )
+    if not res.rowcount:
+        return False
+    set_committed_value(task, "status", status)
+    set_committed_value(task, "version", task.version + 1)
+    return True
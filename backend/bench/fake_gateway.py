@@ -0,0 +1,194 @@
+"""Fake OpenClaw gateway for benchmarks and local runs.
+
+Implements `POST /tools/invoke` for `sessions_spawn`, `sessions_send`,
+`sessions_history`, `session_status` and `message`, with configurable latency
+and failure rates. Agents "reply" to War Room prompts with a well-formed
+owner update once `reply_delay` has passed.
+
+    cd backend
+    python -m bench.fake_gateway --port 18789 --latency-ms 50 --failure-rate 0.01
+
+or in-process: `with FakeGateway(config).serve() as url: ...`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import random
+import re
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+@dataclass
+class GatewayConfig:
+    latency_ms: float = 20.0  # mean per tool call
+    jitter_ms: float = 10.0  # +/- uniform
+    failure_rate: float = 0.0  # fraction of calls answered with HTTP 503
+    reply_delay_s: float = 0.2  # agent "think time" before its reply shows up in history
+    # Per-tool overrides, e.g. {"sessions_spawn": 250.0}
+    tool_latency_ms: dict[str, float] = field(default_factory=dict)
+    tool_failure_rate: dict[str, float] = field(default_factory=dict)
+    token: str = "bench-token"
+    seed: int | None = None
+
+
+_TASK_LINE = re.compile(r"^- (.+)$")
+_ID_LINE = re.compile(r"^\s+id:\s*(\S+)")
+
+
+def _owner_update(prompt: str) -> str:
+    """A well-formed reply to a War Room prompt (one block per listed task)."""
+
+    blocks: list[str] = []
+    title = None
+    for line in prompt.splitlines():
+        if m := _TASK_LINE.match(line):
+            title = m.group(1)
+        elif (m := _ID_LINE.match(line)) and title:
+            blocks.append(
+                "\n".join(
+                    [
+                        f"task_id: {m.group(1)}",
+                        f"task_title: {title}",
+                        f"current_task: {title}",
+                        "status: working",
+                        "next_step: keep going",
+                        "blockers: none",
+                    ]
+                )
+            )
+            title = None
+    return "\n---\n".join(blocks) or "status: working\nnext_step: none\nblockers: none"
+
+
+class FakeGateway:
+    def __init__(self, config: GatewayConfig | None = None):
+        self.config = config or GatewayConfig()
+        self._rng = random.Random(self.config.seed)
+        self._ids = itertools.count(1)
+        # session key -> list of (visible_at, message)
+        self._sessions: dict[str, list[tuple[float, dict]]] = {}
+        self.calls: dict[str, int] = {}
+        self.app = self._build_app()
+
+    # --- tools ---
+
+    def _post(self, key: str, prompt: str) -> None:
+        now = time.monotonic()
+        history = self._sessions.setdefault(key, [])
+        history.append((now, {"role": "user", "content": prompt}))
+        reply = {"role": "assistant", "content": _owner_update(prompt)}
+        history.append((now + self.config.reply_delay_s, reply))
+
+    def _invoke(self, tool: str, args: dict):
+        if tool == "sessions_spawn":
+            key = f"agent:{args.get('agentId') or 'main'}:sub:{next(self._ids)}"
+            self._post(key, str(args.get("task", "")))
+            return {"status": "accepted", "childSessionKey": key}
+        if tool == "sessions_send":
+            key = args.get("sessionKey")
+            if key not in self._sessions:
+                raise KeyError(f"unknown session {key}")
+            self._post(key, str(args.get("message", "")))
+            return {"status": "accepted"}
+        if tool == "sessions_history":
+            now = time.monotonic()
+            msgs = [m for t, m in self._sessions.get(args.get("sessionKey"), []) if t <= now]
+            return {"messages": msgs[-int(args.get("limit") or 50) :]}
+        if tool == "session_status":
+            return {"status": "ok", "sessions": len(self._sessions)}
+        if tool == "message":
+            return {"messageId": str(next(self._ids))}
+        raise KeyError(f"unknown tool {tool}")
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake OpenClaw gateway")
+        cfg = self.config
+
+        @app.post("/tools/invoke")
+        async def tools_invoke(request: Request):
+            if request.headers.get("authorization") != f"Bearer {cfg.token}":
+                return JSONResponse({"ok": False, "error": "unauthorized"}, status_code=401)
+            body = await request.json()
+            tool = body.get("tool", "")
+            self.calls[tool] = self.calls.get(tool, 0) + 1
+
+            latency = cfg.tool_latency_ms.get(tool, cfg.latency_ms)
+            latency += self._rng.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+            await asyncio.sleep(max(0.0, latency) / 1000)
+
+            if self._rng.random() < cfg.tool_failure_rate.get(tool, cfg.failure_rate):
+                return JSONResponse({"ok": False, "error": "injected failure"}, status_code=503)
+            try:
+                return {"ok": True, "result": self._invoke(tool, body.get("args") or {})}
+            except KeyError as e:
+                return {"ok": False, "error": str(e)}
+
+        return app
+
+    # --- serving ---
+
+    @contextmanager
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+        """Run the gateway in a background thread; yields its base URL."""
+
+        import uvicorn
+
+        if not port:
+            with socket.socket() as s:
+                s.bind((host, 0))
+                port = s.getsockname()[1]
+
+        server = uvicorn.Server(
+            uvicorn.Config(self.app, host=host, port=port, log_level="warning", access_log=False)
+        )
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            if not thread.is_alive():
+                raise RuntimeError("fake gateway failed to start")
+            time.sleep(0.01)
+        try:
+            yield f"http://{host}:{port}"
+        finally:
+            server.should_exit = True
+            thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18789)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--reply-delay", type=float, default=0.2)
+    parser.add_argument("--token", default="bench-token")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    gw = FakeGateway(
+        GatewayConfig(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            failure_rate=args.failure_rate,
+            reply_delay_s=args.reply_delay,
+            token=args.token,
+        )
+    )
+    uvicorn.run(gw.app, host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
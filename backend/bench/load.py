@@ -0,0 +1,393 @@
+"""End-to-end load test: seeded workspaces + fake OpenClaw gateway.
+
+Seeds a throwaway database with synthetic workspaces, agents, tasks and turns.
+It then drives the FastAPI app in-process (httpx ASGI transport) while a fake
+gateway (bench.fake_gateway) answers the War Room's tool calls over real HTTP.
+Reports p50/p99 latency and throughput per scenario; `--json` saves the
+results and `--compare` diffs them against a saved run (e.g. another commit).
+
+    cd backend
+    python -m bench.load --workspaces 4 --agents 500 --tasks 2000 --turns 1000000 \\
+        --requests 300 --concurrency 16 --json before.json
+    python -m bench.load ... --compare before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+from uuid import uuid4
+
+import httpx
+
+from bench.fake_gateway import FakeGateway, GatewayConfig
+
+HEADERS = {"X-MC-User": "bench", "X-MC-Role": "admin"}
+
+
+@dataclass
+class Result:
+    n: int
+    errors: int
+    p50_ms: float
+    p99_ms: float
+    mean_ms: float
+    rps: float
+    error_codes: dict[str, int]
+
+
+@dataclass
+class Dataset:
+    workspaces: list[str]
+    tasks: dict[str, list[str]]  # workspace -> task ids
+    conversations: list[str]
+
+
+# --- Seeding ---
+
+
+def _chunks(rows, size: int = 5000):
+    for i in range(0, len(rows), size):
+        yield rows[i : i + size]
+
+
+def seed(args) -> Dataset:
+    from sqlalchemy import insert
+
+    from app.db import SessionLocal
+    from app.models import Agent, AuditEvent, Conversation, Task, TaskStatus, Turn, Workspace
+    from app.transcripts import backfill_turn_seq
+
+    rng = random.Random(args.seed)
+    cold = [TaskStatus.BACKLOG, TaskStatus.READY, TaskStatus.DONE]
+    t0 = datetime.now(timezone.utc) - timedelta(days=1)
+    db = SessionLocal()
+    data = Dataset(workspaces=[], tasks={}, conversations=[])
+    try:
+        for w in range(args.workspaces):
+            ws_id = str(uuid4())
+            data.workspaces.append(ws_id)
+            db.execute(insert(Workspace), [{"id": ws_id, "name": f"bench-{w}-{ws_id[:8]}"}])
+
+            agents = [
+                {
+                    "id": str(uuid4()),
+                    "workspace_id": ws_id,
+                    "name": f"Agent {i}",
+                    "role": "Ops",
+                    "soul_md": "You are a diligent employee. " * 20,
+                    "openclaw_agent_id": f"agent-{i}",
+                }
+                for i in range(args.agents)
+            ]
+            for chunk in _chunks(agents):
+                db.execute(insert(Agent), chunk)
+
+            tasks = []
+            for i in range(args.tasks):
+                focus = i < args.focus_tasks
+                tasks.append(
+                    {
+                        "id": str(uuid4()),
+                        "workspace_id": ws_id,
+                        "title": f"Task {i} for workspace {w}",
+                        "description": "Investigate and fix. " * 10,
+                        "status": rng.choice(
+                            [TaskStatus.DOING, TaskStatus.BLOCKED] if focus else cold
+                        ),
+                        "priority": rng.randint(0, 5),
+                        "sort_order": i,
+                        "owner_agent_id": agents[i % len(agents)]["id"] if agents else None,
+                    }
+                )
+            for chunk in _chunks(tasks):
+                db.execute(insert(Task), chunk)
+            data.tasks[ws_id] = [t["id"] for t in tasks]
+
+            convos = [
+                {"id": str(uuid4()), "workspace_id": ws_id, "type": "WAR_ROOM"}
+                for _ in range(args.conversations)
+            ]
+            db.execute(insert(Conversation), convos)
+            data.conversations += [c["id"] for c in convos]
+
+            db.execute(
+                insert(AuditEvent),
+                [
+                    {
+                        "id": str(uuid4()),
+                        "workspace_id": ws_id,
+                        "actor": "bench",
+                        "role": "operator",
+                        "action": "task.update",
+                        "entity_type": "task",
+                        "entity_id": rng.choice(data.tasks[ws_id] or [None]),
+                        "payload": {"status": "DOING"},
+                    }
+                    for _ in range(args.audit)
+                ],
+            )
+            db.commit()
+
+        # Turns are spread over all conversations, inserted in chunks.
+        per_chunk = 5000
+        for start in range(0, args.turns, per_chunk):
+            db.execute(
+                insert(Turn),
+                [
+                    {
+                        "id": str(uuid4()),
+                        "conversation_id": data.conversations[i % len(data.conversations)],
+                        "speaker_type": "agent" if i % 2 else "chair",
+                        "content": f"turn {i}: status update, next step is deploy " * 4,
+                        "created_at": t0 + timedelta(milliseconds=i),
+                    }
+                    for i in range(start, min(args.turns, start + per_chunk))
+                ],
+            )
+            db.commit()
+        # Numbers them in created_at order, as for a database that predates `seq`.
+        backfill_turn_seq(db)
+    finally:
+        db.close()
+    return data
+
+
+# --- Scenarios ---
+
+Request = tuple[str, str, dict, dict | None]  # method, url, headers, json body
+
+
+def scenarios(data: Dataset, rng: random.Random) -> dict[str, Callable[[int], Request]]:
+    def ws_headers() -> dict:
+        return {**HEADERS, "X-MC-Workspace": rng.choice(data.workspaces)}
+
+    def any_task() -> tuple[dict, str]:
+        ws = rng.choice(data.workspaces)
+        return {**HEADERS, "X-MC-Workspace": ws}, rng.choice(data.tasks[ws])
+
+    def patch_task(i: int) -> Request:
+        headers, task_id = any_task()
+        return "PATCH", f"/api/tasks/{task_id}", headers, {"priority": i % 5}
+
+    return {
+        "GET /api/agents": lambda i: ("GET", "/api/agents", ws_headers(), None),
+        "GET /api/tasks": lambda i: ("GET", "/api/tasks", ws_headers(), None),
+        "GET /api/audit": lambda i: ("GET", "/api/audit?limit=200", ws_headers(), None),
+        "GET turns tail": lambda i: (
+            "GET",
+            f"/api/conversations/{rng.choice(data.conversations)}/turns?tail=50",
+            HEADERS,
+            None,
+        ),
+        "GET /api/search": lambda i: ("GET", "/api/search?q=deploy&limit=20", ws_headers(), None),
+        "POST /api/tasks": lambda i: (
+            "POST",
+            "/api/tasks",
+            ws_headers(),
+            {"title": f"bench task {i}", "status": "BACKLOG"},
+        ),
+        "PATCH /api/tasks": patch_task,
+    }
+
+
+def war_room(data: Dataset) -> Callable[[int], Request]:
+    def make(i: int) -> Request:
+        # Round-robin so concurrent runs land on different workspaces.
+        ws = data.workspaces[i % len(data.workspaces)]
+        return "POST", "/api/war-room/run?full=true", {**HEADERS, "X-MC-Workspace": ws}, None
+
+    return make
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, make: Callable[[int], Request], requests: int, concurrency: int
+) -> Result:
+    latencies: list[float] = []
+    codes: dict[str, int] = {}
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for i in counter:
+            method, url, headers, body = make(i)
+            start = time.perf_counter()
+            try:
+                res = await client.request(method, url, headers=headers, json=body)
+                code = str(res.status_code) if res.status_code >= 400 else None
+            except Exception as e:
+                code = type(e).__name__
+            if code:
+                codes[code] = codes.get(code, 0) + 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    wall = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall
+
+    q = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else None
+    return Result(
+        n=len(latencies),
+        errors=sum(codes.values()),
+        p50_ms=round(q[49] if q else latencies[0], 2),
+        p99_ms=round(q[98] if q else latencies[0], 2),
+        mean_ms=round(statistics.fmean(latencies), 2),
+        rps=round(len(latencies) / wall, 1),
+        error_codes=codes,
+    )
+
+
+# --- Reporting ---
+
+
+def _commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _pct(new: float, old: float) -> str:
+    if not old:
+        return "   n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+
+def report(results: dict[str, Result], baseline: dict | None) -> None:
+    print(f"\n{'scenario':28} {'n':>6} {'err':>5} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+    for name, r in results.items():
+        line = f"{name:28} {r.n:6} {r.errors:5} {r.p50_ms:9.2f} {r.p99_ms:9.2f} {r.rps:8.1f}"
+        old = (baseline or {}).get("results", {}).get(name)
+        if old:
+            line += (
+                f"   p50 {_pct(r.p50_ms, old['p50_ms'])}  p99 {_pct(r.p99_ms, old['p99_ms'])}"
+                f"  req/s {_pct(r.rps, old['rps'])}"
+            )
+        print(line)
+        if r.error_codes:
+            print(f"{'':28} errors: {r.error_codes}")
+    if baseline:
+        print(f"(deltas vs {baseline.get('meta', {}).get('commit') or 'baseline'})")
+
+
+# --- Entry point ---
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workspaces", type=int, default=2)
+    parser.add_argument("--agents", type=int, default=200, help="per workspace")
+    parser.add_argument("--tasks", type=int, default=1000, help="per workspace")
+    parser.add_argument("--focus-tasks", type=int, default=20, help="DOING/BLOCKED per workspace")
+    parser.add_argument("--conversations", type=int, default=50, help="per workspace")
+    parser.add_argument("--audit", type=int, default=2000, help="audit events per workspace")
+    parser.add_argument("--turns", type=int, default=100_000, help="total")
+    parser.add_argument("--requests", type=int, default=200, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--war-rooms", type=int, default=4, help="War Room runs (0 skips)")
+    parser.add_argument("--gateway-latency-ms", type=float, default=20.0)
+    parser.add_argument("--gateway-failure-rate", type=float, default=0.0)
+    parser.add_argument("--reply-delay", type=float, default=0.1)
+    parser.add_argument("--only", help="comma-separated scenario names to run")
+    parser.add_argument("--database-url", help="default: a fresh SQLite file in a temp dir")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results file to diff against")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="mc-bench-")
+    gateway = FakeGateway(
+        GatewayConfig(
+            latency_ms=args.gateway_latency_ms,
+            failure_rate=args.gateway_failure_rate,
+            reply_delay_s=args.reply_delay,
+            seed=args.seed,
+        )
+    )
+
+    with gateway.serve() as gateway_url:
+        # Settings are read at import time, so configure before importing the app.
+        os.environ.update(
+            DATABASE_URL=args.database_url or f"sqlite:///{tmp}/bench.db",
+            OPENCLAW_GATEWAY_URL=gateway_url,
+            OPENCLAW_GATEWAY_TOKEN=gateway.config.token,
+            ARCHIVE_DIR=f"{tmp}/archive",
+            BLOB_DIR=f"{tmp}/blobs",
+            RATE_LIMIT_ENABLED="false",
+            WAR_ROOM_MAX_CONCURRENT=str(args.concurrency),
+            AGENT_REPLY_POLL_SECONDS="0.05",
+            AGENT_REPLY_POLL_ATTEMPTS="100",
+        )
+        os.environ.pop("TELEGRAM_CHAT_ID", None)
+        from app.main import app
+
+        start = time.perf_counter()
+        data = seed(args)
+        print(
+            f"seeded {args.workspaces} workspaces x ({args.agents} agents, {args.tasks} tasks), "
+            f"{args.turns} turns in {time.perf_counter() - start:.1f}s ({tmp})"
+        )
+
+        rng = random.Random(args.seed)
+        plan = {
+            name: (make, args.requests, args.concurrency)
+            for name, make in scenarios(data, rng).items()
+        }
+        if args.war_rooms:
+            plan["POST /api/war-room/run"] = (
+                war_room(data),
+                args.war_rooms,
+                min(args.concurrency, len(data.workspaces)),
+            )
+        if args.only:
+            wanted = {n.strip() for n in args.only.split(",")}
+            plan = {k: v for k, v in plan.items() if k in wanted}
+
+        async def run_all() -> dict[str, Result]:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", timeout=None
+            ) as client:
+                out = {}
+                for name, (make, n, conc) in plan.items():
+                    out[name] = await run_scenario(client, make, n, conc)
+                    print(f"  {name}: done")
+                return out
+
+        results = asyncio.run(run_all())
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(results, baseline)
+
+    if args.json:
+        payload = {
+            "meta": {
+                "commit": _commit(),
+                "at": datetime.now(timezone.utc).isoformat(),
+                "args": vars(args),
+                "gateway_calls": gateway.calls,
+            },
+            "results": {k: asdict(v) for k, v in results.items()},
+        }
+        with open(args.json, "w") as f:
+            json.dump(payload, f, indent=2)
+        print(f"wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Owner update parser: corpus throughput, linear scaling and fuzzing.
+
+    cd backend
+    python -m bench.owner_updates --tasks 1,10,100,1000 --repeat 50
+    python -m bench.owner_updates --fuzz 20000 --seed 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from types import SimpleNamespace
+
+from app.owner_updates import (
+    DEFAULT_REQUIRED_FIELDS,
+    UPDATE_KEYS,
+    TaskIndex,
+    parse_owner_updates,
+)
+
+
+def _update(i: int) -> dict[str, str]:
+    return {
+        "task_id": f"t-{i}",
+        "task_title": f"Task {i}: migrate --- service",
+        "current_task": f"step {i}: wire the adapter",
+        "status": "working" if i % 3 else "blocked",
+        "next_step": "deploy at 10:30 and verify",
+        "blockers": "none" if i % 3 else "waiting on key: prod",
+    }
+
+
+def _kv(updates: list[dict]) -> str:
+    return "\n---\n".join("\n".join(f"{k}: {v}" for k, v in u.items()) for u in updates)
+
+
+def _yaml_list(updates: list[dict]) -> str:
+    lines = ["Here is my update:", "```yaml"]
+    for u in updates:
+        first, *rest = u.items()
+        lines.append(f"- {first[0]}: {first[1]}")
+        lines.extend(f"  {k}: {v}" for k, v in rest)
+    return "\n".join([*lines, "```"])
+
+
+def _markdown(updates: list[dict]) -> str:
+    blocks = []
+    for u in updates:
+        blocks.append(
+            "\n".join(
+                [
+                    f"**Task title:** {u['task_title']}",
+                    f"**Current task:** {u['current_task']}",
+                    f"**Status:** {u['status']}",
+                    f"**Next step:** {u['next_step']}",
+                    "**Blockers:**",
+                    f"  - {u['blockers']}",
+                    "",
+                    "```sh\nmake deploy --- now\n```",
+                ]
+            )
+        )
+    return "\n\n".join(blocks)
+
+
+def _json_fenced(updates: list[dict]) -> str:
+    return "Updates below.\n```json\n" + json.dumps({"updates": updates}, indent=2) + "\n```"
+
+
+FORMATS = {"kv": _kv, "yaml": _yaml_list, "markdown": _markdown, "json": _json_fenced}
+
+
+def _corpus(n_tasks: int) -> tuple[dict[str, str], TaskIndex]:
+    updates = [_update(i) for i in range(n_tasks)]
+    tasks = [SimpleNamespace(id=u["task_id"], title=u["task_title"]) for u in updates]
+    return {name: fmt(updates) for name, fmt in FORMATS.items()}, TaskIndex(tasks)
+
+
+def _check(name: str, text: str, n_tasks: int, index: TaskIndex) -> None:
+    parsed = parse_owner_updates(text, required_fields=DEFAULT_REQUIRED_FIELDS)
+    matched = sum(index.match(it) is not None for it in parsed.items)
+    if len(parsed.items) != n_tasks or matched != n_tasks or parsed.errors:
+        raise SystemExit(
+            f"{name}: parsed {len(parsed.items)}/{n_tasks}, matched {matched}, "
+            f"errors {parsed.errors[:3]}"
+        )
+
+
+def bench(sizes: list[int], repeat: int) -> None:
+    print(f"repeat={repeat} (µs per task; flat across sizes means linear)")
+    for n in sizes:
+        corpus, index = _corpus(n)
+        row = []
+        for name, text in corpus.items():
+            _check(name, text, n, index)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for it in parse_owner_updates(text).items:
+                    index.match(it)
+            us = (time.perf_counter() - start) * 1e6 / repeat / n
+            row.append(f"{name} {us:7.1f}")
+        print(f"tasks={n:<6} " + "  ".join(row))
+
+
+_NOISE = ["---", "```", "```json", "~~~", ":", "- ", "  ", "\n", "{", "}", "[", "]", '"', "**", "|"]
+
+
+def _mutate(rng: random.Random, text: str) -> str:
+    chars = list(text)
+    for _ in range(rng.randint(1, 8)):
+        op = rng.random()
+        pos = rng.randint(0, len(chars))
+        if op < 0.4:
+            chars[pos:pos] = rng.choice(_NOISE + list(UPDATE_KEYS))
+        elif op < 0.7 and chars:
+            del chars[pos : pos + rng.randint(1, 20)]
+        else:
+            chars[pos:pos] = chr(rng.randint(0, 0x2FF))
+    return "".join(chars)
+
+
+def fuzz(iterations: int, seed: int) -> None:
+    rng = random.Random(seed)
+    seeds = [text for n in (1, 3, 7) for text in _corpus(n)[0].values()]
+    index = _corpus(7)[1]
+    worst = 0.0
+    for i in range(iterations):
+        text = _mutate(rng, rng.choice(seeds))
+        start = time.perf_counter()
+        try:
+            parsed = parse_owner_updates(text, required_fields=DEFAULT_REQUIRED_FIELDS)
+            for it in parsed.items:
+                assert set(it) <= set(UPDATE_KEYS), it
+                assert all(isinstance(v, str) for v in it.values()), it
+                index.match(it)
+        except Exception as e:
+            raise SystemExit(f"iteration {i}: {e!r}\n--- input ---\n{text}") from e
+        worst = max(worst, (time.perf_counter() - start) / max(1, len(text)))
+    print(f"fuzz ok: {iterations} inputs, worst {worst * 1e6:.2f} µs/char")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", default="1,10,100,1000")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--fuzz", type=int, default=0, help="run N fuzz inputs instead")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.fuzz:
+        fuzz(args.fuzz, args.seed)
+    else:
+        bench([int(n) for n in args.tasks.split(",")], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
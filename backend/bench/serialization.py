@@ -0,0 +1,130 @@
+"""Per-request CPU cost of list serialization: ORM + pydantic vs row projection + orjson.
+
+    cd backend
+    python -m bench.serialization --rows 5000 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, undefer
+from sqlalchemy.pool import StaticPool
+
+from app.board import BOARD_ORDER
+from app.models import AuditEvent, Base, Task, TaskStatus
+from app.responses import rows_response
+from app.schemas import AuditEventOut, TaskOut
+
+STATUSES = list(TaskStatus)
+
+
+def _seed(db: Session, rows: int) -> None:
+    db.add_all(
+        Task(
+            id=str(uuid4()),
+            title=f"Task {i}",
+            description="lorem ipsum " * 40,
+            status=STATUSES[i % len(STATUSES)],
+            priority=i % 5,
+            sort_order=i,
+        )
+        for i in range(rows)
+    )
+    db.add_all(
+        AuditEvent(
+            id=str(uuid4()),
+            actor="bench",
+            role="operator",
+            action="task.update",
+            entity_type="task",
+            entity_id=str(uuid4()),
+            payload={"status": "DOING", "priority": i % 5, "note": "x" * 64},
+        )
+        for i in range(rows)
+    )
+    db.commit()
+
+
+def _orm_tasks(db: Session) -> bytes:
+    rows = db.query(Task).options(undefer(Task.description)).order_by(*BOARD_ORDER).all()
+    out = TypeAdapter(list[TaskOut]).validate_python(rows)
+    return json.dumps(jsonable_encoder(out)).encode()
+
+
+def _projected_tasks(db: Session) -> bytes:
+    q = db.query(
+        Task.id,
+        Task.title,
+        Task.description,
+        Task.status,
+        Task.priority,
+        Task.sort_order,
+        Task.owner_agent_id,
+    )
+    return rows_response(q.order_by(*BOARD_ORDER)).body
+
+
+def _orm_audit(db: Session) -> bytes:
+    rows = db.query(AuditEvent).order_by(AuditEvent.created_at.desc()).all()
+    out = TypeAdapter(list[AuditEventOut]).validate_python(rows)
+    return json.dumps(jsonable_encoder(out)).encode()
+
+
+def _projected_audit(db: Session) -> bytes:
+    q = db.query(
+        AuditEvent.id,
+        AuditEvent.actor,
+        AuditEvent.role,
+        AuditEvent.action,
+        AuditEvent.entity_type,
+        AuditEvent.entity_id,
+        AuditEvent.payload,
+        AuditEvent.created_at,
+    )
+    return rows_response(q.order_by(AuditEvent.created_at.desc())).body
+
+
+def _cpu_ms(fn, db: Session, repeat: int) -> float:
+    fn(db)  # warm up
+    start = time.process_time()
+    for _ in range(repeat):
+        fn(db)
+        db.expunge_all()
+    return (time.process_time() - start) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+
+    with Session(engine) as db:
+        _seed(db, args.rows)
+        print(f"rows={args.rows} repeat={args.repeat} (CPU ms per request)")
+        for name, legacy, fast in [
+            ("/api/tasks", _orm_tasks, _projected_tasks),
+            ("/api/audit", _orm_audit, _projected_audit),
+        ]:
+            before = _cpu_ms(legacy, db, args.repeat)
+            after = _cpu_ms(fast, db, args.repeat)
+            print(
+                f"{name:12} orm+pydantic {before:9.2f}  "
+                f"projection+orjson {after:9.2f}  x{before / after:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+# The engine is created at import time, so point it at a scratch database
+# before anything imports app.db.
+_tmp = tempfile.mkdtemp(prefix="mc-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ["ARCHIVE_DIR"] = os.path.join(_tmp, "archive")
+os.environ["BLOB_DIR"] = os.path.join(_tmp, "blobs")
+
+import pytest  # noqa: E402
+
+from app.db import SessionLocal, engine, sync_schema  # noqa: E402
+from app.models import Base  # noqa: E402
+from app.search import install_search  # noqa: E402
+
+sync_schema(Base.metadata)
+install_search(engine)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        # Empty rather than drop, so triggers (search index) survive between tests.
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    # No `with`: the lifespan's background workers are not started.
+    return TestClient(app)
@@ -0,0 +1,71 @@
+import asyncio
+from datetime import datetime, timezone
+
+from app.agent_sessions import ask_agent
+from app.entity_cache import cached_agent
+from app.models import Agent, AgentSession
+from app.upserts import upsert_agent_session
+
+
+class FakeGateway:
+    """Records whether `db` had a database transaction open while we awaited replies."""
+
+    def __init__(self, db, *, send_fails: bool = False):
+        self.db = db
+        self.send_fails = send_fails
+        self.open_during_wait: list[bool] = []
+
+    async def sessions_spawn(self, **_kw):
+        return {"childSessionKey": "child-1"}
+
+    async def sessions_send(self, _key, _prompt):
+        if self.send_fails:
+            raise RuntimeError("session gone")
+
+    async def sessions_history(self, *_a, **_kw):
+        raw = self.db.connection().connection.driver_connection
+        self.open_during_wait.append(raw.in_transaction)
+        return [{"role": "user", "content": "[m]"}, {"role": "assistant", "content": "ok"}]
+
+
+def _agent(db):
+    db.add(Agent(id="a1", name="Ada", role="dev", soul_md="", openclaw_agent_id="oc-1"))
+    db.commit()
+    return cached_agent(db, "a1")
+
+
+def test_spawn_does_not_write_while_awaiting_the_gateway(db):
+    agent = _agent(db)
+    gw = FakeGateway(db)
+
+    reply = asyncio.run(ask_agent(db, gw, agent, "[m] hi", label="l", marker="[m]"))
+
+    assert gw.open_during_wait and not any(gw.open_during_wait)
+    assert db.get(AgentSession, "a1") is None
+    assert reply.spawned["session_key"] == "child-1"
+
+    upsert_agent_session(db, **reply.spawned)
+    db.commit()
+    assert db.get(AgentSession, "a1").session_key == "child-1"
+
+
+def test_respawn_after_failed_send_does_not_write_while_awaiting(db):
+    agent = _agent(db)
+    upsert_agent_session(
+        db,
+        agent_id="a1",
+        session_key="old",
+        openclaw_agent_id="oc-1",
+        now=datetime.now(timezone.utc),
+    )
+    db.commit()
+    gw = FakeGateway(db, send_fails=True)
+
+    reply = asyncio.run(ask_agent(db, gw, agent, "[m] hi", label="l", marker="[m]"))
+
+    assert not any(gw.open_during_wait)
+    assert not reply.reused and reply.spawned is not None
+    upsert_agent_session(db, **reply.spawned)
+    db.commit()
+    sess = db.get(AgentSession, "a1")
+    assert (sess.session_key, sess.last_error) == ("child-1", None)
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+
+from app.archive import run_archiver
+from app.blobs import offload_tool_events
+from app.models import Conversation, Turn
+from app.settings import settings
+
+
+def _old_turn(db, monkeypatch, tool_events):
+    monkeypatch.setattr(settings, "tool_events_inline_max_bytes", 64)
+    monkeypatch.setattr(settings, "retention_turns_days", 30)
+    inline, ref, size = offload_tool_events(tool_events)
+    db.add(Conversation(id="c1", type="task"))
+    db.add(
+        Turn(
+            id="turn-1",
+            conversation_id="c1",
+            seq=1,
+            speaker_type="agent",
+            content="done",
+            tool_events=inline,
+            tool_events_ref=ref,
+            tool_events_size=size,
+            created_at=datetime.now(timezone.utc) - timedelta(days=90),
+        )
+    )
+    db.commit()
+    assert run_archiver(db)["turns"] == 1
+    assert db.get(Turn, "turn-1") is None
+
+
+def test_tool_events_of_archived_turn_are_served(client, db, monkeypatch):
+    events = {"calls": [{"tool": "search", "output": "x" * 500}]}
+    _old_turn(db, monkeypatch, events)
+
+    res = client.get("/api/turns/turn-1/tool-events")
+    assert res.status_code == 200
+    assert res.json() == events
+
+    res = client.get("/api/turns/turn-1/tool-events", params={"conversation_id": "c1"})
+    assert res.json() == events
+
+
+def test_inline_tool_events_of_archived_turn_are_served(client, db, monkeypatch):
+    _old_turn(db, monkeypatch, {"calls": []})
+    assert client.get("/api/turns/turn-1/tool-events").json() == {"calls": []}
+
+
+def test_unknown_turn_is_404(client):
+    assert client.get("/api/turns/nope/tool-events").status_code == 404
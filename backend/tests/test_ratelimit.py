@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app import ratelimit
+from app.ratelimit import MemoryBackend, RedisBackend
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    return clock
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_leaked_slot_expires_on_its_own_despite_new_acquires(clock):
+    backend = MemoryBackend()
+    assert run(backend.acquire("wr", limit=2, ttl=60))  # never released
+    for _ in range(10):
+        clock.now += 20
+        token = run(backend.acquire("wr", limit=2, ttl=60))
+        assert token
+        run(backend.release("wr", token))
+    # The leaked slot is gone, so both slots are free again.
+    assert run(backend.acquire("wr", limit=2, ttl=60))
+    assert run(backend.acquire("wr", limit=2, ttl=60))
+    assert run(backend.acquire("wr", limit=2, ttl=60)) is None
+
+
+def test_release_after_expiry_does_not_raise_the_cap(clock):
+    backend = MemoryBackend()
+    stale = run(backend.acquire("wr", limit=1, ttl=60))
+    clock.now += 61
+    fresh = run(backend.acquire("wr", limit=1, ttl=60))
+    run(backend.release("wr", stale))
+    assert fresh
+    assert run(backend.acquire("wr", limit=1, ttl=60)) is None
+
+
+def test_idle_buckets_are_evicted(clock):
+    backend = MemoryBackend()
+    for i in range(100):
+        run(backend.take(f"chat:{i}", capacity=10, per_second=1))
+    clock.now += ratelimit.BUCKET_SWEEP_SECONDS + 1
+    run(backend.take("chat:new", capacity=10, per_second=1))
+    assert list(backend._buckets) == ["chat:new"]
+
+
+def test_bucket_limits_are_unchanged_by_eviction(clock):
+    backend = MemoryBackend()
+    assert run(backend.take("k", capacity=1, per_second=0.001)) == 0
+    clock.now += ratelimit.BUCKET_SWEEP_SECONDS + 1
+    assert run(backend.take("k", capacity=1, per_second=0.001)) > 0
+
+
+def test_redis_slots_expire_individually_and_release_only_their_own(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    if ratelimit.aioredis is None:
+        pytest.skip("redis package not installed")
+    monkeypatch.setattr(ratelimit.aioredis, "from_url", lambda _url: fakeredis.FakeAsyncRedis())
+
+    async def scenario():
+        backend = RedisBackend("redis://fake")
+        a = await backend.acquire("wr", limit=2, ttl=60)
+        b = await backend.acquire("wr", limit=2, ttl=60)
+        assert a and b
+        assert await backend.acquire("wr", limit=2, ttl=60) is None
+        await backend.release("wr", a)
+        await backend.release("wr", a)  # a double release frees nothing extra
+        assert await backend.acquire("wr", limit=2, ttl=60)
+        assert await backend.acquire("wr", limit=2, ttl=60) is None
+
+    run(scenario())
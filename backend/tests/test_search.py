@@ -0,0 +1,32 @@
+import pytest
+
+from app.models import Task
+from app.search import search
+
+
+@pytest.fixture
+def tasks(db):
+    db.add(Task(id="t1", title="Fix the deploy pipeline", description="rollout is stuck"))
+    db.commit()
+
+
+def test_type_filter_limits_results(db, tasks):
+    assert [
+        h.doc_type for h in search(db, "deploy", workspace_id=None, doc_types=("task",)).hits
+    ] == ["task"]
+    assert search(db, "deploy", workspace_id=None, doc_types=("turn",)).hits == []
+
+
+def test_unknown_types_are_rejected(db, tasks):
+    with pytest.raises(ValueError, match="bogus"):
+        search(db, "deploy", workspace_id=None, doc_types=("bogus",))
+
+
+def test_search_endpoint_returns_400_for_unknown_types(client, tasks):
+    res = client.get("/api/search", params={"q": "deploy", "types": "tasks"})
+    assert res.status_code == 400
+    assert "tasks" in res.json()["detail"]
+
+    res = client.get("/api/search", params={"q": "deploy", "types": "task"})
+    assert res.status_code == 200
+    assert [r["doc_id"] for r in res.json()["results"]] == ["t1"]
@@ -0,0 +1,39 @@
+import pytest
+
+from app.models import Conversation, Workspace
+
+TURN_URLS = (
+    "/api/conversations/{id}/turns",
+    "/api/conversations/{id}/turns?after=0",
+    "/api/conversations/{id}/turns/stream",
+)
+
+
+@pytest.fixture
+def conversations(db):
+    db.add_all([Workspace(id="ws-a", name="A"), Workspace(id="ws-b", name="B")])
+    db.add_all(
+        [
+            Conversation(id="in-a", type="task", workspace_id="ws-a"),
+            Conversation(id="unscoped", type="task"),
+        ]
+    )
+    db.commit()
+
+
+@pytest.mark.parametrize("url", TURN_URLS)
+def test_unknown_conversation_is_404(client, conversations, url):
+    assert client.get(url.format(id="nope")).status_code == 404
+
+
+@pytest.mark.parametrize("url", TURN_URLS)
+def test_other_workspaces_conversation_is_404(client, conversations, url):
+    res = client.get(url.format(id="in-a"), headers={"X-MC-Workspace": "ws-b"})
+    assert res.status_code == 404
+
+
+@pytest.mark.parametrize("url", TURN_URLS)
+def test_own_and_unscoped_conversations_are_readable(client, conversations, url):
+    for convo in ("in-a", "unscoped"):
+        res = client.get(url.format(id=convo), headers={"X-MC-Workspace": "ws-a"})
+        assert res.status_code == 200
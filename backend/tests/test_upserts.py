@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+
+from app.models import Agent, AgentWorkState
+from app.upserts import upsert_work_state, upsert_work_states
+
+
+def test_single_upsert_clears_pushed_at(db):
+    db.add(Agent(id="a1", name="Ada", role="dev", soul_md=""))
+    db.commit()
+    state = {"task_id": None, "status": "working", "next_step": "ship", "blockers": ""}
+    upsert_work_states(db, [{"agent_id": "a1", **state}], pushed_at=datetime.now(timezone.utc))
+    db.commit()
+    assert db.get(AgentWorkState, "a1").pushed_at is not None
+
+    version = upsert_work_state(db, agent_id="a1", **{**state, "status": "blocked"})
+    db.commit()
+
+    row = db.get(AgentWorkState, "a1")
+    db.refresh(row)
+    assert (row.status, row.version, row.pushed_at) == ("blocked", version, None)
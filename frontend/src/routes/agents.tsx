@@ -21,7 +21,8 @@ type Agent = {
   id: string;
   name: string;
   role: string;
-  soul_md: string;
+  // Only present on the single-agent endpoint; list responses leave it out.
+  soul_md?: string | null;
   enabled: boolean;
   openclaw_agent_id?: string | null;
   skills_allow: string[];
@@ -35,6 +36,9 @@ type Agent = {
   } | null;
 };
 
+// `GET /api/agents/{id}` always includes the soul.
+type AgentDetail = Agent & { soul_md: string };
+
 type AgentCreate = {
   name: string;
   role: string;
@@ -176,18 +180,8 @@ function AgentEditor({
   );
 }
 
-function AgentCard({
-  agent,
-  onSave,
-  saving,
-}: {
-  agent: Agent;
-  onSave: (patch: Partial<AgentCreate>) => void;
-  saving: boolean;
-}) {
-  const [open, setOpen] = useState(false);
-
-  const initial: AgentCreate = {
+function editorInitial(agent: AgentDetail): AgentCreate {
+  return {
     name: agent.name,
     role: agent.role,
     soul_md: agent.soul_md,
@@ -199,6 +193,25 @@ function AgentCard({
       by_skill: agent.execution_policy?.by_skill ?? {},
     },
   };
+}
+
+function AgentCard({
+  agent,
+  onSave,
+  saving,
+}: {
+  agent: Agent;
+  onSave: (patch: Partial<AgentCreate>) => void;
+  saving: boolean;
+}) {
+  const [open, setOpen] = useState(false);
+
+  // The list omits soul_md; load the full agent only while the editor is open.
+  const detail = useQuery({
+    queryKey: ["agents", agent.id],
+    queryFn: () => apiGet<AgentDetail>(`/api/agents/${agent.id}`),
+    enabled: open,
+  });
 
   return (
     <div className="flex flex-col gap-1 rounded-lg border p-3">
@@ -217,15 +230,27 @@ function AgentCard({
               <DialogHeader>
                 <DialogTitle>Edit agent</DialogTitle>
               </DialogHeader>
-              <AgentEditor
-                mode="edit"
-                initial={initial}
-                submitting={saving}
-                onSubmit={(v) => {
-                  onSave(v);
-                  setOpen(false);
-                }}
-              />
+              {detail.data ? (
+                <AgentEditor
+                  mode="edit"
+                  initial={editorInitial(detail.data)}
+                  submitting={saving}
+                  onSubmit={(v) => {
+                    onSave(v);
+                    setOpen(false);
+                  }}
+                />
+              ) : detail.isError ? (
+                // Never open the editor without the soul: saving would blank it.
+                <div className="grid gap-2">
+                  <div className="text-sm text-destructive">{String(detail.error)}</div>
+                  <Button size="sm" variant="outline" onClick={() => detail.refetch()}>
+                    Retry
+                  </Button>
+                </div>
+              ) : (
+                <div className="text-sm text-muted-foreground">Loading…</div>
+              )}
             </DialogContent>
           </Dialog>
         </div>